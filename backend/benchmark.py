@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for InterviewManager technical submissions.
+
+Runs against the stub LLM backend and a throwaway SQLite database, so no AWS
+credentials or network access are needed. Latency and error behaviour of the
+stub are controlled by the STUB_* settings, e.g.
+
+    STUB_LATENCY_MEAN_MS=1500 STUB_ERROR_RATE=0.05 python benchmark.py --requests 500 --concurrency 50
+"""
+import os
+
+os.environ["LLM_BACKEND"] = "stub"
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Interview, InterviewSession, Question, QuestionCategory
+from models.interview import InterviewType
+from models.question import QuestionType, DifficultyLevel
+from core.duration_stats import DurationStats
+from core.interview_manager import InterviewManager
+
+
+def seed(SessionLocal, question_count: int):
+    db = SessionLocal()
+    category = QuestionCategory(name="benchmark", question_type=QuestionType.LEETCODE)
+    db.add(category)
+    db.commit()
+    for i in range(question_count):
+        db.add(Question(
+            category_id=category.id,
+            question_type=QuestionType.LEETCODE,
+            difficulty=DifficultyLevel.MEDIUM,
+            title=f"Benchmark problem {i}",
+            content=f"Return the sum of the first {i} integers.",
+            problem_statement=f"Return the sum of the first {i} integers.",
+            expected_output=str(i * (i + 1) // 2)
+        ))
+    interview = Interview(user_id=1, interview_type=InterviewType.TECHNICAL, title="benchmark")
+    db.add(interview)
+    db.commit()
+    session = InterviewSession(interview_id=interview.id, session_type=InterviewType.TECHNICAL)
+    db.add(session)
+    db.commit()
+    question_ids = [q.id for q in db.query(Question).all()]
+    session_id = session.id
+    db.close()
+    return session_id, question_ids
+
+
+async def run(args):
+    tmpdir = tempfile.mkdtemp(prefix="interviewer-bench-")
+    engine = create_engine(f"sqlite:///{tmpdir}/benchmark.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session_id, question_ids = seed(SessionLocal, args.questions)
+
+    # Duration stats must write to the throwaway database, not the configured one
+    manager = InterviewManager(duration_stats=DurationStats(session_factory=SessionLocal))
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    failures = 0
+
+    async def submit(i: int):
+        nonlocal failures
+        async with semaphore:
+            db = SessionLocal()
+            start = time.perf_counter()
+            try:
+                result = await manager.submit_technical_response(
+                    db=db,
+                    session_id=session_id,
+                    question_id=question_ids[i % len(question_ids)],
+                    user_id=1,
+                    # Unique code per request unless --duplicates, which exercises the cache
+                    code_response=f"def solve(n):\n    return n * (n + 1) // 2  # {0 if args.duplicates else i}",
+                    time_taken=120.0
+                )
+                if result["score"] == 0:
+                    failures += 1
+            finally:
+                latencies.append(time.perf_counter() - start)
+                db.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(submit(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await manager.drain_background_tasks()
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"requests:    {args.requests} (concurrency {args.concurrency})")
+    print(f"elapsed:     {elapsed:.2f}s")
+    print(f"throughput:  {args.requests / elapsed:.1f} req/s")
+    print(f"latency ms:  mean {statistics.mean(latencies) * 1000:.0f}  p50 {percentile(0.5):.0f}  "
+          f"p95 {percentile(0.95):.0f}  p99 {percentile(0.99):.0f}")
+    print(f"zero scores: {failures}")
+    print(f"llm cache:   {manager.ai_service.cache_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InterviewManager against the stub LLM backend")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--duplicates", action="store_true", help="Submit identical code to exercise the cache")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
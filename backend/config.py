@@ -10,6 +10,48 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     
+    # LLM backend
+    LLM_BACKEND: str = "bedrock"  # "bedrock" or "stub" (offline, for load testing)
+    
+    # AWS Bedrock
+    BEDROCK_MODEL_ID: str = "amazon.titan-tg1-large"
+    BEDROCK_REGION: str = "us-west-2"
+    AWS_PROFILE: Optional[str] = "bokchoy"
+    BEDROCK_MAX_IN_FLIGHT: int = 16  # Ceiling for concurrent Bedrock calls per worker
+    BEDROCK_WARMUP_CONNECTIONS: int = 0  # Connections opened with billed one-token calls at startup (0 disables)
+    
+    # Prompt token budgets (inputs over budget are compacted, then truncated)
+    PROMPT_MAX_CONTEXT_TOKENS: int = 1000  # Question, problem statement, requirements
+    PROMPT_MAX_RESPONSE_TOKENS: int = 1500  # Candidate transcripts and designs
+    PROMPT_MAX_CODE_TOKENS: int = 2000  # Candidate code
+    
+    # Stub LLM backend
+    STUB_LATENCY_DISTRIBUTION: str = "lognormal"  # constant, uniform, normal, lognormal, exponential
+    STUB_LATENCY_MEAN_MS: float = 800.0
+    STUB_LATENCY_STDDEV_MS: float = 300.0
+    STUB_ERROR_RATE: float = 0.0  # Fraction of calls that fail
+    STUB_THROTTLE_RATE: float = 0.0  # Fraction of calls that are throttled
+    STUB_SEED: int = 42
+    
+    # Adaptive LLM concurrency (AIMD) and circuit breaker
+    LLM_INITIAL_CONCURRENCY: int = 8
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_LATENCY_TARGET_SECONDS: float = 10.0  # Calls slower than this shrink the limit
+    LLM_MAX_QUEUE: int = 256  # Callers waiting for a slot beyond this are rejected
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # LLM call accounting
+    LLM_METRICS_PERSIST: bool = True  # Store per-call LLM metrics on each Response row
+    
+    # LLM evaluation cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024  # In-memory LRU size
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None  # e.g. "./llm_cache.db" to persist across restarts
+    LLM_CACHE_SQLITE_MAX_ENTRIES: int = 100000
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
@@ -18,10 +60,41 @@ class Settings(BaseSettings):
     # Audio Processing
     MAX_AUDIO_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     SUPPORTED_AUDIO_FORMATS: list = [".wav", ".mp3", ".m4a", ".flac"]
+    AUDIO_WORKERS: int = 0  # Audio worker processes (0 = min(4, CPU count))
+    AUDIO_TASK_TIMEOUT_SECONDS: float = 120.0
+    AUDIO_MAX_PENDING_TASKS: int = 32  # Uploads beyond this are rejected with 503
+    AUDIO_STORE_DIR: str = "./audio_store"  # Content-addressed recordings
+    AUDIO_STORE_CODEC: Optional[str] = None  # Transcode stored recordings: "flac" (lossless) or "opus"
+    AUDIO_STORE_BITRATE: str = "32k"  # Used by lossy codecs
+    
+    # Audio analysis cache (transcription, features and tone keyed by recording hash)
+    AUDIO_CACHE_ENABLED: bool = True
+    AUDIO_CACHE_MAX_ENTRIES: int = 256
+    AUDIO_CACHE_TTL_SECONDS: Optional[float] = 30 * 24 * 3600
+    AUDIO_CACHE_SQLITE_PATH: Optional[str] = "./audio_cache.db"  # None keeps the cache in memory only
+    AUDIO_CACHE_SQLITE_MAX_ENTRIES: int = 10000
+    
+    # Transcription
+    TRANSCRIPTION_BACKEND: str = "google"  # "google" (network) or "vosk" (offline)
+    TRANSCRIPTION_LANGUAGE: str = "en-US"
+    VOSK_MODEL_PATH: Optional[str] = None  # Unpacked Vosk model directory
+    TRANSCRIPTION_CHUNK_MAX_SECONDS: float = 15.0  # Chunks are cut at pauses and never exceed this
+    TRANSCRIPTION_MAX_PARALLEL_CHUNKS: int = 4  # Concurrent recognizer requests per recording
+    VAD_MIN_SILENCE_MS: int = 400  # Shorter pauses do not split an utterance
+    VAD_MAX_GAP_MS: int = 300  # Longer pauses are shortened to this before transcription
+    STREAM_TRANSCRIPTION_WORKERS: int = 8  # Threads shared by all streamed answers in the API process
+    STREAM_MAX_ACTIVE: int = 16  # Streamed answers beyond this are refused until one ends
     
     # Redis (for caching and Celery)
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Background jobs
+    JOB_QUEUE_BACKEND: str = "inprocess"  # "inprocess", "sqlite" or "redis" (uses REDIS_URL)
+    JOB_QUEUE_SQLITE_PATH: str = "./jobs.db"
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = 600.0  # Unacked SQLite and Redis jobs are redelivered after this
+    JOB_MAX_ATTEMPTS: int = 5  # Deliveries of a job retried on audio pool backpressure before it fails
+    JOB_WORKERS: int = 4  # Worker tasks started with the API (0 = run worker.py separately; needs sqlite or redis)
+    
     # Scoring Weights
     TECHNICAL_ACCURACY_WEIGHT: float = 0.5
     TECHNICAL_TIME_WEIGHT: float = 0.2
@@ -31,6 +104,16 @@ class Settings(BaseSettings):
     BEHAVIORAL_CHATGPT_WEIGHT: float = 0.8
     BEHAVIORAL_TONE_WEIGHT: float = 0.2
     
+    # Time scoring from observed answer durations per question and difficulty
+    DURATION_STATS_ENABLED: bool = True
+    DURATION_STATS_MIN_SAMPLES: int = 20  # Below this, fall back to the difficulty's fixed time range
+    
+    # Startup
+    WARM_UP_ON_STARTUP: bool = True  # Initialize AI/audio services in the background at startup
+    
+    # Score behavioral answers and generate follow-ups in one LLM call
+    BEHAVIORAL_COMBINED_EVALUATION: bool = True
+    
     # Interview Settings
     MAX_INTERVIEW_DURATION: int = 3600  # 1 hour in seconds
     MAX_QUESTIONS_PER_CATEGORY: int = 10
@@ -1,7 +1,14 @@
-from .ai_service import AIService
-from .audio_processor import AudioProcessor
-from .scoring_engine import ScoringEngine
-from .interview_manager import InterviewManager
+# Submodules are imported on first attribute access so that importing one
+# service (e.g. core.ai_service from chat_terminal.py) does not pull in the
+# audio and NLP stacks of the others
+import importlib
+
+_exports = {
+    "AIService": ".ai_service",
+    "AudioProcessor": ".audio_processor",
+    "ScoringEngine": ".scoring_engine",
+    "InterviewManager": ".interview_manager"
+}
 
 __all__ = [
     "AIService",
@@ -9,3 +16,10 @@ __all__ = [
     "ScoringEngine",
     "InterviewManager"
 ]
+
+
+def __getattr__(name):
+    if name in _exports:
+        module = importlib.import_module(_exports[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,208 +1,422 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
 import logging
-import boto3
-import os
-from langchain_aws import BedrockLLM
-from langchain.prompts import PromptTemplate
+import threading
+import time
+from config import settings
+from core.cache import TieredCache
+from core.single_flight import SingleFlight
+from core.llm_backends import LLMBackend, create_llm_backend
+from core.prompts import prompt_registry, estimate_tokens
+from core.metrics import llm_metrics
+from core.concurrency import AdaptiveLimiter, CircuitBreaker, is_throttle_error
 
 logger = logging.getLogger(__name__)
 
 
 class AIService:
-    def __init__(self):
-        # Initialize AWS Bedrock client
-        os.environ["AWS_PROFILE"] = "bokchoy"
-        bedrock_client = boto3.client('bedrock-runtime', region_name='us-west-2')
-        self.bedrock_llm = BedrockLLM(
-            model_id="amazon.titan-tg1-large",
-            client=bedrock_client,
-            model_kwargs={"temperature": 0.5, "maxTokenCount": 4000}
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        # Bedrock by default; settings.LLM_BACKEND="stub" runs fully offline
+        self.backend = backend or create_llm_backend()
+        self.model_id = self.backend.model_id
+        
+        # Backends are synchronous, so calls run on a dedicated thread pool
+        # sized to the in-flight ceiling and never block the event loop
+        self.max_in_flight = settings.BEDROCK_MAX_IN_FLIGHT
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="llm"
         )
+        
+        # The in-flight limit adapts to observed latency and throttling (AIMD),
+        # and the breaker fails fast while the upstream is unhealthy
+        self.limiter = AdaptiveLimiter(
+            initial_limit=settings.LLM_INITIAL_CONCURRENCY,
+            min_limit=settings.LLM_MIN_CONCURRENCY,
+            max_limit=self.max_in_flight,
+            latency_target=settings.LLM_LATENCY_TARGET_SECONDS,
+            max_queue=settings.LLM_MAX_QUEUE,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        
+        self.cache = None
+        if settings.LLM_CACHE_ENABLED:
+            self.cache = TieredCache(
+                namespace="llm_evaluations",
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                sqlite_path=settings.LLM_CACHE_SQLITE_PATH,
+                sqlite_max_entries=settings.LLM_CACHE_SQLITE_MAX_ENTRIES
+            )
+        # Concurrent callers evaluating identical inputs share one Bedrock call
+        self._single_flight = SingleFlight()
     
-    async def chat_with_bedrock(self, input_text: str) -> str:
-        """Chat with Bedrock using the OpenAI GPT model"""
+    async def _acquire(self) -> float:
+        """
+        Pass the circuit breaker and wait for a limiter slot. Returns queue wait.
+        """
+        self.breaker.before_call()
         try:
-            prompt_template = """Human: {input_text}
-
-Assistant: I'll help you with that question."""
+            return await self.limiter.acquire()
+        except BaseException:
+            # Rejected, timed out or cancelled before the call was made
+            self.breaker.release_trial()
+            raise
+    
+    def _release(self, latency: Optional[float], error: Optional[BaseException] = None):
+        throttled = error is not None and is_throttle_error(error)
+        # Fast failures say nothing about spare capacity, so only successes grow the limit
+        self.limiter.release(latency if error is None else None, throttled=throttled)
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+    
+    async def _invoke(self, input_text: str, timings: Optional[Dict[str, float]] = None) -> str:
+        """
+        Run the backend off the event loop, bounded by the adaptive in-flight limit.
+        Queue wait and backend time are written to timings when given.
+        """
+        queue_wait = await self._acquire()
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        try:
+            result = await loop.run_in_executor(self._executor, self.backend.invoke, input_text)
+        except Exception as e:
+            self._release(time.monotonic() - start, e)
+            raise
+        except BaseException:
+            # Cancelled: the call may still finish on its thread, so only hand
+            # back the slots without recording an outcome
+            self.limiter.release()
+            self.breaker.release_trial()
+            raise
+        backend_time = time.monotonic() - start
+        self._release(backend_time)
+        if timings is not None:
+            timings["queue_wait_seconds"] = queue_wait
+            timings["backend_time_seconds"] = backend_time
+        return result
+    
+    async def _stream(self, input_text: str, timings: Optional[Dict[str, float]] = None) -> AsyncIterator[str]:
+        """
+        Yield completion chunks as the backend produces them. The blocking stream is
+        consumed on the executor and handed to the event loop through a queue.
+        Queue wait and backend time are written to timings when the stream completes.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def produce():
+            try:
+                for chunk in self.backend.stream(input_text):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, ("chunk", chunk))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+        
+        queue_wait = await self._acquire()
+        error = None
+        finished = False
+        start = time.monotonic()
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                kind, item = await queue.get()
+                if kind == "done":
+                    finished = True
+                    break
+                if kind == "error":
+                    error = item
+                    raise item
+                yield item
+        finally:
+            # Stop the worker thread early if the consumer went away
+            stop.set()
+            await producer
+            # Stream duration depends on output length, so only errors and
+            # throttling feed back into the limit
+            if error is not None:
+                self._release(None, error)
+            elif finished:
+                self._release(None)
+                if timings is not None:
+                    timings["queue_wait_seconds"] = queue_wait
+                    timings["backend_time_seconds"] = time.monotonic() - start
+            else:
+                self.limiter.release()
+                self.breaker.release_trial()
+    
+    async def stream_chat(self, input_text: str) -> AsyncIterator[str]:
+        """
+        Stream a chat completion chunk by chunk, recorded in llm_metrics as "chat"
+        """
+        start = time.monotonic()
+        call = {"evaluation_type": "chat", "cache_status": "disabled", "outcome": "ok", "streamed": True,
+                "input_tokens": estimate_tokens(input_text)}
+        chunks = []
+        try:
+            async for chunk in self._stream(input_text, call):
+                if not chunks:
+                    call["time_to_first_token_seconds"] = time.monotonic() - start
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            call["outcome"] = type(e).__name__
+            raise
+        except BaseException:
+            # The client went away mid-stream
+            call["outcome"] = "cancelled"
+            raise
+        finally:
+            call["output_tokens"] = estimate_tokens("".join(chunks))
+            call["wall_time_seconds"] = time.monotonic() - start
+            llm_metrics.record(call)
+    
+    async def _cached_evaluation(self, evaluation_type: str, inputs: Dict[str, str]) -> Any:
+        """
+        Return the parsed JSON evaluation for a registered prompt, serving repeats
+        from cache and coalescing concurrent duplicates. The prompt is only
+        rendered on a miss. Failures propagate so that fallback results are never
+        cached. Every call is recorded in llm_metrics.
+        """
+        start = time.monotonic()
+        call = {"evaluation_type": evaluation_type, "cache_status": "miss", "outcome": "ok"}
+        key = self._evaluation_key(evaluation_type, inputs)
+        try:
+            if self.cache is not None:
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    call["cache_status"] = "hit"
+                    return cached
+            else:
+                call["cache_status"] = "disabled"
             
-            prompt = PromptTemplate(
-                input_variables=["input_text"],
-                template=prompt_template
+            (result, call_stats), shared = await self._single_flight.do(
+                key, lambda: self._evaluate_uncached(key, evaluation_type, inputs)
             )
-            
-            chain = prompt | self.bedrock_llm
-            response = chain.invoke({"input_text": input_text})
-            return str(response)
+            if shared:
+                call["cache_status"] = "coalesced"
+            else:
+                call.update(call_stats)
+            return result
+        except Exception as e:
+            call["outcome"] = type(e).__name__
+            raise
+        finally:
+            call["wall_time_seconds"] = time.monotonic() - start
+            llm_metrics.record(call)
+    
+    async def _evaluate_uncached(self, key: str, evaluation_type: str,
+                                 inputs: Dict[str, str]) -> Tuple[Any, Dict[str, Any]]:
+        prompt = prompt_registry.render(evaluation_type, **inputs)
+        call_stats: Dict[str, Any] = {
+            "prompt_version": prompt.version,
+            "input_tokens": prompt.input_tokens,
+            "trimmed_fields": prompt.trimmed_fields
+        }
+        bedrock_response = await self._invoke(prompt.text, call_stats)
+        call_stats["output_tokens"] = estimate_tokens(bedrock_response)
+        result = json.loads(bedrock_response)
+        
+        if self.cache is not None:
+            await self.cache.aset(key, result)
+        return result, call_stats
+    
+    def _evaluation_key(self, evaluation_type: str, inputs: Dict[str, str]) -> str:
+        return TieredCache.make_key(self.model_id, evaluation_type, prompt_registry.version(evaluation_type), inputs)
+    
+    async def warm_up(self):
+        """
+        Pre-open pooled connections to the backend
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.backend.warm_up)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters for the evaluation cache and in-flight deduplication
+        """
+        if self.cache is None:
+            return {"enabled": False, "single_flight": self._single_flight.stats()}
+        return {"enabled": True, **self.cache.stats(), "single_flight": self._single_flight.stats()}
+    
+    def concurrency_stats(self) -> Dict[str, Any]:
+        """
+        Adaptive limiter and circuit breaker state
+        """
+        return {"limiter": self.limiter.stats(), "circuit_breaker": self.breaker.stats()}
+    
+    def close(self):
+        """
+        Release the Bedrock worker threads
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def chat_with_bedrock(self, input_text: str) -> str:
+        """Chat with Bedrock using the OpenAI GPT model"""
+        try:
+            return await self._invoke(input_text)
         except Exception as e:
             logger.error(f"Bedrock error: {e}")
             return f"Error: {str(e)}"
     
+    def _behavioral_fallback(self) -> Dict[str, Any]:
+        return {
+            "score": 0,
+            "feedback": "Error in evaluation",
+            "strengths": [],
+            "areas_for_improvement": [],
+            "key_points_covered": [],
+            "missing_points": []
+        }
+    
     async def evaluate_behavioral_response(self, question: str, response: str, key_points: List[str]) -> Dict[str, Any]:
         """
         Evaluate behavioral response using ChatGPT
         """
         try:
-            prompt = f"""
-            You are an expert interviewer evaluating a behavioral response.
-            
-            Question: {question}
-            Key points to evaluate: {', '.join(key_points)}
+            return await self._cached_evaluation("behavioral", {
+                "question": question,
+                "response": response,
+                "key_points": ", ".join(key_points)
+            })
             
-            Candidate Response: {response}
-            
-            Please evaluate this response on a scale of 0-100 based on:
-            1. Relevance to the question
-            2. Specificity and detail
-            3. STAR method usage (Situation, Task, Action, Result)
-            4. Communication clarity
-            5. Professionalism
-            
-            Provide your evaluation in the following JSON format:
-            {{
-                "score": <0-100>,
-                "feedback": "<detailed feedback>",
-                "strengths": ["<strength1>", "<strength2>"],
-                "areas_for_improvement": ["<area1>", "<area2>"],
-                "key_points_covered": ["<point1>", "<point2>"],
-                "missing_points": ["<missing_point1>", "<missing_point2>"]
-            }}
-            """
-            
-            bedrock_response = await self.chat_with_bedrock(prompt)
-            result = json.loads(bedrock_response)
+        except Exception as e:
+            logger.error(f"Error evaluating behavioral response: {e}")
+            return self._behavioral_fallback()
+    
+    async def evaluate_behavioral_with_follow_ups(self, question: str, response: str, key_points: List[str],
+                                                  original_follow_ups: List[str]) -> Dict[str, Any]:
+        """
+        Evaluate a behavioral response and generate contextual follow-up questions
+        in a single LLM call. The result has the evaluate_behavioral_response
+        fields plus "follow_up_questions".
+        """
+        try:
+            result = await self._cached_evaluation("behavioral_combined", {
+                "question": question,
+                "response": response,
+                "key_points": ", ".join(key_points),
+                "original_follow_ups": str(original_follow_ups)
+            })
+            follow_ups = result.get("follow_up_questions")
+            if not isinstance(follow_ups, list) or not all(isinstance(q, str) for q in follow_ups):
+                result["follow_up_questions"] = original_follow_ups
             return result
             
         except Exception as e:
-            logger.error(f"Error evaluating behavioral response: {e}")
-            return {
-                "score": 0,
-                "feedback": "Error in evaluation",
-                "strengths": [],
-                "areas_for_improvement": [],
-                "key_points_covered": [],
-                "missing_points": []
-            }
+            logger.error(f"Error evaluating behavioral response with follow-ups: {e}")
+            return {**self._behavioral_fallback(), "follow_up_questions": original_follow_ups}
     
     async def generate_follow_up_questions(self, question: str, response: str, original_follow_ups: List[str]) -> List[str]:
         """
         Generate contextual follow-up questions based on the response
         """
         try:
-            prompt = f"""
-            Based on the original question and the candidate's response, generate 2-3 relevant follow-up questions.
-            
-            Original Question: {question}
-            Candidate Response: {response}
-            Original Follow-up Questions: {original_follow_ups}
-            
-            Generate follow-up questions that:
-            1. Probe deeper into the candidate's experience
-            2. Ask for specific examples or details
-            3. Challenge assumptions or explore edge cases
-            4. Are relevant to the candidate's response
-            
-            Return as a JSON array of strings.
-            """
-            
-            bedrock_response = await self.chat_with_bedrock(prompt)
-            follow_ups = json.loads(bedrock_response)
+            follow_ups = await self._cached_evaluation("follow_up", {
+                "question": question,
+                "response": response,
+                "original_follow_ups": str(original_follow_ups)
+            })
             return follow_ups if isinstance(follow_ups, list) else []
             
         except Exception as e:
             logger.error(f"Error generating follow-up questions: {e}")
             return original_follow_ups
     
+    def _technical_fallback(self) -> Dict[str, Any]:
+        return {
+            "overall_score": 0,
+            "correctness_score": 0,
+            "time_complexity_score": 0,
+            "optimality_score": 0,
+            "process_score": 0,
+            "feedback": "Error in evaluation",
+            "time_complexity": "Unknown",
+            "space_complexity": "Unknown",
+            "issues": [],
+            "suggestions": []
+        }
+    
     async def evaluate_technical_solution(self, problem: str, solution: str, expected_output: str) -> Dict[str, Any]:
         """
         Evaluate technical solution using ChatGPT
         """
         try:
-            prompt = f"""
-            You are an expert technical interviewer evaluating a coding solution.
-            
-            Problem: {problem}
-            Candidate Solution: {solution}
-            Expected Output: {expected_output}
-            
-            Please evaluate this solution on a scale of 0-100 based on:
-            1. Correctness (50% weight)
-            2. Time complexity (20% weight)
-            3. Code quality and optimality (20% weight)
-            4. Problem-solving approach (10% weight)
-            
-            Provide your evaluation in the following JSON format:
-            {{
-                "overall_score": <0-100>,
-                "correctness_score": <0-100>,
-                "time_complexity_score": <0-100>,
-                "optimality_score": <0-100>,
-                "process_score": <0-100>,
-                "feedback": "<detailed feedback>",
-                "time_complexity": "<O(n), O(n^2), etc.>",
-                "space_complexity": "<O(1), O(n), etc.>",
-                "issues": ["<issue1>", "<issue2>"],
-                "suggestions": ["<suggestion1>", "<suggestion2>"]
-            }}
-            """
-            
-            bedrock_response = await self.chat_with_bedrock(prompt)
-            result = json.loads(bedrock_response)
-            return result
+            return await self._cached_evaluation("technical", {
+                "problem": problem,
+                "solution": solution,
+                "expected_output": expected_output
+            })
             
         except Exception as e:
             logger.error(f"Error evaluating technical solution: {e}")
-            return {
-                "overall_score": 0,
-                "correctness_score": 0,
-                "time_complexity_score": 0,
-                "optimality_score": 0,
-                "process_score": 0,
-                "feedback": "Error in evaluation",
-                "time_complexity": "Unknown",
-                "space_complexity": "Unknown",
-                "issues": [],
-                "suggestions": []
-            }
+            return self._technical_fallback()
+    
+    async def stream_technical_solution(self, problem: str, solution: str,
+                                        expected_output: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Evaluate a technical solution, yielding ("token", text) events as the
+        completion is generated and a final ("evaluation", dict) event
+        """
+        inputs = {"problem": problem, "solution": solution, "expected_output": expected_output}
+        key = self._evaluation_key("technical", inputs)
+        start = time.monotonic()
+        call = {"evaluation_type": "technical", "cache_status": "miss", "outcome": "ok", "streamed": True}
+        
+        if self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                call["cache_status"] = "hit"
+                call["wall_time_seconds"] = time.monotonic() - start
+                llm_metrics.record(call)
+                yield "evaluation", cached
+                return
+        
+        chunks = []
+        try:
+            prompt = prompt_registry.render("technical", **inputs)
+            call.update(prompt_version=prompt.version, input_tokens=prompt.input_tokens,
+                        trimmed_fields=prompt.trimmed_fields)
+            async for chunk in self._stream(prompt.text, call):
+                if not chunks:
+                    call["time_to_first_token_seconds"] = time.monotonic() - start
+                chunks.append(chunk)
+                yield "token", chunk
+            completion = "".join(chunks)
+            call["output_tokens"] = estimate_tokens(completion)
+            result = json.loads(completion)
+            if self.cache is not None:
+                await self.cache.aset(key, result)
+        except Exception as e:
+            logger.error(f"Error streaming technical evaluation: {e}")
+            call["outcome"] = type(e).__name__
+            result = self._technical_fallback()
+        
+        call["wall_time_seconds"] = time.monotonic() - start
+        llm_metrics.record(call)
+        yield "evaluation", result
     
     async def evaluate_system_design(self, requirements: str, design: str) -> Dict[str, Any]:
         """
         Evaluate system design response
         """
         try:
-            prompt = f"""
-            You are an expert system design interviewer evaluating a design solution.
-            
-            Requirements: {requirements}
-            Candidate Design: {design}
-            
-            Please evaluate this design on a scale of 0-100 based on:
-            1. Completeness of the design (30% weight)
-            2. Scalability considerations (25% weight)
-            3. Technical feasibility (20% weight)
-            4. Trade-offs understanding (15% weight)
-            5. Communication clarity (10% weight)
-            
-            Provide your evaluation in the following JSON format:
-            {{
-                "overall_score": <0-100>,
-                "completeness_score": <0-100>,
-                "scalability_score": <0-100>,
-                "feasibility_score": <0-100>,
-                "trade_offs_score": <0-100>,
-                "communication_score": <0-100>,
-                "feedback": "<detailed feedback>",
-                "strengths": ["<strength1>", "<strength2>"],
-                "weaknesses": ["<weakness1>", "<weakness2>"],
-                "missing_components": ["<component1>", "<component2>"],
-                "improvements": ["<improvement1>", "<improvement2>"]
-            }}
-            """
-            
-            bedrock_response = await self.chat_with_bedrock(prompt)
-            result = json.loads(bedrock_response)
-            return result
+            return await self._cached_evaluation("system_design", {
+                "requirements": requirements,
+                "design": design
+            })
             
         except Exception as e:
             logger.error(f"Error evaluating system design: {e}")
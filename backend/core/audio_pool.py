@@ -0,0 +1,121 @@
+from typing import Any, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger(__name__)
+
+# Version of the analysis the workers produce. Bump it whenever decoding, VAD,
+# transcription, prosody or tone output changes so cached analyses are redone.
+ANALYZER_VERSION = "4"
+
+# One AudioProcessor per worker process, built by the pool initializer so that
+# models and corpora stay resident between tasks
+_worker_processor = None
+
+
+def _init_worker():
+    global _worker_processor
+    from core.audio_processor import AudioProcessor
+    _worker_processor = AudioProcessor()
+    _worker_processor.warm_up()
+
+
+def _process_in_worker(file_path: str) -> Dict[str, Any]:
+    return _worker_processor.process_audio_file(file_path)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class AudioPoolBusyError(Exception):
+    """Raised when too many audio tasks are already pending"""
+    pass
+
+
+class AudioProcessingTimeout(Exception):
+    """Raised when an audio task exceeds its time budget"""
+    pass
+
+
+class AudioWorkerPool:
+    """
+    Runs CPU-bound audio decoding, feature extraction, transcription and tone
+    analysis in a process pool so they never block the event loop. Pending
+    tasks are capped (backpressure) and each task has a timeout.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, task_timeout: float = 120.0, max_pending: int = 32):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.task_timeout = task_timeout
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn rather than fork: the parent already runs executor threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    async def process(self, file_path: str) -> Dict[str, Any]:
+        """
+        Process an audio file in a worker. Raises AudioPoolBusyError when the
+        pool is saturated and AudioProcessingTimeout when the task overruns.
+        """
+        if self._pending >= self.max_pending:
+            self._stats["rejected"] += 1
+            raise AudioPoolBusyError("Audio processing is at capacity, retry shortly")
+
+        self._pending += 1
+        future = None
+        try:
+            future = self._get_executor().submit(_process_in_worker, file_path)
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.task_timeout)
+            self._stats["completed"] += 1
+            return result
+        except asyncio.TimeoutError:
+            # A task that already started keeps its worker until it finishes;
+            # the caller is released either way
+            self._stats["timed_out"] += 1
+            raise AudioProcessingTimeout(f"Audio processing exceeded {self.task_timeout:.0f}s")
+        except BrokenProcessPool:
+            self._stats["failed"] += 1
+            logger.error("Audio worker pool broke; it will be recreated on the next task")
+            self._reset()
+            raise
+        finally:
+            self._pending -= 1
+
+    async def warm_up(self):
+        """
+        Start every worker process so the first uploads do not pay for spawning
+        and model loading
+        """
+        executor = self._get_executor()
+        futures = [asyncio.wrap_future(executor.submit(_ping)) for _ in range(self.max_workers)]
+        pids = await asyncio.gather(*futures)
+        logger.info(f"Audio worker pool ready ({len(set(pids))} processes)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": self._pending, "max_pending": self.max_pending,
+                "workers": self.max_workers}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _reset(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
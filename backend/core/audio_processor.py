@@ -1,19 +1,68 @@
-import speech_recognition as sr
 from pydub import AudioSegment
 import os
-import tempfile
 import logging
-from typing import Dict, Any, Optional
-from textblob import TextBlob
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 
+from config import settings
+from core.prosody import extract_prosody
+from core.tone_analyzer import ToneAnalyzer
+from core.transcription import Transcriber, TranscriptionError, create_transcriber
+from core.vad import compact_chunk, detect_speech_segments, plan_chunks
+from core.wav import block_rms, memmap_pcm16, read_wav_layout
+
 logger = logging.getLogger(__name__)
 
 
+class DecodedAudio:
+    """
+    Mono 16-bit PCM decoded once from an audio file. Feature extraction,
+    transcription and analysis all read from this buffer. 16-bit PCM WAV
+    files are memory-mapped instead of decoded.
+    """
+    
+    SAMPLE_WIDTH = 2
+    
+    def __init__(self, samples: np.ndarray, sample_rate: int, source_channels: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.source_channels = source_channels
+    
+    @classmethod
+    def from_file(cls, file_path: str) -> "DecodedAudio":
+        layout = read_wav_layout(file_path) if file_path.lower().endswith(".wav") else None
+        if layout is not None and layout.is_pcm16:
+            return cls(memmap_pcm16(file_path, layout), layout.sample_rate, layout.channels)
+        
+        segment = AudioSegment.from_file(file_path)
+        source_channels = segment.channels
+        segment = segment.set_sample_width(cls.SAMPLE_WIDTH).set_channels(1)
+        samples = np.frombuffer(segment.raw_data, dtype=np.int16)
+        return cls(samples, segment.frame_rate, source_channels)
+    
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+
 class AudioProcessor:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.supported_formats = ['.wav', '.mp3', '.m4a', '.flac']
+    def __init__(self, transcriber: Optional[Transcriber] = None):
+        self.transcriber = transcriber or create_transcriber()
+        self.tone_analyzer = ToneAnalyzer()
+        self.supported_formats = ['.wav', '.mp3', '.m4a', '.flac', '.opus']
+        # Recognizer requests are network-bound, so chunks are sent from threads
+        self._transcription_executor = ThreadPoolExecutor(
+            max_workers=settings.TRANSCRIPTION_MAX_PARALLEL_CHUNKS,
+            thread_name_prefix="transcribe"
+        )
+    
+    def warm_up(self):
+        """
+        Load the speech model ahead of the first request
+        """
+        self.transcriber.warm_up()
     
     def process_audio_file(self, file_path: str) -> Dict[str, Any]:
         """
@@ -25,24 +74,21 @@ class AudioProcessor:
             if file_ext not in self.supported_formats:
                 raise ValueError(f"Unsupported audio format: {file_ext}")
             
-            # Convert to WAV if needed
-            wav_path = self._convert_to_wav(file_path)
+            # Decode once; every later stage reads the in-memory PCM buffer
+            audio = DecodedAudio.from_file(file_path)
             
             # Extract audio features
-            audio_features = self._extract_audio_features(wav_path)
+            audio_features = self._extract_audio_features(audio)
             
             # Transcribe audio
-            transcription = self._transcribe_audio(wav_path)
+            transcription, transcription_chunks = self._transcribe_audio(audio)
             
             # Analyze tone and sentiment
             tone_analysis = self._analyze_tone(transcription)
             
-            # Clean up temporary file
-            if wav_path != file_path:
-                os.remove(wav_path)
-            
             return {
                 "transcription": transcription,
+                "transcription_chunks": transcription_chunks,
                 "audio_features": audio_features,
                 "tone_analysis": tone_analysis,
                 "success": True
@@ -52,149 +98,109 @@ class AudioProcessor:
             logger.error(f"Error processing audio file: {e}")
             return {
                 "transcription": "",
+                "transcription_chunks": [],
                 "audio_features": {},
                 "tone_analysis": {},
                 "success": False,
                 "error": str(e)
             }
     
-    def _convert_to_wav(self, file_path: str) -> str:
-        """
-        Convert audio file to WAV format for processing
-        """
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
-        if file_ext == '.wav':
-            return file_path
-        
-        # Convert to WAV
-        audio = AudioSegment.from_file(file_path)
-        temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        audio.export(temp_wav.name, format='wav')
-        
-        return temp_wav.name
-    
-    def _extract_audio_features(self, wav_path: str) -> Dict[str, Any]:
+    def _extract_audio_features(self, audio: DecodedAudio) -> Dict[str, Any]:
         """
         Extract audio features like duration, volume, etc.
         """
         try:
-            audio = AudioSegment.from_wav(wav_path)
+            samples = audio.samples
             
             # Calculate features
-            duration_ms = len(audio)
-            duration_seconds = duration_ms / 1000
-            
-            # Calculate average volume
-            samples = np.array(audio.get_array_of_samples())
-            if audio.channels == 2:
-                samples = samples.reshape((-1, 2))
+            duration_seconds = audio.duration_seconds
+            duration_ms = int(duration_seconds * 1000)
             
-            volume_db = audio.dBFS
-            volume_linear = 10 ** (volume_db / 20)
+            # Calculate average volume (RMS relative to 16-bit full scale)
+            rms = block_rms(samples)
+            volume_db = 20 * np.log10(rms / 32768) if rms > 0 else float("-inf")
+            volume_linear = rms / 32768
             
-            # Calculate speech rate (approximate)
-            # This is a rough estimate based on average words per minute
-            word_count = len(samples) // 16000  # Rough estimate
-            speech_rate = word_count / (duration_seconds / 60) if duration_seconds > 0 else 0
+            # Pauses, pitch, speaking rate and filled pauses
+            prosody = extract_prosody(samples, audio.sample_rate)
             
             return {
                 "duration_seconds": duration_seconds,
                 "duration_ms": duration_ms,
-                "volume_db": volume_db,
+                "volume_db": float(volume_db),
                 "volume_linear": volume_linear,
-                "sample_rate": audio.frame_rate,
-                "channels": audio.channels,
-                "speech_rate_estimate": speech_rate
+                "sample_rate": audio.sample_rate,
+                "channels": audio.source_channels,
+                "speech_rate_estimate": prosody["words_per_minute_estimate"],
+                "prosody": prosody
             }
             
         except Exception as e:
             logger.error(f"Error extracting audio features: {e}")
             return {}
     
-    def _transcribe_audio(self, wav_path: str) -> str:
+    def _transcribe_audio(self, audio: DecodedAudio) -> Tuple[str, List[Dict[str, Any]]]:
         """
-        Transcribe audio to text using speech recognition
+        Transcribe audio to text using speech recognition. The recording is cut
+        into utterance chunks at pauses; leading and trailing silence is dropped
+        and long pauses inside a chunk are shortened before it is sent. Chunks
+        are transcribed concurrently and their text is joined in order.
+        Returns (transcription, chunks).
         """
         try:
-            with sr.AudioFile(wav_path) as source:
-                audio = self.recognizer.record(source)
-                
-            # Use Google Speech Recognition
-            transcription = self.recognizer.recognize_google(audio)
-            return transcription
-            
-        except sr.UnknownValueError:
-            logger.warning("Speech recognition could not understand audio")
-            return ""
-        except sr.RequestError as e:
-            logger.error(f"Speech recognition service error: {e}")
-            return ""
+            segments = detect_speech_segments(
+                audio.samples, audio.sample_rate, min_silence_ms=settings.VAD_MIN_SILENCE_MS
+            )
+            if not segments and audio.samples.any():
+                # No clear pauses or speech above the noise floor; send it all
+                segments = [(0, len(audio.samples))]
+            chunks = plan_chunks(segments, audio.sample_rate, settings.TRANSCRIPTION_CHUNK_MAX_SECONDS,
+                                 max_gap_ms=settings.VAD_MAX_GAP_MS)
+            
+            results = list(self._transcription_executor.map(
+                lambda chunk: self._transcribe_chunk(audio, chunk), chunks
+            ))
+            if results and all(result["status"] == "error" for result in results):
+                raise TranscriptionError(results[0]["error"])
+            transcription = " ".join(result["text"] for result in results if result["text"])
+            return transcription, results
+            
+        except TranscriptionError:
+            raise
         except Exception as e:
             logger.error(f"Error transcribing audio: {e}")
-            return ""
+            return "", []
+    
+    def _transcribe_chunk(self, audio: DecodedAudio, chunk: List[Tuple[int, int]]) -> Dict[str, Any]:
+        """
+        Transcribe one chunk of speech segments with the configured backend
+        """
+        samples = compact_chunk(audio.samples, chunk, audio.sample_rate, max_gap_ms=settings.VAD_MAX_GAP_MS)
+        result = {
+            "start_seconds": round(chunk[0][0] / audio.sample_rate, 3),
+            "end_seconds": round(chunk[-1][1] / audio.sample_rate, 3),
+            "seconds_sent": round(len(samples) / audio.sample_rate, 3),
+            "text": "",
+            "status": "ok"
+        }
+        request_start = time.perf_counter()
+        try:
+            result["text"] = self.transcriber.transcribe(samples, audio.sample_rate)
+            if not result["text"]:
+                result["status"] = "unintelligible"
+        except Exception as e:
+            logger.error(f"Error transcribing audio chunk: {e}")
+            result["status"] = "error"
+            result["error"] = str(e)
+        result["latency_seconds"] = round(time.perf_counter() - request_start, 3)
+        return result
     
     def _analyze_tone(self, text: str) -> Dict[str, Any]:
         """
         Analyze tone and sentiment of transcribed text
         """
-        if not text.strip():
-            return {
-                "sentiment": "neutral",
-                "sentiment_score": 0.0,
-                "confidence": 0.0,
-                "clarity_score": 0.0,
-                "professionalism_score": 0.0
-            }
-        
         try:
-            # Use TextBlob for sentiment analysis
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            sentiment_subjectivity = blob.sentiment.subjectivity
-            
-            # Determine sentiment category
-            if sentiment_score > 0.1:
-                sentiment = "positive"
-            elif sentiment_score < -0.1:
-                sentiment = "negative"
-            else:
-                sentiment = "neutral"
-            
-            # Calculate clarity score (based on sentence structure)
-            sentences = blob.sentences
-            avg_sentence_length = np.mean([len(sentence.words) for sentence in sentences]) if sentences else 0
-            
-            # Clarity score based on sentence length (optimal: 15-20 words)
-            if 10 <= avg_sentence_length <= 25:
-                clarity_score = 1.0
-            elif 5 <= avg_sentence_length <= 30:
-                clarity_score = 0.8
-            else:
-                clarity_score = 0.5
-            
-            # Professionalism score (based on word choice and structure)
-            professional_words = [
-                "experience", "responsibility", "leadership", "collaboration",
-                "achievement", "solution", "strategy", "implementation",
-                "analysis", "development", "management", "coordination"
-            ]
-            
-            text_lower = text.lower()
-            professional_word_count = sum(1 for word in professional_words if word in text_lower)
-            total_words = len(text.split())
-            professionalism_score = min(1.0, professional_word_count / max(total_words, 1) * 10)
-            
-            return {
-                "sentiment": sentiment,
-                "sentiment_score": sentiment_score,
-                "sentiment_subjectivity": sentiment_subjectivity,
-                "clarity_score": clarity_score,
-                "professionalism_score": professionalism_score,
-                "avg_sentence_length": avg_sentence_length,
-                "total_words": total_words,
-                "professional_word_count": professional_word_count
-            }
+            return self.tone_analyzer.analyze(text)
             
         except Exception as e:
             logger.error(f"Error analyzing tone: {e}")
@@ -0,0 +1,229 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Interview, InterviewSession, Response, Score
+from models.interview import InterviewType
+from core.scoring_engine import GRADE_CUTOFFS, ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+# Stored raw component columns per scoring method, keyed by weight name
+TECHNICAL_COMPONENTS = {
+    "accuracy": Score.accuracy_score,
+    "time": Score.time_score,
+    "optimality": Score.optimality_score,
+    "process": Score.process_score
+}
+BEHAVIORAL_COMPONENTS = {
+    "chatgpt": Score.chatgpt_score,
+    "tone": Score.tone_score
+}
+
+_GRADE_LABELS = np.array(["F"] + [grade for _, grade in reversed(GRADE_CUTOFFS)])
+_GRADE_EDGES = np.array([cutoff for cutoff, _ in reversed(GRADE_CUTOFFS)], dtype=float)
+
+
+def grade_scores(totals: np.ndarray) -> np.ndarray:
+    """
+    Letter grades for an array of scores, matching ScoringEngine.get_score_grade
+    """
+    return _GRADE_LABELS[np.searchsorted(_GRADE_EDGES, totals, side="right")]
+
+
+def breakdown_differs(stored: Optional[Dict[str, Any]], breakdown: Dict[str, float]) -> bool:
+    """
+    Whether a stored score breakdown differs from a recomputed one
+    """
+    if not isinstance(stored, dict) or stored.keys() != breakdown.keys():
+        return True
+    try:
+        return not np.allclose([float(stored[name]) for name in breakdown], list(breakdown.values()))
+    except (TypeError, ValueError):
+        return True
+
+
+def weighted_totals(raw: np.ndarray, weights: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Weighted components and rounded totals for an (n, components) array of
+    raw scores; missing components count as 0 like the per-response path
+    """
+    weighted = np.nan_to_num(raw, nan=0.0) * weights
+    return {"weighted": weighted, "totals": np.round(weighted.sum(axis=1), 2)}
+
+
+class BatchRescorer:
+    """
+    Recompute stored scores after the scoring weights change. Raw component
+    scores are read from Score rows in primary-key batches, totals and
+    weighted breakdowns are computed as NumPy arrays and written back with
+    bulk updates, then session and interview aggregates are rebuilt the
+    same way. Only the weights change; raw component scores are kept.
+    """
+
+    def __init__(self, scoring_engine: Optional[ScoringEngine] = None, batch_size: int = 50000):
+        self.scoring_engine = scoring_engine or ScoringEngine()
+        self.batch_size = batch_size
+
+    def rescore(self, db: Session, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Rescore every technical and behavioral Score row and refresh the
+        aggregates built from them. With dry_run nothing is written.
+        """
+        start = time.perf_counter()
+        grades: Dict[str, int] = {}
+        stats = {"scores": 0, "changed": 0, "responses": 0}
+        for method, components, weights in (
+            ("technical", TECHNICAL_COMPONENTS, self.scoring_engine.technical_weights),
+            ("behavioral", BEHAVIORAL_COMPONENTS, self.scoring_engine.behavioral_weights)
+        ):
+            for batch, breakdowns in self._iter_score_batches(db, method, components):
+                result = self._rescore_batch(db, batch, breakdowns, list(components), weights, dry_run)
+                stats["scores"] += result["scores"]
+                stats["changed"] += result["changed"]
+                stats["responses"] += result["responses"]
+                labels, counts = np.unique(result["grades"], return_counts=True)
+                for label, count in zip(labels.tolist(), counts.tolist()):
+                    grades[label] = grades.get(label, 0) + count
+            if not dry_run:
+                db.commit()
+
+        stats["grades"] = grades
+        stats.update(self._rescore_aggregates(db, dry_run))
+        if not dry_run:
+            db.commit()
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Rescored {stats['scores']} scores ({stats['changed']} changed) in {stats['seconds']}s")
+        return stats
+
+    def _iter_score_batches(self, db: Session, method: str,
+                            components: Dict[str, Any]) -> Iterator[Tuple[np.ndarray, List[Any]]]:
+        """
+        Rows of (score id, response id, total, response score, *raw components)
+        as float arrays with the stored response breakdowns, paging by primary
+        key so no batch holds more than batch_size rows
+        """
+        last_id = 0
+        while True:
+            rows = db.query(Score.id, Response.id, Score.total_score, Response.score, *components.values(),
+                            Response.score_breakdown).outerjoin(
+                Response, Score.response_id == Response.id
+            ).filter(
+                Score.scoring_method == method, Score.id > last_id
+            ).order_by(Score.id).limit(self.batch_size).all()
+            if not rows:
+                return
+            # None becomes NaN for missing components
+            batch = np.array([row[:-1] for row in rows], dtype=float)
+            last_id = int(batch[-1, 0])
+            yield batch, [row[-1] for row in rows]
+
+    def _rescore_batch(self, db: Session, batch: np.ndarray, breakdowns: List[Any], names: List[str],
+                       weights: Dict[str, float], dry_run: bool) -> Dict[str, Any]:
+        score_ids = batch[:, 0].astype(np.int64)
+        response_ids = batch[:, 1]
+        old_totals = batch[:, 2]
+        response_totals = batch[:, 3]
+        result = weighted_totals(batch[:, 4:], np.array([weights[name] for name in names]))
+        totals, weighted = result["totals"], result["weighted"]
+
+        changed = ~np.isclose(old_totals, totals) | np.isnan(old_totals)
+        # Responses are rewritten when their score or breakdown is stale, even
+        # if the Score row's total already matches
+        stale = ~np.isclose(response_totals, totals) | np.isnan(response_totals)
+        has_response = ~np.isnan(response_ids)
+        response_updates = []
+        for index in np.flatnonzero(has_response).tolist():
+            breakdown = dict(zip(names, weighted[index].tolist()))
+            if stale[index] or breakdown_differs(breakdowns[index], breakdown):
+                response_updates.append({"id": int(response_ids[index]), "score": float(totals[index]),
+                                         "score_breakdown": breakdown})
+
+        if not dry_run:
+            if changed.any():
+                db.bulk_update_mappings(Score, [
+                    {"id": score_id, "total_score": total}
+                    for score_id, total in zip(score_ids[changed].tolist(), totals[changed].tolist())
+                ])
+            if response_updates:
+                db.bulk_update_mappings(Response, response_updates)
+
+        return {"scores": len(score_ids), "changed": int(changed.sum()), "responses": len(response_updates),
+                "grades": grade_scores(totals)}
+
+    def _rescore_aggregates(self, db: Session, dry_run: bool) -> Dict[str, int]:
+        """
+        Session scores (mean response score, unscored responses count as 0,
+        as in end_interview_session) and overall interview scores (mean of
+        the first technical and behavioral session), for aggregates that
+        have already been computed
+        """
+        session_ids = np.array(
+            db.query(InterviewSession.id).filter(InterviewSession.session_score.isnot(None)).all(),
+            dtype=np.int64
+        ).ravel()
+        if not len(session_ids):
+            return {"sessions": 0, "interviews": 0}
+
+        # Sum and count response scores per session id in batches
+        size = int(session_ids.max()) + 1
+        sums = np.zeros(size)
+        counts = np.zeros(size)
+        last_id = 0
+        while True:
+            rows = db.query(Response.id, Response.session_id, Response.score).filter(
+                Response.id > last_id, Response.session_id.isnot(None), Response.session_id < size
+            ).order_by(Response.id).limit(self.batch_size).all()
+            if not rows:
+                break
+            batch = np.array(rows, dtype=float)
+            last_id = int(batch[-1, 0])
+            ids = batch[:, 1].astype(np.int64)
+            sums += np.bincount(ids, weights=np.nan_to_num(batch[:, 2], nan=0.0), minlength=size)
+            counts += np.bincount(ids, minlength=size)
+
+        answered = counts[session_ids] > 0
+        session_scores = np.round(sums[session_ids[answered]] / counts[session_ids[answered]], 2)
+        if not dry_run:
+            db.bulk_update_mappings(InterviewSession, [
+                {"id": session_id, "session_score": score}
+                for session_id, score in zip(session_ids[answered].tolist(), session_scores.tolist())
+            ])
+            db.flush()
+
+        return {"sessions": int(answered.sum()), "interviews": self._rescore_interviews(db, dry_run)}
+
+    def _rescore_interviews(self, db: Session, dry_run: bool) -> int:
+        scored = select(Interview.id).where(Interview.overall_score.isnot(None))
+        interview_ids = db.scalars(scored).all()
+        if not interview_ids:
+            return 0
+        rows = db.query(InterviewSession.interview_id, InterviewSession.session_type,
+                        InterviewSession.session_score).filter(
+            InterviewSession.interview_id.in_(scored)
+        ).order_by(InterviewSession.id).all()
+
+        overall = []
+        for session_type in (InterviewType.TECHNICAL, InterviewType.BEHAVIORAL):
+            typed = np.array([(interview_id, score if score is not None else 0.0)
+                              for interview_id, kind, score in rows if kind == session_type],
+                             dtype=float).reshape(-1, 2)
+            # The first session of each type counts, as in get_interview_summary
+            ids, first = np.unique(typed[:, 0].astype(np.int64), return_index=True)
+            scores = np.full(max(interview_ids) + 1, np.nan)
+            scores[ids] = typed[first, 1]
+            overall.append(scores)
+
+        totals = np.round((overall[0] + overall[1]) / 2, 2)
+        ids = np.array(interview_ids)
+        ids = ids[~np.isnan(totals[ids])]
+        if not dry_run:
+            db.bulk_update_mappings(Interview, [
+                {"id": interview_id, "overall_score": total}
+                for interview_id, total in zip(ids.tolist(), totals[ids].tolist())
+            ])
+        return len(ids)
@@ -0,0 +1,185 @@
+from typing import Iterator, Optional, Tuple
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Export arguments per storage codec: (extension, pydub export kwargs)
+CODECS = {
+    "flac": (".flac", {"format": "flac"}),
+    "opus": (".opus", {"format": "opus", "codec": "libopus", "parameters": ["-application", "voip"]})
+}
+# Storage codecs whose output depends on the bitrate
+LOSSY_CODECS = ("opus",)
+
+AUDIO_MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".flac": "audio/flac",
+    ".opus": "audio/ogg"
+}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalBlobStore:
+    """
+    Content-addressed file store on the local filesystem. Blobs are keyed by
+    the SHA-256 of the content as uploaded, so identical uploads are stored
+    once; a blob may later be transcoded in place to a compact codec while
+    keeping its key. Files live under root/<key[:2]>/<key><extension>.
+    """
+
+    # Striped locks serializing transcodes of the same key within a process
+    LOCK_STRIPES = 64
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._locks[int(key[:8], 16) % self.LOCK_STRIPES]
+
+    def _shard(self, key: str) -> str:
+        return os.path.join(self.root, key[:2])
+
+    def locate(self, key: str) -> Optional[str]:
+        """
+        Path of the blob stored under key, or None if there is none
+        """
+        shard = self._shard(key)
+        try:
+            names = os.listdir(shard)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(key) and not name.endswith(".tmp"):
+                return os.path.join(shard, name)
+        return None
+
+    def put_file(self, path: str, extension: str) -> Tuple[str, str, bool]:
+        """
+        Move a file into the store. Returns (key, stored_path, deduplicated);
+        when identical content is already stored the file is discarded.
+        """
+        key = file_sha256(path)
+        existing = self.locate(key)
+        if existing is not None:
+            os.remove(path)
+            return key, existing, True
+
+        shard = self._shard(key)
+        os.makedirs(shard, exist_ok=True)
+        target = os.path.join(shard, key + extension)
+        # Move next to the target under a unique name so concurrent uploads of
+        # the same content never share a temp file, then rename atomically
+        fd, temp_target = tempfile.mkstemp(suffix=".tmp", dir=shard)
+        os.close(fd)
+        try:
+            shutil.move(path, temp_target)
+            # Another upload of the same content may have landed meanwhile
+            existing = self.locate(key)
+            if existing is not None:
+                os.remove(temp_target)
+                return key, existing, True
+            os.replace(temp_target, target)
+        except BaseException:
+            if os.path.exists(temp_target):
+                os.remove(temp_target)
+            raise
+        return key, target, False
+
+    def transcode(self, key: str, codec: str, bitrate: Optional[str] = None) -> str:
+        """
+        Re-encode a blob with a storage codec ("flac" or "opus") and replace
+        the original. Returns the new path. Requires ffmpeg.
+        """
+        from pydub import AudioSegment
+
+        extension, export_args = CODECS[codec]
+        with self._lock_for(key):
+            source = self.locate(key)
+            if source is None:
+                raise FileNotFoundError(f"No blob stored under {key}")
+            if source.endswith(extension):
+                return source
+
+            target = os.path.join(self._shard(key), key + extension)
+            fd, temp_target = tempfile.mkstemp(suffix=".tmp", dir=self._shard(key))
+            os.close(fd)
+            try:
+                AudioSegment.from_file(source).export(temp_target, bitrate=bitrate, **export_args)
+                os.replace(temp_target, target)
+            except BaseException:
+                os.remove(temp_target)
+                # Another process may have transcoded and removed the source first
+                current = self.locate(key)
+                if current is not None and current.endswith(extension):
+                    return current
+                raise
+
+            after = os.path.getsize(target)
+            try:
+                before = os.path.getsize(source)
+                os.remove(source)
+            except FileNotFoundError:
+                # Removed by a concurrent transcode in another process
+                before = 0
+        logger.info(f"Transcoded blob {key[:12]} to {codec}: {before} -> {after} bytes")
+        return target
+
+    def delete(self, key: str):
+        path = self.locate(key)
+        if path is not None:
+            os.remove(path)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" Range header into an inclusive
+    (start, end) within size. Returns None for a missing or multi-range
+    header; raises ValueError if the range cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    if start_text:
+        start = int(start_text)
+        end = min(int(end_text), size - 1) if end_text else size - 1
+    else:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        start, end = max(0, size - length), size - 1
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yield bytes start..end (inclusive) of a file in fixed-size chunks
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,255 @@
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """
+    Content-addressed cache with an in-memory LRU tier and an optional
+    SQLite-backed persistent tier. Values must be JSON serializable.
+    """
+
+    # Prune the SQLite tier every N writes instead of on every insert
+    PRUNE_INTERVAL = 100
+    # Disk-hit access times are written in batches of up to N keys
+    TOUCH_FLUSH_INTERVAL = 100
+
+    def __init__(self, namespace: str, max_entries: int = 1024, ttl_seconds: Optional[float] = None,
+                 sqlite_path: Optional[str] = None, sqlite_max_entries: int = 100000):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_max_entries = sqlite_max_entries
+
+        # key -> (expires_at, value)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # The memory tier and the SQLite connection have separate locks so
+        # memory hits never wait behind disk I/O
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        # key -> accessed_at for disk hits not yet written back
+        self._touches: Dict[str, float] = {}
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed "
+                "ON cache_entries (namespace, accessed_at)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a stable SHA-256 key from arbitrary JSON-like parts
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key in memory, then on disk. Returns None on a miss.
+        Blocks on SQLite for disk lookups; use aget from async code.
+        """
+        now = time.time()
+        found, value = self._get_from_memory(key, now)
+        if found:
+            return value
+
+        if self._db is not None:
+            with self._db_lock:
+                row = self._get_from_disk(key, now)
+            if row is not None:
+                value, expires_at = row
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    # Keep the persisted expiry so promoted entries do not outlive their TTL
+                    self._set_in_memory(key, value, expires_at)
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        get() for the event loop: memory hits are served inline and disk
+        lookups run on a worker thread
+        """
+        found, value = self._get_from_memory(key, time.time())
+        if found:
+            return value
+        if self._db is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        return await asyncio.to_thread(self.get, key)
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value in every configured tier. Blocks on SQLite when
+        persistent; use aset from async code.
+        """
+        now = time.time()
+        expires_at = self._expiry(now)
+        with self._lock:
+            self._set_in_memory(key, copy.deepcopy(value), expires_at)
+            self._stats["sets"] += 1
+
+        if self._db is not None:
+            with self._db_lock:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache_entries "
+                        "(namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                        (self.namespace, key, json.dumps(value), expires_at, now)
+                    )
+                    # Access times from disk hits are written with the next insert
+                    self._flush_touches()
+                    self._db.commit()
+                    self._writes += 1
+                    if self._writes % self.PRUNE_INTERVAL == 0:
+                        self._prune_disk(now)
+                except sqlite3.Error as e:
+                    logger.error(f"Cache write error: {e}")
+
+    async def aset(self, key: str, value: Any):
+        """
+        set() for the event loop: the SQLite write runs on a worker thread
+        """
+        if self._db is None:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def clear(self):
+        """
+        Drop every entry in this namespace
+        """
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._touches.clear()
+                self._db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters and current tier sizes
+        """
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "namespace": self.namespace,
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None
+            }
+
+    def _expiry(self, now: float) -> Optional[float]:
+        return now + self.ttl_seconds if self.ttl_seconds else None
+
+    def _set_in_memory(self, key: str, value: Any, expires_at: Optional[float]):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _get_from_memory(self, key: str, now: float) -> Tuple[bool, Optional[Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return True, copy.deepcopy(value)
+            del self._memory[key]
+            self._stats["expirations"] += 1
+            return False, None
+
+    def _get_from_disk(self, key: str, now: float) -> Optional[Tuple[Any, Optional[float]]]:
+        """
+        (value, expires_at) for a live row, or None. Read-only apart from
+        batched access-time updates; expired rows are left for pruning.
+        """
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                with self._lock:
+                    self._stats["expirations"] += 1
+                return None
+            self._touches[key] = now
+            if len(self._touches) >= self.TOUCH_FLUSH_INTERVAL:
+                self._flush_touches()
+                self._db.commit()
+            return json.loads(value), expires_at
+        except sqlite3.Error as e:
+            logger.error(f"Cache read error: {e}")
+            return None
+
+    def _flush_touches(self):
+        if self._touches:
+            self._db.executemany(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(accessed_at, self.namespace, key) for key, accessed_at in self._touches.items()]
+            )
+            self._touches.clear()
+
+    def _prune_disk(self, now: float):
+        """
+        Drop expired rows, then the least recently used rows over the size limit
+        """
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        self._db.execute(
+            """DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                SELECT key FROM cache_entries WHERE namespace = ?
+                ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.namespace, self.namespace, self.sqlite_max_entries)
+        )
+        self._db.commit()
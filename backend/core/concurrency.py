@@ -0,0 +1,209 @@
+from typing import Any, Deque, Dict, Optional
+from collections import deque
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Error codes upstream services use to signal that callers should back off
+THROTTLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException"
+}
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """
+    Whether an exception means the upstream is shedding load
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code in THROTTLE_ERROR_CODES:
+            return True
+    if "Throttl" in type(error).__name__:
+        return True
+    # LangChain re-raises Bedrock client errors as ValueError with the code in the message
+    message = str(error)
+    return any(code in message for code in THROTTLE_ERROR_CODES)
+
+
+class LimiterOverloadedError(Exception):
+    """Raised when the limiter queue is full or a caller waited too long for a slot"""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is rejecting calls"""
+    pass
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter. The in-flight limit grows by one for every
+    limit's worth of fast successes and is cut multiplicatively when a call is
+    throttled or exceeds the latency target. Waiters are served FIFO; the queue
+    is bounded so excess load is rejected instead of piling up.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int, latency_target: float,
+                 backoff_ratio: float = 0.5, max_queue: int = 256, queue_timeout: Optional[float] = None):
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Only back off once per latency window so one burst of slow calls
+        # does not collapse the limit to the floor
+        self._last_decrease = 0.0
+        self._stats = {"acquired": 0, "rejected": 0, "timed_out": 0, "increases": 0, "decreases": 0}
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot. Returns the time spent queued in seconds.
+        """
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            self._stats["acquired"] += 1
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise LimiterOverloadedError("LLM request queue is full")
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as we gave up; hand it back
+                self._in_flight -= 1
+                self._wake()
+            else:
+                future.cancel()
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self._stats["timed_out"] += 1
+                raise LimiterOverloadedError("Timed out waiting for an LLM slot")
+            raise
+
+        self._stats["acquired"] += 1
+        return time.monotonic() - start
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False):
+        """
+        Return a slot and adapt the limit. latency=None skips the latency
+        signal (e.g. for streams, whose duration depends on output length).
+        """
+        self._in_flight -= 1
+        now = time.monotonic()
+
+        if throttled or (latency is not None and latency > self.latency_target):
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+                self._last_decrease = now
+                self._stats["decreases"] += 1
+                logger.warning(f"LLM concurrency limit reduced to {int(self.limit)} "
+                               f"({'throttled' if throttled else f'latency {latency:.1f}s'})")
+        elif latency is not None and self.limit < self.max_limit:
+            previous = int(self.limit)
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            if int(self.limit) > previous:
+                self._stats["increases"] += 1
+
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "limit": int(self.limit),
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters)
+        }
+
+    def _wake(self):
+        while self._waiters and self._in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker. After failure_threshold
+    consecutive failures calls are rejected for reset_timeout seconds, then a
+    limited number of trial calls decide whether to close again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._stats = {"rejected": 0, "opened": 0}
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if the call should not be attempted
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError("LLM backend circuit is open")
+            self.state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError("LLM backend circuit is half-open")
+            self._half_open_calls += 1
+
+    def release_trial(self):
+        """
+        Give back a half-open trial slot for a call that ended without an
+        outcome (cancelled, rejected by the limiter, or abandoned mid-stream)
+        """
+        if self.state == self.HALF_OPEN:
+            self._half_open_calls = max(0, self._half_open_calls - 1)
+
+    def record_success(self):
+        self._failures = 0
+        if self.state != self.CLOSED:
+            logger.info("LLM backend circuit closed")
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self._stats["opened"] += 1
+                logger.warning(f"LLM backend circuit opened after {self._failures} failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "state": self.state, "consecutive_failures": self._failures}
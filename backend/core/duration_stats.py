@@ -0,0 +1,283 @@
+from typing import Any, Dict, List, Optional
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Question, QuestionDurationStats, Response
+from models.question import DifficultyLevel, QuestionType
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Quantiles tracked for every question and difficulty level
+DURATION_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Scope of the per-level rows; question rows use question_scope()
+LEVEL_SCOPE = "level"
+
+# Attempts at updating one sketch before the duration is dropped, and the
+# first backoff between them (doubled, with jitter, on each conflict)
+RECORD_ATTEMPTS = 8
+RECORD_BACKOFF_SECONDS = 0.005
+
+
+def question_scope(question_id: int) -> str:
+    return f"question:{question_id}"
+
+
+def is_database_busy(error: OperationalError) -> bool:
+    """
+    Whether an OperationalError is lock contention worth retrying
+    """
+    message = str(error.orig or error).lower()
+    return "database is locked" in message or "database is busy" in message or "deadlock" in message
+
+
+class P2Quantile:
+    """
+    P-square streaming estimate of one quantile (Jain & Chlamtac, 1985).
+    Five markers are kept whatever the number of observations, so the state
+    is a few floats and each update is O(1). Until five observations have
+    arrived the raw values are kept and the quantile is exact.
+    """
+
+    def __init__(self, p: float, state: Optional[Dict[str, Any]] = None):
+        self.p = p
+        state = state or {}
+        # Copied so the loaded JSON is left untouched and changes are detected
+        self.heights: List[float] = list(state.get("q", []))
+        self.positions: List[float] = list(state.get("n", []))
+        self.desired: List[float] = list(state.get("d", []))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"q": self.heights, "n": self.positions, "d": self.desired}
+
+    def add(self, x: float):
+        q, n, d = self.heights, self.positions, self.desired
+        if len(n) < 5:
+            # Warm-up: raw observations, sorted
+            q.append(x)
+            q.sort()
+            if len(q) == 5:
+                p = self.p
+                n[:] = [0.0, 1.0, 2.0, 3.0, 4.0]
+                d[:] = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+            else:
+                n.append(float(len(q) - 1))
+            return
+
+        # Cell containing x, extending the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        increments = (0.0, self.p / 2, self.p, (1 + self.p) / 2, 1.0)
+        for i in range(5):
+            d[i] += increments[i]
+
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            delta = d[i] - n[i]
+            if (delta >= 1 and n[i + 1] - n[i] > 1) or (delta <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if len(self.desired) < 5:
+            # Exact quantile of the warm-up observations (nearest rank)
+            return self.heights[min(int(self.p * len(self.heights)), len(self.heights) - 1)]
+        return self.heights[2]
+
+
+class DurationSketch:
+    """
+    Quantile sketches for DURATION_QUANTILES over one stream of durations,
+    serializable to the JSON stored on QuestionDurationStats
+    """
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.estimators = [P2Quantile(p, state.get(str(p))) for p in DURATION_QUANTILES]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {str(estimator.p): estimator.to_dict() for estimator in self.estimators}
+
+    def add(self, x: float):
+        for estimator in self.estimators:
+            estimator.add(x)
+
+    def percentiles(self) -> Dict[str, float]:
+        """
+        Estimates keyed "p10", "p25", ... , made non-decreasing
+        """
+        result = {}
+        previous = 0.0
+        for estimator in self.estimators:
+            previous = max(previous, estimator.value() or 0.0)
+            result[f"p{int(round(estimator.p * 100))}"] = previous
+        return result
+
+
+class DurationStats:
+    """
+    Precomputed answer-duration percentiles per question and per difficulty
+    level. Each submission updates two small rows in O(1); scoring reads one
+    row, falling back to the difficulty level while a question has too few
+    answers, so no response scans happen at request time. Updates run in
+    their own short transactions as compare-and-set on sample_count, so
+    concurrent submissions never lose an observation and a failed update
+    never touches the caller's session.
+    """
+
+    def __init__(self, min_samples: Optional[int] = None, session_factory=SessionLocal):
+        self.min_samples = settings.DURATION_STATS_MIN_SAMPLES if min_samples is None else min_samples
+        self.session_factory = session_factory
+        # Serializes updates within the process; other processes are handled
+        # by the compare-and-set
+        self._lock = threading.Lock()
+
+    def percentiles(self, db: Session, question: Question) -> Optional[Dict[str, float]]:
+        """
+        Duration percentiles for a question, or None if there is not yet
+        enough data for the question or its difficulty
+        """
+        for scope in (question_scope(question.id), LEVEL_SCOPE):
+            row = self._row(db, scope, question.difficulty)
+            if row is not None and row.sample_count >= self.min_samples:
+                return DurationSketch(row.sketch).percentiles()
+        return None
+
+    def record(self, question_id: int, difficulty: DifficultyLevel, duration_seconds: Optional[float]):
+        """
+        Add an answer duration to the question's and difficulty's sketches.
+        Runs in a separate session; errors are logged, not raised.
+        """
+        if not duration_seconds or duration_seconds <= 0 or difficulty is None:
+            return
+        db = self.session_factory()
+        try:
+            for scope, scope_question_id in ((question_scope(question_id), question_id), (LEVEL_SCOPE, None)):
+                if not self._add(db, scope, scope_question_id, difficulty, float(duration_seconds)):
+                    logger.warning(f"Dropped a duration for {scope}/{difficulty.value} after {RECORD_ATTEMPTS} conflicts")
+        except Exception as e:
+            logger.error(f"Error recording answer duration: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _add(self, db: Session, scope: str, question_id: Optional[int], difficulty: DifficultyLevel,
+             duration: float) -> bool:
+        """
+        Apply one observation to a sketch row, retrying when another writer
+        got there first; False if every attempt conflicted
+        """
+        for attempt in range(RECORD_ATTEMPTS):
+            try:
+                with self._lock:
+                    if self._try_add(db, scope, question_id, difficulty, duration):
+                        return True
+            except IntegrityError:
+                # Row inserted by another writer; update it on the next attempt
+                db.rollback()
+            except OperationalError as e:
+                db.rollback()
+                # Anything but a busy database (missing table, bad schema) will not
+                # go away by retrying
+                if not is_database_busy(e):
+                    raise
+            # Read the row again on the next attempt; back off outside the lock
+            db.expire_all()
+            time.sleep(random.uniform(0, RECORD_BACKOFF_SECONDS * 2 ** attempt))
+        return False
+
+    def _try_add(self, db: Session, scope: str, question_id: Optional[int], difficulty: DifficultyLevel,
+                 duration: float) -> bool:
+        """
+        One compare-and-set of a sketch row; False if another writer changed
+        it since it was read
+        """
+        row = self._row(db, scope, difficulty)
+        sketch = DurationSketch(row.sketch if row is not None else None)
+        sketch.add(duration)
+        if row is None:
+            db.add(QuestionDurationStats(scope=scope, question_id=question_id, difficulty=difficulty,
+                                         sample_count=1, sketch=sketch.to_dict()))
+            db.commit()
+            return True
+        updated = db.query(QuestionDurationStats).filter(
+            QuestionDurationStats.id == row.id,
+            QuestionDurationStats.sample_count == row.sample_count
+        ).update({
+            QuestionDurationStats.sketch: sketch.to_dict(),
+            QuestionDurationStats.sample_count: row.sample_count + 1
+        }, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+
+    def rebuild(self, db: Session, batch_size: int = 50000) -> int:
+        """
+        Recreate every sketch from stored durations of timed (technical)
+        responses. Used to seed the table for existing data; returns the
+        number of durations read.
+        """
+        sketches: Dict[Any, DurationSketch] = {}
+        counts: Dict[Any, int] = {}
+        last_id = 0
+        while True:
+            rows = db.query(Response.id, Response.question_id, Response.duration_seconds, Question.difficulty).join(
+                Question, Response.question_id == Question.id
+            ).filter(
+                Response.id > last_id, Response.duration_seconds > 0, Question.difficulty.isnot(None),
+                Question.question_type.in_([QuestionType.LEETCODE, QuestionType.SYSTEM_DESIGN])
+            ).order_by(Response.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for _, question_id, duration, difficulty in rows:
+                for key in ((question_id, difficulty), (None, difficulty)):
+                    sketches.setdefault(key, DurationSketch()).add(float(duration))
+                    counts[key] = counts.get(key, 0) + 1
+
+        db.query(QuestionDurationStats).delete()
+        db.add_all(
+            QuestionDurationStats(scope=question_scope(question_id) if question_id is not None else LEVEL_SCOPE,
+                                  question_id=question_id, difficulty=difficulty,
+                                  sample_count=counts[(question_id, difficulty)], sketch=sketch.to_dict())
+            for (question_id, difficulty), sketch in sketches.items()
+        )
+        db.commit()
+        read = sum(count for (question_id, _), count in counts.items() if question_id is not None)
+        logger.info(f"Rebuilt duration stats for {len(sketches)} questions and levels from {read} responses")
+        return read
+
+    @staticmethod
+    def _row(db: Session, scope: str, difficulty: DifficultyLevel) -> Optional[QuestionDurationStats]:
+        return db.query(QuestionDurationStats).filter(
+            QuestionDurationStats.scope == scope,
+            QuestionDurationStats.difficulty == difficulty
+        ).first()
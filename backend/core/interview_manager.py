@@ -1,25 +1,109 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
 import random
 import os
+import tempfile
+import threading
 
-from models import Interview, InterviewSession, Question, Response, Score, ScoreBreakdown
+from models import Interview, InterviewSession, Question, Response, AudioResponse, Score, ScoreBreakdown
+from models.response import ProcessingStatus
 from models.interview import InterviewType, InterviewStatus
 from models.question import QuestionType, DifficultyLevel
-from core.ai_service import AIService
-from core.audio_processor import AudioProcessor
 from core.scoring_engine import ScoringEngine
+from core.duration_stats import DurationStats
+from core.metrics import collect_llm_calls
+from core.audio_pool import ANALYZER_VERSION, AudioPoolBusyError, AudioProcessingTimeout, AudioWorkerPool
+from core.cache import TieredCache
+from core.single_flight import SingleFlight
+from core.job_queue import InProcessBroker, JobQueue, RetryJobError
+from core.blob_store import CODECS, LOSSY_CODECS, LocalBlobStore
+from core.streaming import StreamingTranscription, pcm16_to_wav
+from core.tone_analyzer import ToneAnalyzer
+from core.transcription import create_transcriber
+from config import settings
+from database import SessionLocal
 
 logger = logging.getLogger(__name__)
 
 
 class InterviewManager:
-    def __init__(self):
-        self.ai_service = AIService()
-        self.audio_processor = AudioProcessor()
+    def __init__(self, duration_stats: Optional[DurationStats] = None):
+        # The AI service is built on first use (or by warm_up) and audio worker
+        # processes are only spawned when needed, so constructing the manager is
+        # cheap at import time
+        self._ai_service = None
+        self._init_lock = threading.Lock()
+        self.audio_pool = AudioWorkerPool(
+            max_workers=settings.AUDIO_WORKERS or None,
+            task_timeout=settings.AUDIO_TASK_TIMEOUT_SECONDS,
+            max_pending=settings.AUDIO_MAX_PENDING_TASKS
+        )
         self.scoring_engine = ScoringEngine()
+        if duration_stats is None and settings.DURATION_STATS_ENABLED:
+            duration_stats = DurationStats()
+        self.duration_stats = duration_stats
+        # Follow-up work that runs after a response has been returned
+        self._background_tasks = set()
+        self.audio_store = LocalBlobStore(settings.AUDIO_STORE_DIR)
+        self.audio_cache = None
+        if settings.AUDIO_CACHE_ENABLED:
+            self.audio_cache = TieredCache(
+                namespace="audio_analysis",
+                max_entries=settings.AUDIO_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.AUDIO_CACHE_TTL_SECONDS,
+                sqlite_path=settings.AUDIO_CACHE_SQLITE_PATH,
+                sqlite_max_entries=settings.AUDIO_CACHE_SQLITE_MAX_ENTRIES
+            )
+        # Jobs for the same recording running at once share one analysis
+        self._audio_single_flight = SingleFlight()
+        self.job_queue = JobQueue()
+        self.job_queue.register("behavioral", self.process_behavioral_job)
+        # Streamed answers are transcribed in this process as they arrive, on
+        # one bounded thread pool; the transcriber is built on the first stream
+        self._stream_transcriber = None
+        self._stream_tone_analyzer = None
+        self._stream_executor = None
+        self._streams = set()
+    
+    @property
+    def ai_service(self):
+        if self._ai_service is None:
+            with self._init_lock:
+                if self._ai_service is None:
+                    from core.ai_service import AIService
+                    self._ai_service = AIService()
+        return self._ai_service
+    
+    async def warm_up(self):
+        """
+        Build the AI service off the event loop, open pooled connections to
+        the LLM backend and start the audio workers, which preload NLP corpora
+        """
+        async def warm_ai():
+            ai_service = await asyncio.to_thread(lambda: self.ai_service)
+            await ai_service.warm_up()
+        
+        start = datetime.utcnow()
+        results = await asyncio.gather(warm_ai(), self.audio_pool.warm_up(), return_exceptions=True)
+        for name, result in zip(("AI service", "audio workers"), results):
+            if isinstance(result, Exception):
+                logger.error(f"Error warming up {name}: {result}")
+        logger.info(f"Warm-up finished in {(datetime.utcnow() - start).total_seconds():.2f}s")
+    
+    def close(self):
+        """
+        Release resources held by initialized services
+        """
+        if self._ai_service is not None:
+            self._ai_service.close()
+        if self._stream_executor is not None:
+            self._stream_executor.shutdown(wait=False, cancel_futures=True)
+        self.audio_pool.close()
     
     async def create_interview(self, db: Session, user_id: int, interview_type: InterviewType, title: str, description: str = None) -> Interview:
         """
@@ -126,19 +210,180 @@ class InterviewManager:
         Submit and evaluate a technical response
         """
         try:
-            # Get question details
-            question = db.query(Question).filter(Question.id == question_id).first()
-            if not question:
-                raise ValueError("Question not found")
+            question, response = self._create_technical_response(
+                db, session_id, question_id, user_id, code_response, time_taken
+            )
+            
+            # Evaluate using AI
+            with collect_llm_calls() as llm_calls:
+                evaluation = await self.ai_service.evaluate_technical_solution(
+                    problem=question.problem_statement or question.content,
+                    solution=code_response,
+                    expected_output=question.expected_output or ""
+                )
+            
+            result = self._score_technical_response(db, question, response, evaluation, time_taken, llm_calls)
+            self._record_duration(question, time_taken)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error submitting technical response: {e}")
+            db.rollback()
+            raise
+    
+    async def stream_technical_response(self, db: Session, session_id: int, question_id: int, user_id: int,
+                                        code_response: str, time_taken: float) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Submit a technical response, yielding feedback tokens as the evaluation is
+        generated and a final score event once it has been persisted
+        """
+        try:
+            question, response = self._create_technical_response(
+                db, session_id, question_id, user_id, code_response, time_taken
+            )
+            
+            evaluation = None
+            with collect_llm_calls() as llm_calls:
+                async for kind, data in self.ai_service.stream_technical_solution(
+                    problem=question.problem_statement or question.content,
+                    solution=code_response,
+                    expected_output=question.expected_output or ""
+                ):
+                    if kind == "token":
+                        yield {"event": "token", "data": data}
+                    else:
+                        evaluation = data
+            
+            result = self._score_technical_response(db, question, response, evaluation, time_taken, llm_calls)
+            self._record_duration(question, time_taken)
+            yield {"event": "score", "data": result}
+            
+        except Exception as e:
+            logger.error(f"Error streaming technical response: {e}")
+            db.rollback()
+            yield {"event": "error", "data": str(e)}
+    
+    def _create_technical_response(self, db: Session, session_id: int, question_id: int, user_id: int,
+                                   code_response: str, time_taken: float) -> Tuple[Question, Response]:
+        """
+        Look up the question and persist the raw technical response
+        """
+        # Get question details
+        question = db.query(Question).filter(Question.id == question_id).first()
+        if not question:
+            raise ValueError("Question not found")
+        
+        # Create response record
+        response = Response(
+            user_id=user_id,
+            session_id=session_id,
+            question_id=question_id,
+            code_response=code_response,
+            duration_seconds=time_taken,
+            start_time=datetime.utcnow() - timedelta(seconds=time_taken),
+            end_time=datetime.utcnow()
+        )
+        
+        db.add(response)
+        db.commit()
+        db.refresh(response)
+        return question, response
+    
+    def _record_duration(self, question: Question, time_taken: float):
+        """
+        Add an answer duration to the question's percentiles in the background
+        once its score is saved, in a separate transaction so a failed update
+        cannot lose the score or delay the response
+        """
+        if self.duration_stats is None:
+            return
+        task = asyncio.create_task(
+            asyncio.to_thread(self.duration_stats.record, question.id, question.difficulty, time_taken)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def drain_background_tasks(self):
+        """
+        Wait for follow-up work such as duration stats updates to finish
+        """
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+    
+    def _score_technical_response(self, db: Session, question: Question, response: Response,
+                                  evaluation: Dict[str, Any], time_taken: float,
+                                  llm_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Score an evaluated technical response and persist the result
+        """
+        # Time is scored against earlier answers to the same question; this
+        # answer joins the distribution after the score is saved
+        duration_percentiles = None
+        if self.duration_stats is not None:
+            duration_percentiles = self.duration_stats.percentiles(db, question)
+        
+        # Calculate score
+        score_result = self.scoring_engine.calculate_technical_score(
+            evaluation,
+            time_taken,
+            difficulty=question.difficulty.value if question.difficulty else "medium",
+            duration_percentiles=duration_percentiles
+        )
+        
+        # Create score record
+        score = Score(
+            response_id=response.id,
+            interview_id=response.interview_id,
+            total_score=score_result["total_score"],
+            accuracy_score=score_result["raw_scores"].get("correctness", 0),
+            time_score=score_result["raw_scores"].get("time", 0),
+            optimality_score=score_result["raw_scores"].get("optimality", 0),
+            process_score=score_result["raw_scores"].get("process", 0),
+            scoring_method="technical"
+        )
+        
+        db.add(score)
+        db.commit()
+        db.refresh(score)
+        
+        # Update response with score
+        response.score = score_result["total_score"]
+        response.feedback = score_result["feedback"]
+        response.score_breakdown = score_result["score_breakdown"]
+        if settings.LLM_METRICS_PERSIST:
+            response.llm_metrics = llm_calls
+        db.commit()
+        
+        return {
+            "response_id": response.id,
+            "score": score_result["total_score"],
+            "feedback": score_result["feedback"],
+            "evaluation": evaluation,
+            "score_breakdown": score_result["score_breakdown"]
+        }
+    
+    async def submit_behavioral_response(self, db: Session, session_id: int, question_id: int, user_id: int,
+                                       audio_file_path: str) -> Dict[str, Any]:
+        """
+        Record a behavioral response and queue its audio for background
+        transcription, analysis and scoring. Poll get_behavioral_status for the result.
+        """
+        try:
+            self._answerable_question(db, session_id, question_id)
+            
+            # Keep the recording in the content-addressed store; identical
+            # uploads share one blob
+            extension = os.path.splitext(audio_file_path)[1]
+            content_hash, stored_path, deduplicated = await asyncio.to_thread(
+                self.audio_store.put_file, audio_file_path, extension
+            )
             
             # Create response record
             response = Response(
                 user_id=user_id,
                 session_id=session_id,
                 question_id=question_id,
-                code_response=code_response,
-                duration_seconds=time_taken,
-                start_time=datetime.utcnow() - timedelta(seconds=time_taken),
+                start_time=datetime.utcnow(),
                 end_time=datetime.utcnow()
             )
             
@@ -146,145 +391,484 @@ class InterviewManager:
             db.commit()
             db.refresh(response)
             
-            # Evaluate using AI
-            evaluation = await self.ai_service.evaluate_technical_solution(
-                problem=question.problem_statement or question.content,
-                solution=code_response,
-                expected_output=question.expected_output or ""
-            )
-            
-            # Calculate score
-            score_result = self.scoring_engine.calculate_technical_score(evaluation, time_taken)
-            
-            # Create score record
-            score = Score(
+            # Create audio response record
+            audio_response = AudioResponse(
                 response_id=response.id,
-                interview_id=response.interview_id,
-                total_score=score_result["total_score"],
-                accuracy_score=score_result["raw_scores"].get("correctness", 0),
-                time_score=score_result["raw_scores"].get("time", 0),
-                optimality_score=score_result["raw_scores"].get("optimality", 0),
-                process_score=score_result["raw_scores"].get("process", 0),
-                scoring_method="technical"
+                content_hash=content_hash,
+                file_path=stored_path,
+                file_size=os.path.getsize(stored_path),
+                format=os.path.splitext(stored_path)[1],
+                is_processed=ProcessingStatus.PENDING,
+                lease_expires_at=self._lease_deadline()
             )
             
-            db.add(score)
+            db.add(audio_response)
             db.commit()
-            db.refresh(score)
             
-            # Update response with score
-            response.score = score_result["total_score"]
-            response.feedback = score_result["feedback"]
-            response.score_breakdown = score_result["score_breakdown"]
-            db.commit()
+            job_id = await self.job_queue.enqueue("behavioral", {"audio_response_id": audio_response.id})
             
             return {
                 "response_id": response.id,
-                "score": score_result["total_score"],
-                "feedback": score_result["feedback"],
-                "evaluation": evaluation,
-                "score_breakdown": score_result["score_breakdown"]
+                "job_id": job_id,
+                "status": ProcessingStatus.PENDING.name.lower(),
+                "deduplicated": deduplicated
             }
             
         except Exception as e:
-            logger.error(f"Error submitting technical response: {e}")
+            logger.error(f"Error submitting behavioral response: {e}")
             db.rollback()
             raise
     
-    async def submit_behavioral_response(self, db: Session, session_id: int, question_id: int, user_id: int,
-                                       audio_file_path: str) -> Dict[str, Any]:
+    async def reprocess_behavioral_response(self, db: Session, response_id: int) -> Dict[str, Any]:
+        """
+        Queue a stored recording for transcription, analysis and scoring again
+        """
+        audio_response = db.query(AudioResponse).filter(AudioResponse.response_id == response_id).first()
+        if audio_response is None or self._locate_audio(audio_response) is None:
+            raise ValueError("Stored recording not found")
+        
+        audio_response.is_processed = ProcessingStatus.PENDING
+        audio_response.processing_error = None
+        audio_response.lease_expires_at = self._lease_deadline()
+        db.commit()
+        
+        job_id = await self.job_queue.enqueue(
+            "behavioral", {"audio_response_id": audio_response.id, "reprocess": True}
+        )
+        return {"response_id": response_id, "job_id": job_id, "status": ProcessingStatus.PENDING.name.lower()}
+    
+    def get_behavioral_audio(self, db: Session, response_id: int) -> str:
+        """
+        Path of the stored recording for a behavioral response
+        """
+        audio_response = db.query(AudioResponse).filter(AudioResponse.response_id == response_id).first()
+        path = self._locate_audio(audio_response) if audio_response is not None else None
+        if path is None:
+            raise ValueError("Stored recording not found")
+        return path
+    
+    async def _analyze_audio(self, content_hash: Optional[str], audio_path: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Transcription, features and tone for a recording, served from the
+        analysis cache when the same content was analyzed before
         """
-        Submit and evaluate a behavioral response with audio
+        if self.audio_cache is None or not content_hash:
+            return await self.audio_pool.process(audio_path)
+        
+        # content_hash names the original upload; a transcoded copy is keyed
+        # apart so its results never replace the original's
+        key = TieredCache.make_key(content_hash, ANALYZER_VERSION, settings.TRANSCRIPTION_BACKEND,
+                                   settings.TRANSCRIPTION_LANGUAGE, self._stored_encoding(audio_path))
+        if use_cache:
+            cached = await self.audio_cache.aget(key)
+            if cached is not None:
+                logger.info(f"Audio analysis cache hit for {content_hash[:12]}")
+                return cached
+        
+        async def analyze():
+            result = await self.audio_pool.process(audio_path)
+            # Failed analyses are retried next time rather than remembered
+            if result.get("success"):
+                await self.audio_cache.aset(key, result)
+            return result
+        
+        result, _ = await self._audio_single_flight.do(key, analyze)
+        return result
+    
+    @staticmethod
+    def _stored_encoding(audio_path: str) -> str:
+        """
+        Container of the file being analyzed, with the bitrate for lossy storage codecs
+        """
+        extension = os.path.splitext(audio_path)[1]
+        if any(CODECS[codec][0] == extension for codec in LOSSY_CODECS):
+            return f"{extension}@{settings.AUDIO_STORE_BITRATE}"
+        return extension
+    
+    def _locate_audio(self, audio_response: AudioResponse) -> Optional[str]:
+        if audio_response.content_hash:
+            return self.audio_store.locate(audio_response.content_hash)
+        # Rows created before the blob store kept only a temporary path
+        return audio_response.file_path if os.path.exists(audio_response.file_path or "") else None
+    
+    async def process_behavioral_job(self, payload: Dict[str, Any]):
         """
+        Job handler: transcribe and analyze the audio, evaluate the answer and
+        score it, recording progress on the AudioResponse
+        """
+        db = SessionLocal()
+        audio_response = None
+        try:
+            audio_response = db.query(AudioResponse).filter(AudioResponse.id == payload["audio_response_id"]).first()
+            if audio_response is None:
+                logger.warning(f"Audio response {payload['audio_response_id']} no longer exists")
+                return
+            if not self._claim_behavioral(db, audio_response.id, reprocess=bool(payload.get("reprocess"))):
+                # Redelivered after it finished, or another worker holds it
+                logger.info(f"Audio response {audio_response.id} is finished or claimed elsewhere; skipping")
+                return
+            db.refresh(audio_response)
+            response = audio_response.response
+            question = response.question
+            
+            audio_path = self._locate_audio(audio_response)
+            if audio_path is None:
+                raise ValueError("Stored recording not found")
+            
+            # Process audio file in a worker process, unless this recording was
+            # already analyzed by the current analyzer
+            audio_result = await self._analyze_audio(
+                audio_response.content_hash, audio_path, use_cache=not payload.get("reprocess")
+            )
+            
+            if not audio_result["success"]:
+                raise ValueError(f"Audio processing failed: {audio_result.get('error', 'Unknown error')}")
+            
+            await self._score_behavioral(db, response, audio_response, question, audio_result)
+            await self._compact_stored_audio(db, audio_response)
+            
+        except (AudioPoolBusyError, AudioProcessingTimeout) as e:
+            db.rollback()
+            if audio_response is None or payload.get("attempt", 1) >= settings.JOB_MAX_ATTEMPTS:
+                self._mark_behavioral_failed(db, audio_response, e)
+                raise
+            # Audio workers are saturated: back to pending and try again later
+            logger.warning(f"Audio pool busy for audio response {audio_response.id}: {e}")
+            audio_response.is_processed = ProcessingStatus.PENDING
+            audio_response.lease_expires_at = self._lease_deadline()
+            db.commit()
+            raise RetryJobError(str(e))
+        except Exception as e:
+            logger.error(f"Error processing behavioral response: {e}")
+            db.rollback()
+            self._mark_behavioral_failed(db, audio_response, e)
+            raise
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _lease_deadline() -> datetime:
+        return datetime.utcnow() + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+    
+    def _claim_behavioral(self, db: Session, audio_response_id: int, reprocess: bool = False) -> bool:
+        """
+        Mark a behavioral response as processing by this worker, unless another
+        worker holds an unexpired lease on it or (outside reprocessing) it has
+        already completed. A compare-and-set, so only one claimant wins.
+        """
+        now = datetime.utcnow()
+        query = db.query(AudioResponse).filter(
+            AudioResponse.id == audio_response_id,
+            or_(AudioResponse.is_processed != ProcessingStatus.PROCESSING,
+                AudioResponse.lease_expires_at.is_(None),
+                AudioResponse.lease_expires_at < now)
+        )
+        if not reprocess:
+            query = query.filter(AudioResponse.is_processed != ProcessingStatus.COMPLETED)
+        claimed = query.update({
+            AudioResponse.is_processed: ProcessingStatus.PROCESSING,
+            AudioResponse.lease_expires_at: self._lease_deadline()
+        }, synchronize_session=False)
+        db.commit()
+        return bool(claimed)
+    
+    @staticmethod
+    def _mark_behavioral_failed(db: Session, audio_response: Optional[AudioResponse], error: Exception):
+        if audio_response is not None:
+            audio_response.is_processed = ProcessingStatus.FAILED
+            audio_response.processing_error = str(error)
+            audio_response.processed_at = datetime.utcnow()
+            db.commit()
+    
+    async def recover_behavioral_jobs(self) -> int:
+        """
+        Re-enqueue behavioral responses left pending or processing by a
+        previous run. Only needed for the in-process broker, whose queue dies
+        with the process; durable brokers still hold those jobs and hand out
+        abandoned ones again after the visibility timeout. Rows whose lease
+        has not expired belong to a live queue or worker (another API process
+        or a run still finishing) and are left alone; the rest are claimed
+        with a compare-and-set so concurrent processes never both take one.
+        """
+        if not isinstance(self.job_queue.broker, InProcessBroker):
+            return 0
+        db = SessionLocal()
+        try:
+            abandoned = and_(
+                AudioResponse.is_processed.in_([ProcessingStatus.PENDING, ProcessingStatus.PROCESSING]),
+                or_(AudioResponse.lease_expires_at.is_(None), AudioResponse.lease_expires_at < datetime.utcnow())
+            )
+            ids = []
+            for (audio_response_id,) in db.query(AudioResponse.id).filter(abandoned).order_by(AudioResponse.id).all():
+                claimed = db.query(AudioResponse).filter(AudioResponse.id == audio_response_id, abandoned).update({
+                    AudioResponse.is_processed: ProcessingStatus.PENDING,
+                    AudioResponse.lease_expires_at: self._lease_deadline()
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    ids.append(audio_response_id)
+        finally:
+            db.close()
+        for audio_response_id in ids:
+            await self.job_queue.enqueue("behavioral", {"audio_response_id": audio_response_id})
+        if ids:
+            logger.info(f"Re-enqueued {len(ids)} unfinished behavioral responses")
+        return len(ids)
+    
+    async def _score_behavioral(self, db: Session, response: Response, audio_response: AudioResponse,
+                                question: Question, audio_result: Dict[str, Any]):
+        """
+        Store an audio analysis, evaluate the transcript and persist the score
+        """
+        response.text_response = audio_result["transcription"]
+        audio_response.duration_seconds = audio_result["audio_features"].get("duration_seconds", 0)
+        audio_response.transcription = audio_result["transcription"]
+        audio_response.audio_analysis = {
+            **audio_result["tone_analysis"],
+            "transcription_chunks": audio_result.get("transcription_chunks", []),
+            "prosody": audio_result["audio_features"].get("prosody", {})
+        }
+        db.commit()
+        
+        # Evaluate using ChatGPT
+        with collect_llm_calls() as llm_calls:
+            chatgpt_evaluation, follow_up_questions = await self._evaluate_behavioral(
+                question, audio_result["transcription"]
+            )
+        
+        # Calculate score
+        score_result = self.scoring_engine.calculate_behavioral_score(
+            chatgpt_evaluation, 
+            audio_result["tone_analysis"]
+        )
+        
+        # Create score record
+        score = Score(
+            response_id=response.id,
+            interview_id=response.interview_id,
+            total_score=score_result["total_score"],
+            chatgpt_score=score_result["raw_scores"].get("chatgpt", 0),
+            tone_score=score_result["raw_scores"].get("tone", 0),
+            scoring_method="behavioral"
+        )
+        
+        # Replace any earlier score: reprocessing, or a job delivered again
+        # after a crash or a restart
+        db.query(Score).filter(Score.response_id == response.id).delete()
+        db.add(score)
+        
+        # Update response with score
+        response.score = score_result["total_score"]
+        response.feedback = score_result["chatgpt_feedback"]
+        response.score_breakdown = score_result["score_breakdown"]
+        response.follow_up_questions = follow_up_questions
+        if settings.LLM_METRICS_PERSIST:
+            response.llm_metrics = llm_calls
+        audio_response.is_processed = ProcessingStatus.COMPLETED
+        audio_response.processed_at = datetime.utcnow()
+        db.commit()
+    
+    async def _compact_stored_audio(self, db: Session, audio_response: AudioResponse):
+        """
+        Shrink the stored recording once it has been analyzed
+        """
+        if not settings.AUDIO_STORE_CODEC or not audio_response.content_hash:
+            return
+        try:
+            stored_path = await asyncio.to_thread(
+                self.audio_store.transcode, audio_response.content_hash,
+                settings.AUDIO_STORE_CODEC, settings.AUDIO_STORE_BITRATE
+            )
+            # Every response sharing the blob now points at the transcoded file
+            db.query(AudioResponse).filter(
+                AudioResponse.content_hash == audio_response.content_hash
+            ).update({
+                AudioResponse.file_path: stored_path,
+                AudioResponse.file_size: os.path.getsize(stored_path),
+                AudioResponse.format: os.path.splitext(stored_path)[1]
+            }, synchronize_session="fetch")
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error transcoding stored recording: {e}")
+    
+    @staticmethod
+    def _answerable_question(db: Session, session_id: int, question_id: int) -> Question:
+        """
+        The question being answered, after checking the session is still open
+        """
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        if not session:
+            raise ValueError("Session not found")
+        if session.end_time is not None:
+            raise ValueError("Session has already ended")
+        question = db.query(Question).filter(Question.id == question_id).first()
+        if not question:
+            raise ValueError("Question not found")
+        return question
+    
+    def _build_stream_services(self):
+        """
+        Load the transcriber and tone analyzer shared by streamed answers
+        """
+        with self._init_lock:
+            if self._stream_transcriber is None:
+                self._stream_tone_analyzer = ToneAnalyzer()
+                self._stream_executor = ThreadPoolExecutor(
+                    max_workers=settings.STREAM_TRANSCRIPTION_WORKERS, thread_name_prefix="stream-transcribe"
+                )
+                self._stream_transcriber = create_transcriber()
+    
+    async def start_behavioral_stream(self, db: Session, session_id: int, question_id: int,
+                                      sample_rate: int) -> StreamingTranscription:
+        """
+        Begin incremental transcription of an answer streamed as 16-bit mono PCM.
+        Raises AudioPoolBusyError when STREAM_MAX_ACTIVE answers are already streaming.
+        """
+        if not 8000 <= sample_rate <= 48000:
+            raise ValueError("sample_rate must be between 8000 and 48000")
+        self._answerable_question(db, session_id, question_id)
+        self._streams = {stream for stream in self._streams if not stream.closed}
+        if len(self._streams) >= settings.STREAM_MAX_ACTIVE:
+            raise AudioPoolBusyError("Streaming transcription is at capacity, retry shortly")
+        if self._stream_transcriber is None:
+            await asyncio.to_thread(self._build_stream_services)
+        stream = StreamingTranscription(
+            self._stream_transcriber,
+            self._stream_tone_analyzer,
+            sample_rate,
+            max_bytes=settings.MAX_AUDIO_FILE_SIZE,
+            min_silence_ms=settings.VAD_MIN_SILENCE_MS,
+            max_gap_ms=settings.VAD_MAX_GAP_MS,
+            max_chunk_seconds=settings.TRANSCRIPTION_CHUNK_MAX_SECONDS,
+            max_parallel=settings.TRANSCRIPTION_MAX_PARALLEL_CHUNKS,
+            executor=self._stream_executor
+        )
+        self._streams.add(stream)
+        return stream
+    
+    async def finish_behavioral_stream(self, db: Session, session_id: int, question_id: int, user_id: int,
+                                       stream: StreamingTranscription) -> Dict[str, Any]:
+        """
+        Complete a streamed answer: wait for the remaining transcription, store
+        the recording and score it. Most of the transcript is already done by
+        the time the answer ends, so only the evaluation is left.
+        """
+        audio_response = None
         try:
-            # Get question details
             question = db.query(Question).filter(Question.id == question_id).first()
             if not question:
                 raise ValueError("Question not found")
             
-            # Process audio file
-            audio_result = self.audio_processor.process_audio_file(audio_file_path)
-            
+            audio_result = await stream.finish()
             if not audio_result["success"]:
                 raise ValueError(f"Audio processing failed: {audio_result.get('error', 'Unknown error')}")
             
-            # Create response record
+            fd, wav_path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                await asyncio.to_thread(pcm16_to_wav, stream.samples, stream.sample_rate, wav_path)
+                content_hash, stored_path, _ = await asyncio.to_thread(self.audio_store.put_file, wav_path, ".wav")
+            finally:
+                if os.path.exists(wav_path):
+                    os.remove(wav_path)
+            
+            duration = audio_result["audio_features"]["duration_seconds"]
             response = Response(
                 user_id=user_id,
                 session_id=session_id,
                 question_id=question_id,
-                text_response=audio_result["transcription"],
-                start_time=datetime.utcnow(),
+                duration_seconds=duration,
+                start_time=datetime.utcnow() - timedelta(seconds=duration),
                 end_time=datetime.utcnow()
             )
-            
             db.add(response)
             db.commit()
             db.refresh(response)
             
-            # Create audio response record
-            from models.response import AudioResponse
             audio_response = AudioResponse(
                 response_id=response.id,
-                file_path=audio_file_path,
-                file_size=os.path.getsize(audio_file_path),
-                duration_seconds=audio_result["audio_features"].get("duration_seconds", 0),
-                format=os.path.splitext(audio_file_path)[1],
-                transcription=audio_result["transcription"],
-                audio_analysis=audio_result["tone_analysis"],
-                is_processed=2  # Completed
+                content_hash=content_hash,
+                file_path=stored_path,
+                file_size=os.path.getsize(stored_path),
+                format=".wav",
+                is_processed=ProcessingStatus.PROCESSING
             )
-            
             db.add(audio_response)
             db.commit()
             
-            # Evaluate using ChatGPT
-            chatgpt_evaluation = await self.ai_service.evaluate_behavioral_response(
-                question=question.content,
-                response=audio_result["transcription"],
-                key_points=question.key_points or []
-            )
-            
-            # Calculate score
-            score_result = self.scoring_engine.calculate_behavioral_score(
-                chatgpt_evaluation, 
-                audio_result["tone_analysis"]
-            )
-            
-            # Create score record
-            score = Score(
-                response_id=response.id,
-                interview_id=response.interview_id,
-                total_score=score_result["total_score"],
-                chatgpt_score=score_result["raw_scores"].get("chatgpt", 0),
-                tone_score=score_result["raw_scores"].get("tone", 0),
-                scoring_method="behavioral"
-            )
-            
-            db.add(score)
-            db.commit()
-            db.refresh(score)
-            
-            # Update response with score
-            response.score = score_result["total_score"]
-            response.feedback = score_result["chatgpt_feedback"]
-            response.score_breakdown = score_result["score_breakdown"]
-            db.commit()
-            
-            return {
-                "response_id": response.id,
-                "score": score_result["total_score"],
-                "feedback": score_result["chatgpt_feedback"],
-                "transcription": audio_result["transcription"],
-                "tone_analysis": audio_result["tone_analysis"],
-                "score_breakdown": score_result["score_breakdown"]
-            }
+            await self._score_behavioral(db, response, audio_response, question, audio_result)
+            await self._compact_stored_audio(db, audio_response)
+            return await self.get_behavioral_status(db, response.id)
             
         except Exception as e:
-            logger.error(f"Error submitting behavioral response: {e}")
+            logger.error(f"Error finishing behavioral stream: {e}")
             db.rollback()
+            if audio_response is not None:
+                audio_response.is_processed = ProcessingStatus.FAILED
+                audio_response.processing_error = str(e)
+                audio_response.processed_at = datetime.utcnow()
+                db.commit()
             raise
     
+    async def get_behavioral_status(self, db: Session, response_id: int) -> Dict[str, Any]:
+        """
+        Processing status of a behavioral response, with its results once completed
+        """
+        audio_response = db.query(AudioResponse).filter(AudioResponse.response_id == response_id).first()
+        if audio_response is None:
+            raise ValueError("Behavioral response not found")
+        
+        status = ProcessingStatus(audio_response.is_processed)
+        result = {"response_id": response_id, "status": status.name.lower()}
+        if status == ProcessingStatus.FAILED:
+            result["error"] = audio_response.processing_error
+        elif status == ProcessingStatus.COMPLETED:
+            response = audio_response.response
+            analysis = audio_response.audio_analysis or {}
+            result.update({
+                "score": response.score,
+                "feedback": response.feedback,
+                "transcription": audio_response.transcription,
+                "tone_analysis": {k: v for k, v in analysis.items() if k not in ("transcription_chunks", "prosody")},
+                "score_breakdown": response.score_breakdown,
+                "follow_up_questions": response.follow_up_questions or []
+            })
+        return result
+    
+    async def _evaluate_behavioral(self, question: Question, transcription: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Score a behavioral answer and produce follow-up questions. Uses one
+        combined LLM call when enabled, otherwise two concurrent calls.
+        """
+        key_points = question.key_points or []
+        original_follow_ups = question.follow_up_questions or []
+        
+        if settings.BEHAVIORAL_COMBINED_EVALUATION:
+            evaluation = await self.ai_service.evaluate_behavioral_with_follow_ups(
+                question=question.content,
+                response=transcription,
+                key_points=key_points,
+                original_follow_ups=original_follow_ups
+            )
+            # Results may be shared with coalesced callers, so copy rather than pop
+            follow_ups = evaluation.get("follow_up_questions", original_follow_ups)
+            evaluation = {k: v for k, v in evaluation.items() if k != "follow_up_questions"}
+            return evaluation, follow_ups
+        
+        evaluation, follow_ups = await asyncio.gather(
+            self.ai_service.evaluate_behavioral_response(
+                question=question.content,
+                response=transcription,
+                key_points=key_points
+            ),
+            self.ai_service.generate_follow_up_questions(
+                question=question.content,
+                response=transcription,
+                original_follow_ups=original_follow_ups
+            )
+        )
+        return evaluation, follow_ups
+    
     async def end_interview_session(self, db: Session, session_id: int) -> Dict[str, Any]:
         """
         End an interview session and calculate final scores
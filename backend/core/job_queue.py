@@ -0,0 +1,383 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class RetryJobError(Exception):
+    """Raised by a handler to have its job delivered again after a delay"""
+
+    def __init__(self, message: str, delay: Optional[float] = None):
+        super().__init__(message)
+        self.delay = delay
+
+
+class JobBroker:
+    """
+    Interface for the queues that carry background jobs. Jobs are JSON
+    dicts with "id", "kind" and "payload". A job taken with get() is only
+    removed for good once it is acked.
+    """
+
+    name: str = "unknown"
+
+    async def put(self, job: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Take the next job, waiting up to timeout seconds. Returns None if idle.
+        """
+        raise NotImplementedError
+
+    async def ack(self, job: Dict[str, Any]):
+        pass
+
+    async def depth(self) -> int:
+        return 0
+
+    async def requeue_stale(self) -> int:
+        """
+        Hand out again jobs claimed by workers that died before acking them.
+        Returns how many were requeued.
+        """
+        return 0
+
+    async def close(self):
+        pass
+
+
+class InProcessBroker(JobBroker):
+    """
+    asyncio.Queue inside the API process. Jobs do not survive a restart.
+    """
+
+    name = "inprocess"
+
+    def __init__(self):
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def put(self, job: Dict[str, Any]):
+        self._queue.put_nowait(job)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def depth(self) -> int:
+        return self._queue.qsize()
+
+
+class SQLiteBroker(JobBroker):
+    """
+    Durable queue in a local SQLite file, shareable by several processes on
+    one machine. Jobs claimed but not acked within visibility_timeout (e.g.
+    because the worker died) are handed out again.
+    """
+
+    name = "sqlite"
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, path: str, visibility_timeout: float = 600.0):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    claimed_at REAL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_jobs_claimed ON jobs (claimed_at, created_at)")
+        return self._db
+
+    def _put(self, job: Dict[str, Any]):
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, body, claimed_at, created_at) VALUES (?, ?, NULL, ?)",
+                (job["id"], json.dumps(job), time.time())
+            )
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            # IMMEDIATE takes the write lock up front so two processes cannot
+            # claim the same row
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT id, body FROM jobs WHERE claimed_at IS NULL OR claimed_at < ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (now - self.visibility_timeout,)
+                ).fetchone()
+                if row is not None:
+                    db.execute("UPDATE jobs SET claimed_at = ? WHERE id = ?", (now, row[0]))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return json.loads(row[1]) if row is not None else None
+
+    def _ack(self, job_id: str):
+        with self._lock:
+            self._connect().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def _depth(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE claimed_at IS NULL").fetchone()[0]
+
+    async def put(self, job: Dict[str, Any]):
+        await asyncio.to_thread(self._put, job)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self._claim)
+            if job is not None or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def ack(self, job: Dict[str, Any]):
+        await asyncio.to_thread(self._ack, job["id"])
+
+    async def depth(self) -> int:
+        return await asyncio.to_thread(self._depth)
+
+    async def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class RedisBroker(JobBroker):
+    """
+    Redis list queue. Claimed jobs are moved atomically to a processing list
+    and removed from it on ack. Claim times are kept in a hash, and
+    requeue_stale moves jobs held longer than visibility_timeout (e.g. by a
+    crashed worker) back onto the queue.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, queue_name: str = "interview:jobs", visibility_timeout: float = 600.0):
+        # Imported here so the other brokers work without the redis client
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.queue_name = queue_name
+        self.processing_name = f"{queue_name}:processing"
+        self.claims_name = f"{queue_name}:claimed"
+        self.visibility_timeout = visibility_timeout
+
+    async def put(self, job: Dict[str, Any]):
+        await self.client.lpush(self.queue_name, json.dumps(job))
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        raw = await self.client.blmove(self.queue_name, self.processing_name, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        await self.client.hset(self.claims_name, raw, time.time())
+        job = json.loads(raw)
+        job["_raw"] = raw
+        return job
+
+    async def ack(self, job: Dict[str, Any]):
+        await self.client.lrem(self.processing_name, 1, job["_raw"])
+        await self.client.hdel(self.claims_name, job["_raw"])
+
+    async def depth(self) -> int:
+        return await self.client.llen(self.queue_name)
+
+    async def requeue_stale(self) -> int:
+        now = time.time()
+        requeued = 0
+        for raw in await self.client.lrange(self.processing_name, 0, -1):
+            claimed_at = await self.client.hget(self.claims_name, raw)
+            if claimed_at is None:
+                # Claimed but the worker died before recording the time;
+                # start the clock now
+                await self.client.hsetnx(self.claims_name, raw, now)
+                continue
+            if now - float(claimed_at) < self.visibility_timeout:
+                continue
+            # Only the reaper that removes the entry puts it back
+            if await self.client.lrem(self.processing_name, 1, raw):
+                await self.client.rpush(self.queue_name, raw)
+                requeued += 1
+            await self.client.hdel(self.claims_name, raw)
+        return requeued
+
+    async def close(self):
+        await self.client.close()
+
+
+def create_job_broker() -> JobBroker:
+    """
+    Build the job broker selected by settings.JOB_QUEUE_BACKEND
+    """
+    if settings.JOB_QUEUE_BACKEND == "inprocess":
+        return InProcessBroker()
+    if settings.JOB_QUEUE_BACKEND == "sqlite":
+        return SQLiteBroker(settings.JOB_QUEUE_SQLITE_PATH, settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+    if settings.JOB_QUEUE_BACKEND == "redis":
+        return RedisBroker(settings.REDIS_URL, visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+    raise ValueError(f"Unknown job queue backend: {settings.JOB_QUEUE_BACKEND}")
+
+
+class JobQueue:
+    """
+    Dispatches jobs from a broker to handlers registered by kind, using a
+    fixed number of worker tasks. Handlers record their own failures; a job
+    is acked once its handler returns or raises. A handler raising
+    RetryJobError has its job put back (with payload["attempt"] increased)
+    after a backoff delay instead.
+    """
+
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, broker: Optional[JobBroker] = None):
+        self._broker = broker
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        self._reaper: Optional[asyncio.Task] = None
+        self._stats = {"enqueued": 0, "completed": 0, "failed": 0, "retried": 0, "requeued": 0}
+
+    @property
+    def broker(self) -> JobBroker:
+        # Built on first use so queues bound to an event loop are created inside it
+        if self._broker is None:
+            self._broker = create_job_broker()
+        return self._broker
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        await self.broker.put({"id": job_id, "kind": kind, "payload": payload, "enqueued_at": time.time()})
+        self._stats["enqueued"] += 1
+        return job_id
+
+    def start(self, workers: int):
+        """
+        Start worker tasks on the running event loop. The in-process broker
+        is only reachable from this process, so it needs at least one worker.
+        """
+        if workers <= 0 and isinstance(self.broker, InProcessBroker):
+            raise ValueError("The in-process job queue needs JOB_WORKERS > 0; "
+                             "use JOB_QUEUE_BACKEND=sqlite or redis to run worker.py separately")
+        for index in range(workers):
+            self._workers.append(asyncio.create_task(self._work(), name=f"job-worker-{index}"))
+        if workers:
+            self._reaper = asyncio.create_task(self._reap(), name="job-reaper")
+            logger.info(f"Started {workers} job workers on the {self.broker.name} broker")
+
+    async def run_forever(self, workers: int):
+        self.start(workers)
+        await asyncio.gather(*self._workers)
+
+    async def stop(self):
+        tasks = self._workers + ([self._reaper] if self._reaper is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._reaper = None
+        if self._broker is not None:
+            await self._broker.close()
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "broker": self.broker.name,
+            "workers": len(self._workers),
+            "running": self._running,
+            "queued": await self.broker.depth()
+        }
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self.broker.get(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reading from job broker: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if job is None:
+                continue
+
+            handler = self._handlers.get(job.get("kind"))
+            self._running += 1
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler for job kind {job.get('kind')}")
+                await handler(job["payload"])
+                self._stats["completed"] += 1
+            except asyncio.CancelledError:
+                # Left unacked so a durable broker hands it out again
+                raise
+            except RetryJobError as e:
+                attempt = job["payload"].get("attempt", 1)
+                delay = e.delay if e.delay is not None else min(self.MAX_RETRY_DELAY, 2.0 ** attempt)
+                logger.warning(f"Job {job['id']} ({job.get('kind')}) retrying in {delay:.0f}s: {e}")
+                self._stats["retried"] += 1
+                # Backing off in the worker also slows intake while the
+                # handler's resources are saturated
+                await asyncio.sleep(delay)
+                retry = {k: v for k, v in job.items() if not k.startswith("_")}
+                retry.update(id=uuid.uuid4().hex, payload={**job["payload"], "attempt": attempt + 1})
+                try:
+                    await self.broker.put(retry)
+                except Exception as put_error:
+                    self._stats["failed"] += 1
+                    logger.error(f"Error requeuing job {job['id']}: {put_error}")
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Job {job['id']} ({job.get('kind')}) failed: {e}")
+            finally:
+                self._running -= 1
+
+            try:
+                await self.broker.ack(job)
+            except Exception as e:
+                logger.error(f"Error acknowledging job {job['id']}: {e}")
+
+    async def _reap(self):
+        interval = min(60.0, settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                requeued = await self.broker.requeue_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error requeuing stale jobs: {e}")
+                continue
+            if requeued:
+                self._stats["requeued"] += requeued
+                logger.warning(f"Requeued {requeued} jobs held past the visibility timeout")
@@ -0,0 +1,148 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+# Calls made while a collector is active are also appended to it, so a request
+# handler can persist the accounting for the LLM calls it triggered
+_call_collector: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("llm_call_collector", default=None)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Quantiles are estimated as the upper bound of the
+    bucket containing them.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 4),
+            "buckets": {str(b): c for b, c in zip(list(self.buckets) + ["+Inf"], self.counts)}
+        }
+
+
+class LLMMetrics:
+    """
+    In-process histograms and counters for LLM calls, labelled by evaluation type
+    """
+
+    HISTOGRAMS = {
+        "wall_time_seconds": LATENCY_BUCKETS,
+        "queue_wait_seconds": LATENCY_BUCKETS,
+        "backend_time_seconds": LATENCY_BUCKETS,
+        "input_tokens": TOKEN_BUCKETS,
+        "output_tokens": TOKEN_BUCKETS
+    }
+    SLOWEST_CALLS = 10
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._token_totals: Dict[str, int] = defaultdict(int)
+        # Min-heap of (wall_time, sequence, record) keeping the slowest calls
+        self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._sequence = 0
+
+    def record(self, call: Dict[str, Any]):
+        """
+        Record one call. Expected keys: evaluation_type, cache_status, outcome,
+        wall_time_seconds and, for calls that reached the backend, queue_wait_seconds,
+        backend_time_seconds, input_tokens and output_tokens.
+        """
+        evaluation_type = call.get("evaluation_type", "unknown")
+        self._counters[(evaluation_type, call.get("cache_status", "none"), call.get("outcome", "ok"))] += 1
+
+        for name, buckets in self.HISTOGRAMS.items():
+            value = call.get(name)
+            if value is None:
+                continue
+            histogram = self._histograms.get((name, evaluation_type))
+            if histogram is None:
+                histogram = self._histograms[(name, evaluation_type)] = Histogram(buckets)
+            histogram.observe(value)
+
+        for name in ("input_tokens", "output_tokens"):
+            self._token_totals[name] += call.get(name) or 0
+
+        self._sequence += 1
+        entry = (call.get("wall_time_seconds", 0.0), self._sequence, call)
+        if len(self._slowest) < self.SLOWEST_CALLS:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+        collector = _call_collector.get()
+        if collector is not None:
+            collector.append(call)
+
+    def snapshot(self) -> Dict[str, Any]:
+        histograms: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        for (name, evaluation_type), histogram in sorted(self._histograms.items()):
+            histograms[name][evaluation_type] = histogram.snapshot()
+
+        return {
+            "calls": [
+                {"evaluation_type": t, "cache_status": c, "outcome": o, "count": n}
+                for (t, c, o), n in sorted(self._counters.items())
+            ],
+            "tokens": dict(self._token_totals),
+            "histograms": histograms,
+            "slowest_calls": [record for _, _, record in sorted(self._slowest, reverse=True)]
+        }
+
+    def reset(self):
+        self.__init__()
+
+
+llm_metrics = LLMMetrics()
+
+
+@contextmanager
+def collect_llm_calls():
+    """
+    Collect the records of every LLM call made inside the block
+    """
+    calls: List[Dict[str, Any]] = []
+    token = _call_collector.set(calls)
+    try:
+        yield calls
+    finally:
+        _call_collector.reset(token)
@@ -0,0 +1,381 @@
+from typing import Any, Dict, List, Optional, Tuple
+from string import Formatter
+import logging
+import re
+import textwrap
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "\n[... truncated ...]\n"
+
+# A block header line ("def f(x):", "else:") marks Python-like code, where
+# "#" starts a comment; C preprocessor directives are code, never comments
+_PYTHON_BLOCK_RE = re.compile(
+    r"^[ \t]*(def|class|if|elif|else|for|while|try|except|finally|with)\b[^\n{;]*:[ \t]*(#.*)?$", re.MULTILINE
+)
+_PREPROCESSOR_RE = re.compile(
+    r"^[ \t]*#[ \t]*(include|define|undef|ifdef|ifndef|if|elif|else|endif|pragma|error|import)\b", re.MULTILINE
+)
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text and code)
+    """
+    return (len(text) + 3) // 4
+
+
+def compact_code(code: str) -> str:
+    """
+    Strip full-line and block comments, trailing whitespace and runs of blank
+    lines. Comment markers inside string literals are left alone, and "#"
+    lines are only treated as comments in Python-like code.
+    """
+    python_like = bool(_PYTHON_BLOCK_RE.search(code)) and not _PREPROCESSOR_RE.search(code)
+    code = _strip_comments(code, python_like)
+    code = _TRAILING_SPACE_RE.sub("", code)
+    return _BLANK_LINES_RE.sub("\n\n", code).strip()
+
+
+def _strip_comments(code: str, python_like: bool) -> str:
+    """
+    Remove comments with a small scanner that skips over string literals.
+    Python-like code has "#" line comments and triple-quoted strings;
+    everything else has "//" line comments and "/* */" block comments.
+    """
+    out: List[str] = []
+    i, n = 0, len(code)
+    # Only whitespace so far on the current line
+    line_blank = True
+    quotes = "\"'" if python_like else "\"'`"
+
+    while i < n:
+        if python_like and code.startswith(('"""', "'''"), i):
+            end = code.find(code[i:i + 3], i + 3)
+            end = n if end == -1 else end + 3
+            out.append(code[i:end])
+            i, line_blank = end, False
+            continue
+
+        if not python_like and code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        line_comment = "#" if python_like else "//"
+        if line_blank and code.startswith(line_comment, i):
+            # Drop the whole line, including its indentation and newline
+            while out and out[-1] in " \t":
+                out.pop()
+            end = code.find("\n", i)
+            i = n if end == -1 else end + 1
+            continue
+
+        c = code[i]
+        if c in quotes:
+            j = i + 1
+            while j < n and code[j] != c and (c == "`" or code[j] != "\n"):
+                j += 2 if code[j] == "\\" else 1
+            end = min(j + 1, n)
+            out.append(code[i:end])
+            i, line_blank = end, False
+            continue
+
+        out.append(c)
+        if c == "\n":
+            line_blank = True
+        elif c not in " \t":
+            line_blank = False
+        i += 1
+
+    return "".join(out)
+
+
+def compact_text(text: str) -> str:
+    """
+    Collapse all whitespace runs to single spaces
+    """
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+    """
+    Keep the head and tail of text within max_tokens, dropping the middle
+    """
+    max_chars = max_tokens * 4 - len(TRUNCATION_MARKER)
+    if len(text) <= max_tokens * 4 or max_chars <= 0:
+        return text[:max_tokens * 4]
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return text[:head] + TRUNCATION_MARKER + text[-tail:]
+
+
+def fit_to_budget(value: str, max_tokens: int, kind: str = "text") -> Tuple[str, bool]:
+    """
+    Trim value to max_tokens. Lossless compaction is tried first, then the
+    middle is truncated. Returns (value, was_trimmed).
+    """
+    if estimate_tokens(value) <= max_tokens:
+        return value, False
+    value = compact_code(value) if kind == "code" else compact_text(value)
+    if estimate_tokens(value) > max_tokens:
+        value = truncate_middle(value, max_tokens)
+    return value, True
+
+
+class RenderedPrompt:
+    """
+    A built prompt with the bookkeeping callers need for caching and accounting
+    """
+    __slots__ = ("name", "version", "text", "input_tokens", "trimmed_fields")
+
+    def __init__(self, name: str, version: str, text: str, trimmed_fields: List[str]):
+        self.name = name
+        self.version = version
+        self.text = text
+        self.input_tokens = estimate_tokens(text)
+        self.trimmed_fields = trimmed_fields
+
+
+class PromptSpec:
+    """
+    A versioned prompt template. The template is dedented and parsed once at
+    registration; rendering only joins literals with (budgeted) field values.
+    Fields listed in budgets are trimmed to (max_tokens, kind) before rendering.
+    """
+
+    def __init__(self, name: str, version: str, template: str,
+                 budgets: Optional[Dict[str, Tuple[int, str]]] = None):
+        self.name = name
+        self.version = version
+        self.budgets = budgets or {}
+
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, _, _ in Formatter().parse(textwrap.dedent(template).strip()):
+            self._parts.append((literal, field))
+        self.fields = {field for _, field in self._parts if field is not None}
+
+    def render(self, **inputs: Any) -> RenderedPrompt:
+        missing = self.fields - inputs.keys()
+        if missing:
+            raise KeyError(f"Prompt {self.name} missing inputs: {sorted(missing)}")
+
+        values = {}
+        trimmed = []
+        for field in self.fields:
+            value = str(inputs[field])
+            if field in self.budgets:
+                max_tokens, kind = self.budgets[field]
+                value, was_trimmed = fit_to_budget(value, max_tokens, kind)
+                if was_trimmed:
+                    trimmed.append(field)
+            values[field] = value
+
+        if trimmed:
+            logger.info(f"Prompt {self.name} trimmed over-budget fields: {', '.join(trimmed)}")
+
+        text = "".join(literal + (values[field] if field is not None else "") for literal, field in self._parts)
+        return RenderedPrompt(self.name, self.version, text, trimmed)
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._specs: Dict[str, PromptSpec] = {}
+
+    def register(self, spec: PromptSpec):
+        self._specs[spec.name] = spec
+
+    def get(self, name: str) -> PromptSpec:
+        return self._specs[name]
+
+    def version(self, name: str) -> str:
+        return self._specs[name].version
+
+    def render(self, name: str, **inputs: Any) -> RenderedPrompt:
+        return self._specs[name].render(**inputs)
+
+
+# Bump a prompt's version whenever its wording changes so cached evaluations
+# produced by the old wording are no longer served
+prompt_registry = PromptRegistry()
+
+prompt_registry.register(PromptSpec(
+    name="behavioral",
+    version="2",
+    budgets={
+        "question": (settings.PROMPT_MAX_CONTEXT_TOKENS, "text"),
+        "key_points": (settings.PROMPT_MAX_CONTEXT_TOKENS // 2, "text"),
+        "response": (settings.PROMPT_MAX_RESPONSE_TOKENS, "text")
+    },
+    template="""
+        You are an expert interviewer evaluating a behavioral response.
+
+        Question: {question}
+        Key points to evaluate: {key_points}
+
+        Candidate Response: {response}
+
+        Please evaluate this response on a scale of 0-100 based on:
+        1. Relevance to the question
+        2. Specificity and detail
+        3. STAR method usage (Situation, Task, Action, Result)
+        4. Communication clarity
+        5. Professionalism
+
+        Provide your evaluation in the following JSON format:
+        {{
+            "score": <0-100>,
+            "feedback": "<detailed feedback>",
+            "strengths": ["<strength1>", "<strength2>"],
+            "areas_for_improvement": ["<area1>", "<area2>"],
+            "key_points_covered": ["<point1>", "<point2>"],
+            "missing_points": ["<missing_point1>", "<missing_point2>"]
+        }}
+        """
+))
+
+prompt_registry.register(PromptSpec(
+    name="behavioral_combined",
+    version="1",
+    budgets={
+        "question": (settings.PROMPT_MAX_CONTEXT_TOKENS, "text"),
+        "key_points": (settings.PROMPT_MAX_CONTEXT_TOKENS // 2, "text"),
+        "original_follow_ups": (settings.PROMPT_MAX_CONTEXT_TOKENS // 2, "text"),
+        "response": (settings.PROMPT_MAX_RESPONSE_TOKENS, "text")
+    },
+    template="""
+        You are an expert interviewer evaluating a behavioral response.
+
+        Question: {question}
+        Key points to evaluate: {key_points}
+        Original Follow-up Questions: {original_follow_ups}
+
+        Candidate Response: {response}
+
+        Please evaluate this response on a scale of 0-100 based on:
+        1. Relevance to the question
+        2. Specificity and detail
+        3. STAR method usage (Situation, Task, Action, Result)
+        4. Communication clarity
+        5. Professionalism
+
+        Also generate 2-3 follow-up questions that probe deeper into the candidate's
+        experience, ask for specific examples, challenge assumptions or explore edge
+        cases, and are relevant to the candidate's response.
+
+        Provide your evaluation in the following JSON format:
+        {{
+            "score": <0-100>,
+            "feedback": "<detailed feedback>",
+            "strengths": ["<strength1>", "<strength2>"],
+            "areas_for_improvement": ["<area1>", "<area2>"],
+            "key_points_covered": ["<point1>", "<point2>"],
+            "missing_points": ["<missing_point1>", "<missing_point2>"],
+            "follow_up_questions": ["<question1>", "<question2>"]
+        }}
+        """
+))
+
+prompt_registry.register(PromptSpec(
+    name="follow_up",
+    version="2",
+    budgets={
+        "question": (settings.PROMPT_MAX_CONTEXT_TOKENS, "text"),
+        "original_follow_ups": (settings.PROMPT_MAX_CONTEXT_TOKENS // 2, "text"),
+        "response": (settings.PROMPT_MAX_RESPONSE_TOKENS, "text")
+    },
+    template="""
+        Based on the original question and the candidate's response, generate 2-3 relevant follow-up questions.
+
+        Original Question: {question}
+        Candidate Response: {response}
+        Original Follow-up Questions: {original_follow_ups}
+
+        Generate follow-up questions that:
+        1. Probe deeper into the candidate's experience
+        2. Ask for specific examples or details
+        3. Challenge assumptions or explore edge cases
+        4. Are relevant to the candidate's response
+
+        Return as a JSON array of strings.
+        """
+))
+
+prompt_registry.register(PromptSpec(
+    name="technical",
+    version="2",
+    budgets={
+        "problem": (settings.PROMPT_MAX_CONTEXT_TOKENS, "text"),
+        "solution": (settings.PROMPT_MAX_CODE_TOKENS, "code"),
+        "expected_output": (settings.PROMPT_MAX_CONTEXT_TOKENS // 4, "text")
+    },
+    template="""
+        You are an expert technical interviewer evaluating a coding solution.
+
+        Problem: {problem}
+        Candidate Solution: {solution}
+        Expected Output: {expected_output}
+
+        Please evaluate this solution on a scale of 0-100 based on:
+        1. Correctness (50% weight)
+        2. Time complexity (20% weight)
+        3. Code quality and optimality (20% weight)
+        4. Problem-solving approach (10% weight)
+
+        Provide your evaluation in the following JSON format:
+        {{
+            "overall_score": <0-100>,
+            "correctness_score": <0-100>,
+            "time_complexity_score": <0-100>,
+            "optimality_score": <0-100>,
+            "process_score": <0-100>,
+            "feedback": "<detailed feedback>",
+            "time_complexity": "<O(n), O(n^2), etc.>",
+            "space_complexity": "<O(1), O(n), etc.>",
+            "issues": ["<issue1>", "<issue2>"],
+            "suggestions": ["<suggestion1>", "<suggestion2>"]
+        }}
+        """
+))
+
+prompt_registry.register(PromptSpec(
+    name="system_design",
+    version="2",
+    budgets={
+        "requirements": (settings.PROMPT_MAX_CONTEXT_TOKENS, "text"),
+        "design": (settings.PROMPT_MAX_RESPONSE_TOKENS, "text")
+    },
+    template="""
+        You are an expert system design interviewer evaluating a design solution.
+
+        Requirements: {requirements}
+        Candidate Design: {design}
+
+        Please evaluate this design on a scale of 0-100 based on:
+        1. Completeness of the design (30% weight)
+        2. Scalability considerations (25% weight)
+        3. Technical feasibility (20% weight)
+        4. Trade-offs understanding (15% weight)
+        5. Communication clarity (10% weight)
+
+        Provide your evaluation in the following JSON format:
+        {{
+            "overall_score": <0-100>,
+            "completeness_score": <0-100>,
+            "scalability_score": <0-100>,
+            "feasibility_score": <0-100>,
+            "trade_offs_score": <0-100>,
+            "communication_score": <0-100>,
+            "feedback": "<detailed feedback>",
+            "strengths": ["<strength1>", "<strength2>"],
+            "weaknesses": ["<weakness1>", "<weakness2>"],
+            "missing_components": ["<component1>", "<component2>"],
+            "improvements": ["<improvement1>", "<improvement2>"]
+        }}
+        """
+))
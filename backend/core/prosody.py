@@ -0,0 +1,199 @@
+from typing import Any, Dict, Tuple
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.vad import mask_runs
+from core.wav import BLOCK_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 40  # Long enough to hold two periods of a 50 Hz voice
+HOP_MS = 10
+VOICED_THRESHOLD_DB = 12.0  # Above the recording's noise floor
+MIN_PAUSE_MS = 250
+LONG_PAUSE_MS = 1000
+PITCH_MIN_HZ = 60
+PITCH_MAX_HZ = 400
+PITCH_MIN_STRENGTH = 0.45  # Normalised autocorrelation peak for a frame to count as pitched
+SYLLABLE_SPACING_MS = 70  # Energy peaks closer than this are one syllable
+SYLLABLES_PER_WORD = 1.4
+FILLER_MIN_MS = 200
+FILLER_MAX_MS = 1000
+FILLER_MAX_PITCH_STD_SEMITONES = 1.0
+FILLER_MAX_ENERGY_STD_DB = 3.0
+# Upper bound on the autocorrelation spectra held in memory at once
+PITCH_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def frame_rms_db(samples: np.ndarray, frame_length: int, hop: int) -> np.ndarray:
+    """
+    RMS level in dBFS of overlapping frames. Each block of frames is served
+    by a running sum of squares over just the samples it covers, so memory
+    does not grow with the recording.
+    """
+    frame_count = 1 + (len(samples) - frame_length) // hop
+    frames_per_block = max(1, BLOCK_SAMPLES // hop)
+    levels = np.empty(frame_count)
+    for first in range(0, frame_count, frames_per_block):
+        last = min(first + frames_per_block, frame_count)
+        block = samples[first * hop:(last - 1) * hop + frame_length]
+        energy = np.concatenate(([0.0], np.cumsum(np.square(block, dtype=np.float64))))
+        starts = np.arange(last - first) * hop
+        levels[first:last] = (energy[starts + frame_length] - energy[starts]) / frame_length
+    return 10 * np.log10(np.maximum(levels, 1.0) / 32768 ** 2)
+
+
+def frame_pitch(frames: np.ndarray, indices: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Autocorrelation pitch estimate for the selected frames (rows of a strided
+    view). Autocorrelations are computed with FFTs a block of frames at a time.
+    Returns (f0_hz, strength); f0 is NaN where no clear period was found.
+    """
+    frame_length = frames.shape[1]
+    min_lag = max(1, sample_rate // PITCH_MAX_HZ)
+    max_lag = min(frame_length - 1, sample_rate // PITCH_MIN_HZ)
+    nfft = 1 << int(np.ceil(np.log2(2 * frame_length)))
+    block = max(1, PITCH_BLOCK_BYTES // (nfft * 16))
+    window = np.hanning(frame_length)
+
+    f0 = np.full(len(indices), np.nan)
+    strength = np.zeros(len(indices))
+    for offset in range(0, len(indices), block):
+        chunk = frames[indices[offset:offset + block]].astype(np.float64)
+        chunk -= chunk.mean(axis=1, keepdims=True)
+        chunk *= window
+        spectrum = np.fft.rfft(chunk, nfft)
+        autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, nfft)[:, :max_lag + 1]
+        autocorr /= np.maximum(autocorr[:, :1], 1e-9)
+
+        lags = min_lag + np.argmax(autocorr[:, min_lag:], axis=1)
+        peaks = autocorr[np.arange(len(lags)), lags]
+        pitched = peaks >= PITCH_MIN_STRENGTH
+        f0[offset:offset + len(lags)] = np.where(pitched, sample_rate / lags, np.nan)
+        strength[offset:offset + len(lags)] = peaks
+    return f0, strength
+
+
+def _run_sums(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    totals = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    return totals[ends] - totals[starts]
+
+
+def empty_prosody() -> Dict[str, Any]:
+    return {
+        "voiced_seconds": 0.0,
+        "silence_ratio": 1.0,
+        "pause_ratio": 0.0,
+        "pause_count": 0,
+        "long_pause_count": 0,
+        "mean_pause_seconds": 0.0,
+        "max_pause_seconds": 0.0,
+        "energy_mean_db": None,
+        "energy_std_db": 0.0,
+        "energy_range_db": 0.0,
+        "syllable_rate": 0.0,
+        "articulation_rate": 0.0,
+        "words_per_minute_estimate": 0.0,
+        "pitch_mean_hz": None,
+        "pitch_median_hz": None,
+        "pitch_std_hz": 0.0,
+        "pitch_range_semitones": 0.0,
+        "pitched_ratio": 0.0,
+        "filler_count": 0,
+        "filler_rate_per_minute": 0.0,
+        "filler_onsets_seconds": []
+    }
+
+
+def extract_prosody(samples: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+    """
+    Frame-level prosody for a mono 16-bit recording: energy, pauses and
+    silence, a syllable-rate proxy for speaking rate, pitch statistics and
+    filled-pause ("um", "uh") detection. Frames are strided views over the
+    samples and every statistic is computed with array operations.
+    """
+    frame_length = sample_rate * FRAME_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    if frame_length == 0 or len(samples) < frame_length:
+        return empty_prosody()
+    frame_seconds = hop / sample_rate
+
+    # Energy and voicing
+    energy_db = frame_rms_db(samples, frame_length, hop)
+    noise_floor = max(float(np.percentile(energy_db, 10)), -80.0)
+    voiced = energy_db > noise_floor + VOICED_THRESHOLD_DB
+    if not voiced.any():
+        return empty_prosody()
+    voiced_db = energy_db[voiced]
+
+    # Pauses are silent runs between the first and last voiced frame
+    voiced_frames = np.flatnonzero(voiced)
+    first, last = voiced_frames[0], voiced_frames[-1] + 1
+    span_seconds = (last - first) * frame_seconds
+    silent_starts, silent_ends = mask_runs(~voiced[first:last])
+    pause_lengths = (silent_ends - silent_starts) * frame_seconds
+    pauses = pause_lengths[pause_lengths >= MIN_PAUSE_MS / 1000]
+
+    # Syllable nuclei: voiced local maxima of the smoothed energy envelope
+    radius = max(1, SYLLABLE_SPACING_MS // HOP_MS)
+    smoothed = np.convolve(energy_db, np.ones(5) / 5, mode="same")
+    local_max = sliding_window_view(np.pad(smoothed, radius, mode="edge"), 2 * radius + 1).max(axis=1)
+    nuclei = int(np.count_nonzero(voiced & (smoothed >= local_max)
+                                  & (smoothed > noise_floor + VOICED_THRESHOLD_DB + 3)))
+    voiced_seconds = len(voiced_frames) * frame_seconds
+    syllable_rate = nuclei / span_seconds if span_seconds else 0.0
+
+    # Pitch over voiced frames only
+    frames = sliding_window_view(samples, frame_length)[::hop][:len(energy_db)]
+    voiced_f0, _ = frame_pitch(frames, voiced_frames, sample_rate)
+    f0 = np.full(len(energy_db), np.nan)
+    f0[voiced_frames] = voiced_f0
+    pitched = ~np.isnan(f0)
+    pitch_values = f0[pitched]
+
+    # Filled pauses: short, steadily pitched, flat-energy voiced runs
+    run_starts, run_ends = mask_runs(voiced)
+    run_frames = run_ends - run_starts
+    semitones = np.where(pitched, 12 * np.log2(np.where(pitched, f0, 1.0) / 100.0), 0.0)
+    pitched_counts = _run_sums(pitched, run_starts, run_ends)
+    safe_counts = np.maximum(pitched_counts, 1)
+    pitch_mean = _run_sums(semitones, run_starts, run_ends) / safe_counts
+    pitch_var = _run_sums(semitones ** 2, run_starts, run_ends) / safe_counts - pitch_mean ** 2
+    energy_mean = _run_sums(energy_db, run_starts, run_ends) / run_frames
+    energy_var = _run_sums(energy_db ** 2, run_starts, run_ends) / run_frames - energy_mean ** 2
+    fillers = (
+        (run_frames * frame_seconds >= FILLER_MIN_MS / 1000)
+        & (run_frames * frame_seconds <= FILLER_MAX_MS / 1000)
+        & (pitched_counts >= 0.8 * run_frames)
+        & (np.sqrt(np.maximum(pitch_var, 0)) <= FILLER_MAX_PITCH_STD_SEMITONES)
+        & (np.sqrt(np.maximum(energy_var, 0)) <= FILLER_MAX_ENERGY_STD_DB)
+    )
+    filler_onsets = run_starts[fillers] * frame_seconds
+
+    return {
+        "voiced_seconds": round(voiced_seconds, 3),
+        "silence_ratio": round(1.0 - len(voiced_frames) / len(voiced), 4),
+        "pause_ratio": round(float(pauses.sum()) / span_seconds, 4) if span_seconds else 0.0,
+        "pause_count": int(len(pauses)),
+        "long_pause_count": int(np.count_nonzero(pauses >= LONG_PAUSE_MS / 1000)),
+        "mean_pause_seconds": round(float(pauses.mean()), 3) if len(pauses) else 0.0,
+        "max_pause_seconds": round(float(pauses.max()), 3) if len(pauses) else 0.0,
+        "energy_mean_db": round(float(voiced_db.mean()), 2),
+        "energy_std_db": round(float(voiced_db.std()), 2),
+        "energy_range_db": round(float(np.percentile(voiced_db, 95) - np.percentile(voiced_db, 5)), 2),
+        "syllable_rate": round(syllable_rate, 3),
+        "articulation_rate": round(nuclei / voiced_seconds, 3) if voiced_seconds else 0.0,
+        "words_per_minute_estimate": round(syllable_rate * 60 / SYLLABLES_PER_WORD, 1),
+        "pitch_mean_hz": round(float(pitch_values.mean()), 1) if len(pitch_values) else None,
+        "pitch_median_hz": round(float(np.median(pitch_values)), 1) if len(pitch_values) else None,
+        "pitch_std_hz": round(float(pitch_values.std()), 1) if len(pitch_values) else 0.0,
+        "pitch_range_semitones": round(float(12 * np.log2(np.percentile(pitch_values, 90)
+                                                          / np.percentile(pitch_values, 10))), 2)
+                                 if len(pitch_values) else 0.0,
+        "pitched_ratio": round(len(pitch_values) / len(voiced_frames), 4),
+        "filler_count": int(len(filler_onsets)),
+        "filler_rate_per_minute": round(len(filler_onsets) / span_seconds * 60, 2) if span_seconds else 0.0,
+        "filler_onsets_seconds": [round(float(t), 2) for t in filler_onsets[:20]]
+    }
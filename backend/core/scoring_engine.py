@@ -5,6 +5,13 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Lowest score for each letter grade, best first; anything lower is an F
+GRADE_CUTOFFS = [
+    (90, "A+"), (85, "A"), (80, "A-"),
+    (75, "B+"), (70, "B"), (65, "B-"),
+    (60, "C+"), (55, "C"), (50, "C-")
+]
+
 
 class ScoringEngine:
     def __init__(self):
@@ -20,7 +27,9 @@ class ScoringEngine:
             "tone": settings.BEHAVIORAL_TONE_WEIGHT
         }
     
-    def calculate_technical_score(self, evaluation: Dict[str, Any], time_taken: float) -> Dict[str, Any]:
+    def calculate_technical_score(self, evaluation: Dict[str, Any], time_taken: float,
+                                  difficulty: str = "medium",
+                                  duration_percentiles: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Calculate technical score based on evaluation and time taken
         """
@@ -31,7 +40,7 @@ class ScoringEngine:
             process_score = evaluation.get("process_score", 0)
             
             # Calculate time score (inverse relationship - faster is better)
-            time_score = self._calculate_time_score(time_taken)
+            time_score = self._calculate_time_score(time_taken, difficulty, duration_percentiles)
             
             # Apply weights
             weighted_scores = {
@@ -112,10 +121,17 @@ class ScoringEngine:
                 "tone_analysis": {}
             }
     
-    def _calculate_time_score(self, time_taken: float) -> float:
+    def _calculate_time_score(self, time_taken: float, difficulty: str = "medium",
+                              duration_percentiles: Optional[Dict[str, float]] = None) -> float:
         """
-        Calculate time score based on time taken (inverse relationship)
+        Calculate time score based on time taken (inverse relationship).
+        With observed duration percentiles for the question, the middle half
+        of past answers is the optimal range; otherwise a fixed range per
+        difficulty is used.
         """
+        if duration_percentiles:
+            return self._calculate_time_score_from_percentiles(time_taken, duration_percentiles)
+        
         # Define optimal time ranges (in seconds)
         optimal_ranges = {
             "easy": (30, 120),      # 30 seconds to 2 minutes
@@ -123,8 +139,7 @@ class ScoringEngine:
             "hard": (120, 600)      # 2 to 10 minutes
         }
         
-        # For now, use medium difficulty as default
-        min_time, max_time = optimal_ranges["medium"]
+        min_time, max_time = optimal_ranges.get(difficulty, optimal_ranges["medium"])
         
         if time_taken <= min_time:
             # Too fast - might indicate rushing
@@ -142,6 +157,28 @@ class ScoringEngine:
             # Way over time
             return 30
     
+    def _calculate_time_score_from_percentiles(self, time_taken: float, percentiles: Dict[str, float]) -> float:
+        """
+        Time score relative to how long other candidates took on the question
+        """
+        if time_taken < percentiles["p10"]:
+            # Faster than nearly everyone - might indicate rushing
+            return 80
+        elif time_taken < percentiles["p25"]:
+            return 90
+        elif time_taken <= percentiles["p75"]:
+            # Middle half of observed answers
+            return 100
+        elif time_taken <= percentiles["p90"]:
+            return 85
+        elif time_taken <= percentiles["p90"] * 1.5:
+            # Slower than 90% of answers
+            return 70
+        elif time_taken <= percentiles["p90"] * 2:
+            return 50
+        else:
+            return 30
+    
     def _calculate_tone_score_from_analysis(self, tone_analysis: Dict[str, Any]) -> float:
         """
         Calculate tone score from audio analysis
@@ -211,23 +248,7 @@ class ScoringEngine:
         """
         Convert numerical score to letter grade
         """
-        if score >= 90:
-            return "A+"
-        elif score >= 85:
-            return "A"
-        elif score >= 80:
-            return "A-"
-        elif score >= 75:
-            return "B+"
-        elif score >= 70:
-            return "B"
-        elif score >= 65:
-            return "B-"
-        elif score >= 60:
-            return "C+"
-        elif score >= 55:
-            return "C"
-        elif score >= 50:
-            return "C-"
-        else:
-            return "F"
+        for cutoff, grade in GRADE_CUTOFFS:
+            if score >= cutoff:
+                return grade
+        return "F"
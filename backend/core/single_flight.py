@@ -0,0 +1,48 @@
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight task.
+    The shared task is shielded, so a cancelled caller does not cancel it
+    for everyone else waiting on the same key.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() for key unless a call for the same key is already in flight,
+        in which case wait for its result. Returns (result, shared), where
+        shared is True if this caller joined another caller's call.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+            self._stats["executed"] += 1
+        else:
+            self._stats["coalesced"] += 1
+
+        return await asyncio.shield(task), shared
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "in_flight": len(self._calls)}
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight call {key[:12]} failed: {task.exception()}")
@@ -0,0 +1,251 @@
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Executor
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from core.prosody import extract_prosody
+from core.tone_analyzer import ToneAnalyzer
+from core.transcription import Transcriber
+from core.vad import Segment, compact_chunk, detect_speech_segments, plan_chunks
+from core.wav import block_rms
+
+logger = logging.getLogger(__name__)
+
+
+class StreamTooLargeError(Exception):
+    """Raised when a streamed answer exceeds the configured size limit"""
+    pass
+
+
+class StreamingTranscription:
+    """
+    Incremental analysis of an answer streamed as 16-bit mono PCM. Each time
+    a pause closes an utterance it is compacted and sent to the transcriber
+    in the background, so by the time the answer ends only the last
+    utterance, prosody and tone remain. Speech without a pause is cut at
+    max_chunk_seconds, so the audio scanned for pauses stays bounded. Chunks
+    run on the given executor, which is shared by every stream, and each
+    stream has at most max_parallel of them queued or running at once.
+    finish() returns the same result shape as AudioProcessor.process_audio_file.
+    """
+
+    # Look for closed utterances after at least this much new audio
+    SCAN_INTERVAL_SECONDS = 0.25
+
+    def __init__(self, transcriber: Transcriber, tone_analyzer: ToneAnalyzer, sample_rate: int,
+                 max_bytes: int, min_silence_ms: int = 400, max_gap_ms: int = 300,
+                 max_chunk_seconds: float = 15.0, max_parallel: int = 4, executor: Optional[Executor] = None):
+        self.transcriber = transcriber
+        self.tone_analyzer = tone_analyzer
+        # None runs chunks on the event loop's default executor
+        self.executor = executor
+        self._slots = asyncio.Semaphore(max_parallel)
+        self.sample_rate = sample_rate
+        self.max_samples = max_bytes // 2
+        self.min_silence_ms = min_silence_ms
+        self.max_gap_ms = max_gap_ms
+        self.max_chunk_seconds = max_chunk_seconds
+
+        self._buffer = np.empty(sample_rate * 30, dtype=np.int16)
+        self._length = 0
+        self._pending_byte = b""
+        # Audio before this sample has been assigned to submitted chunks
+        self._committed = 0
+        self._scanned_at = 0
+        self._chunks: List[Tuple[Dict[str, Any], asyncio.Task]] = []
+        self._partials_sent = 0
+        self.closed = False
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self._buffer[:self._length]
+
+    async def feed(self, data: bytes):
+        """
+        Append PCM bytes and submit any utterances that have been closed by a
+        pause; the scan for pauses runs off the event loop
+        """
+        data = self._pending_byte + data
+        self._pending_byte = data[-1:] if len(data) % 2 else b""
+        frames = np.frombuffer(data[:len(data) - len(self._pending_byte)], dtype="<i2")
+
+        if self._length + len(frames) > self.max_samples:
+            raise StreamTooLargeError("Streamed answer exceeds the audio size limit")
+        if self._length + len(frames) > len(self._buffer):
+            grown = np.empty(max(len(self._buffer) * 2, self._length + len(frames)), dtype=np.int16)
+            grown[:self._length] = self._buffer[:self._length]
+            self._buffer = grown
+        self._buffer[self._length:self._length + len(frames)] = frames
+        self._length += len(frames)
+
+        if self._length - self._scanned_at >= self.SCAN_INTERVAL_SECONDS * self.sample_rate:
+            self._scanned_at = self._length
+            await self._submit_closed(final=False)
+
+    def pop_partials(self) -> List[Dict[str, Any]]:
+        """
+        Transcripts of chunks finished since the last call, in recording order
+        """
+        partials = []
+        while self._partials_sent < len(self._chunks):
+            record, task = self._chunks[self._partials_sent]
+            if not task.done():
+                break
+            self._partials_sent += 1
+            self._collect(record, task)
+            if record["text"]:
+                partials.append({"type": "partial", "text": record["text"],
+                                 "start_seconds": record["start_seconds"], "end_seconds": record["end_seconds"]})
+        return partials
+
+    async def finish(self) -> Dict[str, Any]:
+        """
+        Transcribe what is left, wait for every chunk and add features and tone
+        """
+        await self._submit_closed(final=True)
+        await asyncio.gather(*(task for _, task in self._chunks), return_exceptions=True)
+        self.closed = True
+        records = [self._collect(record, task) for record, task in self._chunks]
+        if records and all(record["status"] == "error" for record in records):
+            return {"transcription": "", "transcription_chunks": records, "audio_features": {},
+                    "tone_analysis": {}, "success": False, "error": records[0]["error"]}
+        transcription = " ".join(record["text"] for record in records if record["text"])
+
+        samples = self.samples
+        rms, prosody = await asyncio.to_thread(
+            lambda: (block_rms(samples), extract_prosody(samples, self.sample_rate))
+        )
+        duration_seconds = len(samples) / self.sample_rate
+        return {
+            "transcription": transcription,
+            "transcription_chunks": records,
+            "audio_features": {
+                "duration_seconds": duration_seconds,
+                "duration_ms": int(duration_seconds * 1000),
+                "volume_db": float(20 * np.log10(rms / 32768)) if rms > 0 else float("-inf"),
+                "volume_linear": rms / 32768,
+                "sample_rate": self.sample_rate,
+                "channels": 1,
+                "speech_rate_estimate": prosody["words_per_minute_estimate"],
+                "prosody": prosody
+            },
+            "tone_analysis": self.tone_analyzer.analyze(transcription),
+            "success": True
+        }
+
+    def cancel(self):
+        """
+        Drop chunks that have not started; ones already running finish unobserved
+        """
+        self.closed = True
+        for _, task in self._chunks:
+            task.cancel()
+
+    async def _submit_closed(self, final: bool):
+        tail = self._buffer[self._committed:self._length]
+        # Recent committed audio, for judging a final tail that has no pause of its own
+        lookback = int(self.max_chunk_seconds * self.sample_rate) if final else 0
+        history = self._buffer[max(0, self._committed - lookback):self._committed]
+        segments, cut = await asyncio.to_thread(self._plan_cut, tail, final, history)
+        offset = self._committed
+        if not segments:
+            self._committed = offset + cut
+            return
+
+        chunks = plan_chunks([(start + offset, end + offset) for start, end in segments],
+                             self.sample_rate, self.max_chunk_seconds, max_gap_ms=self.max_gap_ms)
+        for chunk in chunks:
+            samples = np.array(compact_chunk(self._buffer, chunk, self.sample_rate, self.max_gap_ms))
+            record = {
+                "start_seconds": round(chunk[0][0] / self.sample_rate, 3),
+                "end_seconds": round(chunk[-1][1] / self.sample_rate, 3),
+                "seconds_sent": round(len(samples) / self.sample_rate, 3),
+                "text": "",
+                "status": "pending"
+            }
+            task = asyncio.create_task(self._transcribe(samples))
+            task.add_done_callback(self._timer(record))
+            self._chunks.append((record, task))
+        self._committed = offset + cut
+
+    async def _transcribe(self, samples: np.ndarray) -> str:
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.transcriber.transcribe, samples, self.sample_rate)
+
+    def _plan_cut(self, tail: np.ndarray, final: bool, history: np.ndarray) -> Tuple[List[Segment], int]:
+        """
+        Speech segments of the uncommitted tail to transcribe now and how
+        many of its samples they consume
+        """
+        segments = detect_speech_segments(tail, self.sample_rate, min_silence_ms=self.min_silence_ms)
+        if final:
+            if segments or not tail.any():
+                return segments, len(tail)
+            # The tail alone has no noise floor; scan it after the audio before it
+            window = np.concatenate((history, tail))
+            context = detect_speech_segments(window, self.sample_rate, min_silence_ms=self.min_silence_ms)
+            if not context:
+                # Continuous speech (or no speech above the floor anywhere); send it all
+                return [(0, len(tail))], len(tail)
+            offset = len(history)
+            return [(max(start, offset) - offset, end - offset) for start, end in context if end > offset], len(tail)
+
+        # The last segment may still be growing; only segments followed by a
+        # full pause are closed
+        silence = self.sample_rate * self.min_silence_ms // 1000
+        closed = [segment for segment in segments if segment[1] <= len(tail) - silence]
+        if closed:
+            return closed, closed[-1][1]
+        max_length = int(self.max_chunk_seconds * self.sample_rate)
+        if len(tail) < max_length:
+            return [], 0
+        # A chunk's worth of audio without a pause is cut where it is
+        segments = [(start, min(end, max_length)) for start, end in segments if start < max_length]
+        if not segments and tail[:max_length].any():
+            segments = [(0, max_length)]
+        return segments, max_length
+
+    @staticmethod
+    def _timer(record: Dict[str, Any]):
+        submitted_at = time.perf_counter()
+
+        def done(_):
+            record["latency_seconds"] = round(time.perf_counter() - submitted_at, 3)
+        return done
+
+    @staticmethod
+    def _collect(record: Dict[str, Any], task: asyncio.Task) -> Dict[str, Any]:
+        """
+        Fill a chunk record from its finished task (idempotent)
+        """
+        if record["status"] != "pending":
+            return record
+        if task.cancelled():
+            record["status"] = "error"
+            record["error"] = "Transcription cancelled"
+            return record
+        try:
+            record["text"] = task.result()
+            record["status"] = "ok" if record["text"] else "unintelligible"
+        except Exception as e:
+            logger.error(f"Error transcribing streamed chunk: {e}")
+            record["status"] = "error"
+            record["error"] = str(e)
+        return record
+
+
+def pcm16_to_wav(samples: np.ndarray, sample_rate: int, path: str):
+    """
+    Write mono 16-bit samples as a WAV file
+    """
+    import wave
+
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
@@ -0,0 +1,225 @@
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Punctuation split off the ends of whitespace-separated chunks, as pattern's
+# tokenizer does; interior characters ("well-known", "3.5") are kept
+_PUNCTUATION = ".,;:!?()[]{}`'\"@#$^&*+-|=~_"
+_EDGE_RE = re.compile("^([%s]*)(.*?)([%s]*)$" % (re.escape(_PUNCTUATION), re.escape(_PUNCTUATION)), re.S)
+# Apostrophes become separate tokens ("it's" -> "it", "'", "s") except in n't
+_APOSTROPHE_RE = re.compile(r"(?<!n)'|'(?!t)")
+_SENTENCE_END = frozenset(".!?")
+# pattern marks sarcasm with an exclamation mark in parentheses
+IRONY_TOKEN = "(!)"
+
+# Professional vocabulary and the inflections that count as the same term
+PROFESSIONAL_TERMS = {
+    "experience": ("experience", "experiences", "experienced"),
+    "responsibility": ("responsibility", "responsibilities"),
+    "leadership": ("leadership",),
+    "collaboration": ("collaboration", "collaborations"),
+    "achievement": ("achievement", "achievements"),
+    "solution": ("solution", "solutions"),
+    "strategy": ("strategy", "strategies"),
+    "implementation": ("implementation", "implementations"),
+    "analysis": ("analysis", "analyses"),
+    "development": ("development", "developments"),
+    "management": ("management",),
+    "coordination": ("coordination",)
+}
+
+# (polarity, subjectivity, intensity, is_modifier)
+LexiconEntry = Tuple[float, float, float, bool]
+
+
+def load_pattern_lexicon() -> Tuple[Dict[str, LexiconEntry], frozenset]:
+    """
+    Flatten TextBlob's pattern sentiment lexicon into a word -> entry table
+    using its untagged (None) readings, which is what TextBlob(text).sentiment
+    uses for plain strings
+    """
+    from textblob.en import sentiment
+
+    table: Dict[str, LexiconEntry] = {}
+    modifier_tags = set(sentiment.modifiers)
+    for word in sentiment.keys():
+        readings = sentiment[word]
+        if None not in readings:
+            continue
+        polarity, subjectivity, intensity = readings[None]
+        table[word] = (polarity, subjectivity, intensity, bool(modifier_tags & readings.keys()))
+    return table, frozenset(sentiment.negations)
+
+
+def load_pattern_emoticons() -> Dict[str, float]:
+    """
+    Emoticon -> polarity table from pattern, lowercased as it compares them
+    """
+    from textblob._text import EMOTICONS
+
+    table: Dict[str, float] = {}
+    for (_, polarity), emoticons in EMOTICONS.items():
+        for emoticon in emoticons:
+            table.setdefault(emoticon.lower(), polarity)
+    return table
+
+
+def tokenize(text: str, emoticons: Dict[str, float]) -> Iterator[Tuple[str, bool]]:
+    """
+    Lowercased tokens split the way pattern's tokenizer splits them, each
+    with whether it starts a new whitespace-separated word. The one
+    departure is that "n't" stays a token ("don't" -> "do", "n't") where
+    pattern yields "n", "'", "t".
+    """
+    for chunk in text.lower().split():
+        if chunk.isalnum():
+            yield chunk, True
+            continue
+        if chunk in emoticons or chunk == IRONY_TOKEN:
+            yield chunk, False
+            continue
+        parts = [chunk]
+        if "'" in chunk:
+            parts = _APOSTROPHE_RE.sub(" ' ", chunk.replace("n't", " n't")).split()
+        first = True
+        for part in parts:
+            lead, core, trail = _EDGE_RE.match(part).groups()
+            yield from ((mark, False) for mark in lead)
+            if core:
+                yield core, first
+                first = False
+            yield from ((mark, False) for mark in trail)
+
+
+class ToneAnalyzer:
+    """
+    Sentiment, clarity and professionalism of a transcript in one pass over
+    its tokens. The polarity table and term map are compiled once; sentiment
+    follows TextBlob's pattern analyzer without building a TextBlob: the
+    same lexicon, modifier and negation rules, a boost per "!", emoticons
+    and "(!)" irony. It departs from TextBlob only where listed:
+    - "n't" is a negation ("wasn't bad"); pattern's tokenizer splits it
+      into "n", "'", "t" and misses it.
+    - Abbreviation and ellipsis handling is not reproduced; these only
+      affect sentence counts, which use the raw ".", "!" and "?" tokens.
+    """
+
+    def __init__(self):
+        self.lexicon, self.negations = load_pattern_lexicon()
+        self.emoticons = load_pattern_emoticons()
+        self.professional_terms = {
+            form: term for term, forms in PROFESSIONAL_TERMS.items() for form in forms
+        }
+        logger.info(f"Tone analyzer ready ({len(self.lexicon)} sentiment words)")
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        # Assessments are [polarity, subjectivity, intensity, negated]
+        assessments: List[List[Any]] = []
+        modifier = None
+        negation = False
+        words = 0
+        sentences = 0
+        in_sentence = False
+        professional = set()
+
+        for token, starts_word in tokenize(text, self.emoticons):
+            if token in _SENTENCE_END:
+                if in_sentence:
+                    sentences += 1
+                    in_sentence = False
+            elif starts_word:
+                words += 1
+                in_sentence = True
+            term = self.professional_terms.get(token)
+            if term is not None:
+                professional.add(term)
+
+            entry = self.lexicon.get(token)
+            if entry is not None:
+                polarity, subjectivity, intensity, is_modifier = entry
+                if modifier is not None:
+                    previous = assessments[-1]
+                    previous[0] = max(-1.0, min(polarity * previous[2], 1.0))
+                    previous[1] = max(-1.0, min(subjectivity * previous[2], 1.0))
+                    previous[2] = intensity
+                else:
+                    assessments.append([polarity, subjectivity, intensity, False])
+                if negation:
+                    assessments[-1][2] = 1.0 / assessments[-1][2]
+                    assessments[-1][3] = True
+                modifier = token if is_modifier else None
+                negation = token in self.negations
+                continue
+
+            if token in self.negations:
+                negation = True
+            elif negation and len(token.strip("'")) > 1:
+                negation = False
+            if negation and modifier is not None and modifier.endswith("ly"):
+                # "really not good"
+                assessments[-1][3] = True
+                negation = False
+            elif modifier is not None and len(token) > 2:
+                modifier = None
+
+            if token == "!" and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+            elif token == IRONY_TOKEN:
+                assessments.append([0.0, 1.0, 1.0, False])
+            elif token in self.emoticons:
+                assessments.append([self.emoticons[token], 1.0, 1.0, False])
+
+        if in_sentence:
+            sentences += 1
+
+        if words == 0:
+            return {
+                "sentiment": "neutral",
+                "sentiment_score": 0.0,
+                "confidence": 0.0,
+                "clarity_score": 0.0,
+                "professionalism_score": 0.0
+            }
+
+        if assessments:
+            sentiment_score = sum(p * -0.5 if negated else p for p, _, _, negated in assessments) / len(assessments)
+            sentiment_subjectivity = sum(s for _, s, _, _ in assessments) / len(assessments)
+        else:
+            sentiment_score = sentiment_subjectivity = 0.0
+
+        # Determine sentiment category
+        if sentiment_score > 0.1:
+            sentiment = "positive"
+        elif sentiment_score < -0.1:
+            sentiment = "negative"
+        else:
+            sentiment = "neutral"
+
+        # Clarity score based on sentence length (optimal: 15-20 words)
+        avg_sentence_length = words / sentences
+        if 10 <= avg_sentence_length <= 25:
+            clarity_score = 1.0
+        elif 5 <= avg_sentence_length <= 30:
+            clarity_score = 0.8
+        else:
+            clarity_score = 0.5
+
+        # Professionalism score: distinct professional terms relative to length
+        professional_word_count = len(professional)
+        professionalism_score = min(1.0, professional_word_count / words * 10)
+
+        return {
+            "sentiment": sentiment,
+            "sentiment_score": sentiment_score,
+            "sentiment_subjectivity": sentiment_subjectivity,
+            "clarity_score": clarity_score,
+            "professionalism_score": professionalism_score,
+            "avg_sentence_length": avg_sentence_length,
+            "total_words": words,
+            "professional_word_count": professional_word_count
+        }
+
+    def analyze_batch(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.analyze(text) for text in texts]
@@ -0,0 +1,112 @@
+from typing import Any, Optional
+import json
+import logging
+import threading
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionError(Exception):
+    """Raised when a backend fails to transcribe, as opposed to hearing no speech"""
+    pass
+
+
+class Transcriber:
+    """
+    Interface for speech-to-text backends used by AudioProcessor. Implementations
+    take mono 16-bit PCM, return "" when no speech is recognised and raise
+    TranscriptionError when the engine itself fails. They must be safe to call
+    from several threads at once.
+    """
+
+    name: str = "unknown"
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """
+        Load models or open connections before the first real request. No-op by default.
+        """
+        pass
+
+
+class GoogleTranscriber(Transcriber):
+    """
+    Google Web Speech API through speech_recognition (requires network access)
+    """
+
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        audio_data = self._sr.AudioData(samples.tobytes(), sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio_data, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+        except self._sr.RequestError as e:
+            raise TranscriptionError(f"Speech recognition service error: {e}")
+
+
+class VoskTranscriber(Transcriber):
+    """
+    Offline Kaldi-based recognition with Vosk. The acoustic model is loaded
+    once and shared by every recognizer created from it, so each audio worker
+    process keeps a single resident copy.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        # Imported here so the other backends work without vosk installed
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model_path = model_path
+        self._model: Optional[Any] = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logger.info(f"Loading Vosk model from {self.model_path}")
+                    self._model = self._vosk.Model(self.model_path)
+        return self._model
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        try:
+            recognizer = self._vosk.KaldiRecognizer(self.model, sample_rate)
+            recognizer.AcceptWaveform(samples.tobytes())
+            return json.loads(recognizer.FinalResult()).get("text", "")
+        except Exception as e:
+            raise TranscriptionError(f"Vosk transcription failed: {e}")
+
+    def warm_up(self):
+        # Decoding a moment of silence pages in the model and its graph
+        self.transcribe(np.zeros(1600, dtype=np.int16), 16000)
+
+
+def create_transcriber() -> Transcriber:
+    """
+    Build the transcription backend selected by settings.TRANSCRIPTION_BACKEND
+    """
+    if settings.TRANSCRIPTION_BACKEND == "vosk":
+        if not settings.VOSK_MODEL_PATH:
+            raise ValueError("VOSK_MODEL_PATH must be set to use the vosk transcription backend")
+        return VoskTranscriber(settings.VOSK_MODEL_PATH)
+    if settings.TRANSCRIPTION_BACKEND == "google":
+        return GoogleTranscriber(language=settings.TRANSCRIPTION_LANGUAGE)
+    raise ValueError(f"Unknown transcription backend: {settings.TRANSCRIPTION_BACKEND}")
@@ -0,0 +1,133 @@
+from typing import Optional
+import asyncio
+import logging
+import os
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Bytes needed to recognise every supported container, including the first
+# compatible brands of an MP4 ftyp box
+SNIFF_BYTES = 64
+
+# ISO base media brands. Audio-only brands are accepted outright; generic MP4
+# brands only when no brand marks the file as video or an image
+MP4_AUDIO_BRANDS = {b"M4A ", b"M4B ", b"M4P ", b"F4A ", b"F4B "}
+MP4_GENERIC_BRANDS = {b"isom", b"iso2", b"mp41", b"mp42", b"dash"}
+MP4_NON_AUDIO_BRANDS = {b"qt  ", b"M4V ", b"M4VH", b"M4VP", b"f4v ", b"heic", b"heix", b"hevc", b"heim",
+                        b"heis", b"mif1", b"msf1", b"avif", b"avis", b"crx "}
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+    pass
+
+
+class UnsupportedMediaError(Exception):
+    """Raised when an upload's content is not a supported audio container"""
+    pass
+
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """
+    Identify an audio container from its leading bytes. Returns the file
+    extension used by the audio pipeline, or None if unrecognised.
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return ".wav"
+    if header[:4] == b"fLaC":
+        return ".flac"
+    if header[4:8] == b"ftyp":
+        return ".m4a" if _is_audio_ftyp(header) else None
+    # ID3-tagged MP3, or a bare MPEG audio frame sync (11 set bits)
+    if header[:3] == b"ID3" or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return ".mp3"
+    return None
+
+
+def _is_audio_ftyp(header: bytes) -> bool:
+    """
+    Whether an ftyp box's major and compatible brands describe an audio file
+    """
+    box_end = min(int.from_bytes(header[:4], "big"), len(header))
+    # Major brand, then the 4-byte minor version, then compatible brands
+    brands = [header[8:12]] + [header[i:i + 4] for i in range(16, box_end - 3, 4)]
+    if any(brand in MP4_AUDIO_BRANDS for brand in brands):
+        return True
+    if any(brand in MP4_NON_AUDIO_BRANDS for brand in brands):
+        return False
+    return brands[0] in MP4_GENERIC_BRANDS
+
+
+async def save_audio_upload(upload: UploadFile, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """
+    Copy an uploaded audio file to a temporary file a fixed-size chunk at a
+    time. The container is identified from its magic bytes (the filename is
+    not trusted) and the copy stops as soon as max_bytes is exceeded. Returns
+    the temporary file path; the caller removes it.
+    """
+    first = await upload.read(chunk_size)
+    audio_format = sniff_audio_format(first[:SNIFF_BYTES])
+    if audio_format is None:
+        raise UnsupportedMediaError("Unsupported audio format")
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=audio_format)
+    size = 0
+    try:
+        with temp_file:
+            chunk = first
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Audio file exceeds {max_bytes // (1024 * 1024)}MB limit")
+                await asyncio.to_thread(temp_file.write, chunk)
+                chunk = await upload.read(chunk_size)
+    except BaseException:
+        os.remove(temp_file.name)
+        raise
+
+    logger.info(f"Saved {audio_format} upload ({size} bytes)")
+    return temp_file.name
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware capping request bodies on upload routes. A declared
+    Content-Length over the limit is refused before the body is read; chunked
+    bodies are counted as they arrive, since the form parser spools the whole
+    file before save_audio_upload sees it.
+    """
+
+    def __init__(self, app, max_bytes: int, path_suffix: str):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_suffix = path_suffix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].endswith(self.path_suffix):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": "Audio file too large"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing as they are
+                    raise HTTPException(status_code=413, detail="Audio file too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
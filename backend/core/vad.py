@@ -0,0 +1,127 @@
+from typing import List, Tuple
+import logging
+
+import numpy as np
+
+from core.wav import BLOCK_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+# (start_sample, end_sample), end exclusive
+Segment = Tuple[int, int]
+
+
+def mask_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end (exclusive) indices of the runs of True in a boolean mask
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int, frame_ms: int = 30) -> np.ndarray:
+    """
+    RMS level of consecutive non-overlapping frames in dB relative to 16-bit
+    full scale. A trailing partial frame is dropped.
+    """
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    frame_count = len(samples) // frame_length
+    frames_per_block = max(1, BLOCK_SAMPLES // frame_length)
+    levels = np.empty(frame_count)
+    for first in range(0, frame_count, frames_per_block):
+        last = min(first + frames_per_block, frame_count)
+        frames = samples[first * frame_length:last * frame_length].reshape(last - first, frame_length)
+        levels[first:last] = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(np.maximum(levels, 1.0) / 32768)
+
+
+def detect_speech_segments(samples: np.ndarray, sample_rate: int, frame_ms: int = 30,
+                           threshold_db: float = 12.0, min_silence_ms: int = 400,
+                           min_speech_ms: int = 200, padding_ms: int = 150) -> List[Segment]:
+    """
+    Energy-based voice activity detection. A frame is speech when it is more
+    than threshold_db above the recording's noise floor. Speech runs separated
+    by less than min_silence_ms are merged, runs shorter than min_speech_ms
+    are dropped and each segment is padded so word edges are not clipped.
+    """
+    energy = frame_energy_db(samples, sample_rate, frame_ms)
+    if len(energy) == 0:
+        return []
+
+    # Estimate the noise floor from the quietest frames; never treat digital
+    # silence as the floor or any faint hiss would count as speech
+    noise_floor = max(float(np.percentile(energy, 10)), -80.0)
+    voiced = energy > noise_floor + threshold_db
+    if not voiced.any():
+        return []
+
+    starts, ends = mask_runs(voiced)
+
+    min_gap = max(1, min_silence_ms // frame_ms)
+    min_run = max(1, min_speech_ms // frame_ms)
+    merged: List[List[int]] = []
+    for start, end in zip(starts, ends):
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    padding = sample_rate * padding_ms // 1000
+    segments = []
+    for start, end in merged:
+        if end - start < min_run:
+            continue
+        segments.append((max(0, int(start) * frame_length - padding),
+                         min(len(samples), int(end) * frame_length + padding)))
+    return segments
+
+
+def plan_chunks(segments: List[Segment], sample_rate: int, max_chunk_seconds: float,
+                max_gap_ms: int = 300) -> List[List[Segment]]:
+    """
+    Group consecutive speech segments into chunks whose compacted length
+    (see compact_chunk) is at most max_chunk_seconds, cutting only at
+    pauses. A single segment longer than the limit is split into equal parts.
+    """
+    max_length = int(max_chunk_seconds * sample_rate)
+    max_gap = sample_rate * max_gap_ms // 1000
+    chunks: List[List[Segment]] = []
+    chunk_length = 0
+    for start, end in segments:
+        length = end - start
+        if length > max_length:
+            parts = -(-length // max_length)
+            step = -(-length // parts)
+            chunks.extend([(s, min(end, s + step))] for s in range(start, end, step))
+            chunk_length = max_length
+            continue
+        if chunks:
+            gap = min(start - chunks[-1][-1][1], max_gap)
+            if chunk_length + gap + length <= max_length:
+                chunks[-1].append((start, end))
+                chunk_length += gap + length
+                continue
+        chunks.append([(start, end)])
+        chunk_length = length
+    return chunks
+
+
+def compact_chunk(samples: np.ndarray, chunk: List[Segment], sample_rate: int, max_gap_ms: int = 300) -> np.ndarray:
+    """
+    Samples of a chunk's speech segments with the pauses between them cut
+    down to max_gap_ms, so silence is not sent to the recognizer
+    """
+    if len(chunk) == 1:
+        start, end = chunk[0]
+        return samples[start:end]
+    max_gap = sample_rate * max_gap_ms // 1000
+    pieces = []
+    for index, (start, end) in enumerate(chunk):
+        if index:
+            previous_end = chunk[index - 1][1]
+            # Keep the start of the pause as recorded, so the recognizer
+            # still hears natural room tone between utterances
+            pieces.append(samples[previous_end:min(start, previous_end + max_gap)])
+        pieces.append(samples[start:end])
+    return np.concatenate(pieces)
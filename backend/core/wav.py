@@ -0,0 +1,100 @@
+from typing import Optional, Tuple
+import logging
+import os
+import struct
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# Samples processed per block when a whole-file pass is needed
+BLOCK_SAMPLES = 1 << 20
+
+
+class WavLayout:
+    """
+    Where the PCM data of a RIFF/WAVE file lives and how it is encoded
+    """
+    __slots__ = ("format_tag", "channels", "sample_rate", "bits_per_sample", "data_offset", "data_size")
+
+    def __init__(self, format_tag: int, channels: int, sample_rate: int, bits_per_sample: int,
+                 data_offset: int, data_size: int):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def is_pcm16(self) -> bool:
+        return self.format_tag in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE) and self.bits_per_sample == 16
+
+
+def read_wav_layout(file_path: str) -> Optional[WavLayout]:
+    """
+    Walk the RIFF chunks of a WAV file up to its data chunk. Returns None if
+    the file is not a well-formed WAVE file.
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"fmt ":
+                body = f.read(chunk_size)
+                if len(body) < 16:
+                    return None
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                format_tag, channels, sample_rate, _, _, bits_per_sample = fmt
+                data_offset = f.tell()
+                # Streamed writers may leave the size at 0 or 0xFFFFFFFF
+                data_size = min(chunk_size, file_size - data_offset) or file_size - data_offset
+                return WavLayout(format_tag, channels, sample_rate, bits_per_sample, data_offset, data_size)
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def memmap_pcm16(file_path: str, layout: WavLayout) -> np.ndarray:
+    """
+    Map the samples of a 16-bit PCM WAV file without reading them. Mono files
+    are returned as a 1-D memmap; multi-channel files are averaged to mono
+    block by block into one int16 array.
+    """
+    frame_count = layout.data_size // (2 * layout.channels)
+    mapped = np.memmap(file_path, dtype="<i2", mode="r", offset=layout.data_offset,
+                       shape=(frame_count, layout.channels))
+    if layout.channels == 1:
+        return mapped[:, 0]
+
+    mono = np.empty(frame_count, dtype=np.int16)
+    for start in range(0, frame_count, BLOCK_SAMPLES):
+        end = min(start + BLOCK_SAMPLES, frame_count)
+        mono[start:end] = mapped[start:end].mean(axis=1)
+    return mono
+
+
+def block_rms(samples: np.ndarray, block: int = BLOCK_SAMPLES) -> float:
+    """
+    RMS of a sample array accumulated block by block, so a memory-mapped
+    recording is never squared in one piece
+    """
+    total = 0.0
+    for start in range(0, len(samples), block):
+        chunk = samples[start:start + block].astype(np.float64)
+        total += float(chunk @ chunk)
+    return float(np.sqrt(total / len(samples))) if len(samples) else 0.0
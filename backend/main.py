@@ -1,30 +1,68 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Any, AsyncIterator
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import tempfile
+import json
 import logging
 
-from database import get_db, engine
-from models import Base
+from config import settings
+from database import get_db, engine, Base
 from core.interview_manager import InterviewManager
+from core.metrics import llm_metrics
+from core.uploads import UnsupportedMediaError, UploadSizeLimitMiddleware, UploadTooLargeError, save_audio_upload
+from core.blob_store import AUDIO_MEDIA_TYPES, iter_file_range, parse_range
+from core.audio_pool import AudioPoolBusyError
+from core.streaming import StreamTooLargeError
 from schemas.interview import InterviewCreate, InterviewResponse
 from schemas.question import QuestionResponse, LeetCodeBatchImport, SystemDesignBatchImport, BehavioralBatchImport
 from models.interview import InterviewType, InterviewStatus
 from models.question import QuestionType, DifficultyLevel
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Initialize interview manager (services inside it are built lazily)
+interview_manager = InterviewManager()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables
+    Base.metadata.create_all(bind=engine)
+    
+    # Warm up AI and audio services in the background so the app can accept
+    # traffic immediately; early requests initialize them on demand
+    warm_up_task = None
+    if settings.WARM_UP_ON_STARTUP:
+        warm_up_task = asyncio.create_task(interview_manager.warm_up())
+    
+    # Background workers for queued behavioral responses, picking up any
+    # left unfinished by the previous run
+    interview_manager.job_queue.start(settings.JOB_WORKERS)
+    try:
+        await interview_manager.recover_behavioral_jobs()
+    except Exception as e:
+        logger.error(f"Error re-enqueuing unfinished behavioral responses: {e}")
+    
+    yield
+    
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    await interview_manager.job_queue.stop()
+    await interview_manager.drain_background_tasks()
+    interview_manager.close()
+
+
 app = FastAPI(
     title="AI Interviewer API",
     description="AI-powered interview system with technical and behavioral assessment",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -36,8 +74,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize interview manager
-interview_manager = InterviewManager()
+# Allowance for multipart boundaries and form fields around the audio file
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+# Refuse audio uploads over the limit, whether or not they declare a Content-Length
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=settings.MAX_AUDIO_FILE_SIZE + UPLOAD_OVERHEAD_BYTES,
+    path_suffix="/responses/behavioral/"
+)
 
 
 @app.get("/")
@@ -56,6 +101,69 @@ async def chat_with_bedrock(message: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_event(event: str, data: Any) -> str:
+    """Format a single server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/chat/stream/")
+async def stream_chat_with_bedrock(message: str):
+    """Chat with Bedrock, streaming tokens as server-sent events"""
+    async def events():
+        try:
+            async for chunk in interview_manager.ai_service.stream_chat(message):
+                yield _sse_event("token", chunk)
+            yield _sse_event("done", None)
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield _sse_event("error", str(e))
+    
+    return _sse_response(events())
+
+
+@app.get("/metrics/llm/")
+async def get_llm_metrics():
+    """Get LLM call latency, token and cache histograms and counters"""
+    return {
+        **llm_metrics.snapshot(),
+        "cache": interview_manager.ai_service.cache_stats(),
+        "concurrency": interview_manager.ai_service.concurrency_stats()
+    }
+
+
+@app.get("/metrics/audio/")
+async def get_audio_pool_stats():
+    """Get audio worker pool load and outcome counters, and analysis cache hit rates"""
+    cache = interview_manager.audio_cache
+    return {**interview_manager.audio_pool.stats(), "cache": cache.stats() if cache is not None else None}
+
+
+@app.get("/metrics/jobs/")
+async def get_job_queue_stats():
+    """Get background job queue depth and outcome counters"""
+    return await interview_manager.job_queue.stats()
+
+
+@app.get("/metrics/llm-cache/")
+async def get_llm_cache_stats():
+    """Get hit/miss counters for the LLM evaluation cache"""
+    return interview_manager.ai_service.cache_stats()
+
+
+@app.get("/metrics/llm-concurrency/")
+async def get_llm_concurrency_stats():
+    """Get the adaptive LLM concurrency limit and circuit breaker state"""
+    return interview_manager.ai_service.concurrency_stats()
+
+
 # Interview Management Endpoints
 @app.post("/interviews/", response_model=InterviewResponse)
 async def create_interview(
@@ -160,7 +268,31 @@ async def submit_technical_response(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/sessions/{session_id}/responses/behavioral/")
+@app.post("/sessions/{session_id}/responses/technical/stream/")
+async def stream_technical_response(
+    session_id: int,
+    question_id: int = Form(...),
+    user_id: int = Form(...),
+    code_response: str = Form(...),
+    time_taken: float = Form(...),
+    db: Session = Depends(get_db)
+):
+    """Submit a technical response, streaming evaluation feedback as server-sent events"""
+    async def events():
+        async for event in interview_manager.stream_technical_response(
+            db=db,
+            session_id=session_id,
+            question_id=question_id,
+            user_id=user_id,
+            code_response=code_response,
+            time_taken=time_taken
+        ):
+            yield _sse_event(event["event"], event["data"])
+    
+    return _sse_response(events())
+
+
+@app.post("/sessions/{session_id}/responses/behavioral/", status_code=202)
 async def submit_behavioral_response(
     session_id: int,
     question_id: int = Form(...),
@@ -168,37 +300,139 @@ async def submit_behavioral_response(
     audio_file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    """Submit a behavioral response with audio recording"""
+    """Submit a behavioral response with audio recording; it is processed in the background"""
     try:
-        # Validate file type
-        if not audio_file.filename.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
-            raise HTTPException(status_code=400, detail="Unsupported audio format")
-        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file.filename)[1]) as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Stream the upload to a temporary file, checking type and size as we go
+        try:
+            temp_file_path = await save_audio_upload(audio_file, settings.MAX_AUDIO_FILE_SIZE)
+        except UnsupportedMediaError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
         try:
-            result = await interview_manager.submit_behavioral_response(
+            return await interview_manager.submit_behavioral_response(
                 db=db,
                 session_id=session_id,
                 question_id=question_id,
                 user_id=user_id,
                 audio_file_path=temp_file_path
             )
-            return result
-        finally:
-            # Clean up temporary file
+        except Exception:
+            # The background job owns the file once queued
             if os.path.exists(temp_file_path):
                 os.remove(temp_file_path)
+            raise
                 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting behavioral response: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/sessions/{session_id}/responses/behavioral/stream/")
+async def stream_behavioral_response(websocket: WebSocket, session_id: int, db: Session = Depends(get_db)):
+    """
+    Stream a behavioral answer while it is being recorded. The client sends
+    {"type": "start", "question_id", "user_id", "sample_rate"}, then binary
+    frames of 16-bit little-endian mono PCM, then {"type": "end"}. The server
+    replies with {"type": "partial"} transcripts as utterances finish and a
+    final {"type": "result"} once the answer is scored.
+    """
+    await websocket.accept()
+    stream = None
+    try:
+        start = await websocket.receive_json()
+        if start.get("type") != "start":
+            raise ValueError("Expected a start message")
+        question_id = int(start["question_id"])
+        user_id = int(start["user_id"])
+        stream = await interview_manager.start_behavioral_stream(
+            db, session_id, question_id, int(start.get("sample_rate", 16000))
+        )
+        
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                await stream.feed(message["bytes"])
+            elif json.loads(message.get("text") or "{}").get("type") == "end":
+                break
+            for partial in stream.pop_partials():
+                await websocket.send_json(partial)
+        
+        result = await interview_manager.finish_behavioral_stream(db, session_id, question_id, user_id, stream)
+        for partial in stream.pop_partials():
+            await websocket.send_json(partial)
+        await websocket.send_json({"type": "result", **result})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Behavioral stream for session {session_id} disconnected")
+        if stream is not None:
+            stream.cancel()
+    except (StreamTooLargeError, ValueError, KeyError) as e:
+        if stream is not None:
+            stream.cancel()
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+    except AudioPoolBusyError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1013)
+    except Exception as e:
+        logger.error(f"Error streaming behavioral response: {e}")
+        if stream is not None:
+            stream.cancel()
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1011)
+
+
+@app.get("/responses/{response_id}/status/")
+async def get_behavioral_response_status(response_id: int, db: Session = Depends(get_db)):
+    """Poll the processing status of a behavioral response"""
+    try:
+        return await interview_manager.get_behavioral_status(db, response_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/responses/{response_id}/reprocess/", status_code=202)
+async def reprocess_behavioral_response(response_id: int, db: Session = Depends(get_db)):
+    """Re-run transcription, analysis and scoring on a stored recording"""
+    try:
+        return await interview_manager.reprocess_behavioral_response(db, response_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/responses/{response_id}/audio/")
+async def get_behavioral_audio(response_id: int, request: Request, db: Session = Depends(get_db)):
+    """Stream a stored recording; single byte ranges are supported for seeking"""
+    try:
+        path = interview_manager.get_behavioral_audio(db, response_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    size = os.path.getsize(path)
+    headers = {"Accept-Ranges": "bytes"}
+    media_type = AUDIO_MEDIA_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(iter_file_range(path, 0, size - 1), media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_file_range(path, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
+
+
 @app.post("/sessions/{session_id}/end/")
 async def end_interview_session(
     session_id: int,
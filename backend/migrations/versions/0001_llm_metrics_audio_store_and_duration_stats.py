@@ -0,0 +1,88 @@
+"""LLM metrics, audio store, job leases and duration stats
+
+Columns and tables added since the original schema. Each step is skipped when
+already present, so this is safe on databases created by create_all after the
+models changed as well as on older ones.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = {
+    "responses": [
+        sa.Column("llm_metrics", sa.JSON(), nullable=True),
+        sa.Column("follow_up_questions", sa.JSON(), nullable=True)
+    ],
+    "audio_responses": [
+        sa.Column("content_hash", sa.String(64), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True)
+    ]
+}
+
+# The questions table already created this enum type where types are separate objects
+DIFFICULTY = sa.Enum("EASY", "MEDIUM", "HARD", name="difficultylevel").with_variant(
+    postgresql.ENUM("EASY", "MEDIUM", "HARD", name="difficultylevel", create_type=False), "postgresql"
+)
+
+
+def _columns(inspector, table):
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for table, columns in NEW_COLUMNS.items():
+        if table not in tables:
+            continue
+        existing = _columns(inspector, table)
+        missing = [column for column in columns if column.name not in existing]
+        if missing:
+            with op.batch_alter_table(table) as batch:
+                for column in missing:
+                    batch.add_column(column)
+
+    if "audio_responses" in tables and "ix_audio_responses_content_hash" not in {
+        index["name"] for index in inspector.get_indexes("audio_responses")
+    }:
+        op.create_index("ix_audio_responses_content_hash", "audio_responses", ["content_hash"])
+
+    # Early versions of this table keyed level rows by question_id NULL; its
+    # contents are derived data, rebuilt with `python rescore.py --rebuild-duration-stats`
+    if "question_duration_stats" in tables and "scope" not in _columns(inspector, "question_duration_stats"):
+        op.drop_table("question_duration_stats")
+        tables.discard("question_duration_stats")
+    if "question_duration_stats" not in tables:
+        op.create_table(
+            "question_duration_stats",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("scope", sa.String(), nullable=False),
+            sa.Column("question_id", sa.Integer(), sa.ForeignKey("questions.id"), nullable=True),
+            sa.Column("difficulty", DIFFICULTY, nullable=False),
+            sa.Column("sample_count", sa.Integer(), nullable=True),
+            sa.Column("sketch", sa.JSON(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.UniqueConstraint("scope", "difficulty")
+        )
+        op.create_index("ix_question_duration_stats_id", "question_duration_stats", ["id"])
+
+
+def downgrade():
+    op.drop_table("question_duration_stats")
+    op.drop_index("ix_audio_responses_content_hash", table_name="audio_responses")
+    with op.batch_alter_table("audio_responses") as batch:
+        batch.drop_column("lease_expires_at")
+        batch.drop_column("content_hash")
+    with op.batch_alter_table("responses") as batch:
+        batch.drop_column("follow_up_questions")
+        batch.drop_column("llm_metrics")
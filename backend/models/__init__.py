@@ -4,7 +4,7 @@ Base = declarative_base()
 
 from .user import User
 from .interview import Interview, InterviewSession
-from .question import Question, QuestionCategory
+from .question import Question, QuestionCategory, QuestionDurationStats
 from .response import Response, AudioResponse
 from .score import Score, ScoreBreakdown
 
@@ -15,6 +15,7 @@ __all__ = [
     "InterviewSession",
     "Question",
     "QuestionCategory",
+    "QuestionDurationStats",
     "Response",
     "AudioResponse",
     "Score",
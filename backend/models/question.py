@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, JSON, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -69,3 +69,18 @@ class Question(Base):
     # Relationships
     category = relationship("QuestionCategory", back_populates="questions")
     responses = relationship("Response", back_populates="question")
+
+
+class QuestionDurationStats(Base):
+    __tablename__ = "question_duration_stats"
+    __table_args__ = (UniqueConstraint("scope", "difficulty"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False)  # "question:<id>", or "level" for a whole difficulty level
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=True)  # None for a whole difficulty level
+    difficulty = Column(Enum(DifficultyLevel), nullable=False)
+    
+    # Streaming quantile sketch of Response.duration_seconds
+    sample_count = Column(Integer, default=0)
+    sketch = Column(JSON)  # Marker state per tracked quantile
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,9 +1,17 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import enum
 from database import Base
 
 
+class ProcessingStatus(enum.IntEnum):
+    PENDING = 0
+    PROCESSING = 1
+    COMPLETED = 2
+    FAILED = 3
+
+
 class Response(Base):
     __tablename__ = "responses"
 
@@ -26,6 +34,8 @@ class Response(Base):
     score = Column(Float, nullable=True)  # 0-100
     feedback = Column(Text, nullable=True)
     score_breakdown = Column(JSON, nullable=True)  # Detailed scoring breakdown
+    llm_metrics = Column(JSON, nullable=True)  # Per-call LLM latency, token and cache accounting
+    follow_up_questions = Column(JSON, nullable=True)
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -45,6 +55,7 @@ class AudioResponse(Base):
     response_id = Column(Integer, ForeignKey("responses.id"), unique=True)
     
     # Audio file information
+    content_hash = Column(String(64), index=True, nullable=True)  # Key in the audio blob store
     file_path = Column(String)
     file_size = Column(Integer)  # Size in bytes
     duration_seconds = Column(Float)
@@ -58,8 +69,9 @@ class AudioResponse(Base):
     audio_analysis = Column(JSON, nullable=True)  # Tone, pace, clarity metrics
     
     # Processing status
-    is_processed = Column(Integer, default=0)  # 0: pending, 1: processing, 2: completed, 3: failed
+    is_processed = Column(Integer, default=ProcessingStatus.PENDING)  # See ProcessingStatus
     processing_error = Column(Text, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # Owned by a queued or running job until then
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
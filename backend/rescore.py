@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Recompute stored scores with the current scoring weights.
+
+Run after changing TECHNICAL_*_WEIGHT or BEHAVIORAL_*_WEIGHT so historical
+scores, session scores and overall interview scores match the new weights:
+
+    python rescore.py --dry-run
+    python rescore.py
+
+--rebuild-duration-stats recreates the per-question answer-duration
+percentiles used for time scoring from stored responses.
+"""
+import argparse
+import json
+import logging
+
+from database import Base, SessionLocal, engine
+from core.batch_rescoring import BatchRescorer
+from core.duration_stats import DurationStats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=50000, help="Score rows loaded per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--rebuild-duration-stats", action="store_true",
+                        help="Also rebuild answer-duration percentiles from stored responses")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        stats = BatchRescorer(batch_size=args.batch_size).rescore(db, dry_run=args.dry_run)
+        if args.rebuild_duration_stats and not args.dry_run:
+            stats["durations"] = DurationStats().rebuild(db, batch_size=args.batch_size)
+        print(json.dumps(stats, indent=2))
+    except Exception as e:
+        logger.error(f"Error rescoring: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
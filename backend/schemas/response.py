@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -25,6 +25,8 @@ class ResponseResponse(BaseModel):
     score: Optional[float]
     feedback: Optional[str]
     score_breakdown: Optional[Dict[str, Any]]
+    llm_metrics: Optional[List[Dict[str, Any]]] = None
+    follow_up_questions: Optional[List[str]] = None
     created_at: datetime
 
     class Config:
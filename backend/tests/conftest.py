@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so point everything stateful at a
+# scratch directory before any application module is imported
+_scratch = tempfile.mkdtemp(prefix="interviewer-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch, 'test.db')}")
+os.environ.setdefault("AUDIO_STORE_DIR", os.path.join(_scratch, "audio_store"))
+os.environ.setdefault("AUDIO_CACHE_SQLITE_PATH", os.path.join(_scratch, "audio_cache.db"))
+os.environ.setdefault("JOB_QUEUE_SQLITE_PATH", os.path.join(_scratch, "jobs.db"))
+os.environ.setdefault("WARM_UP_ON_STARTUP", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
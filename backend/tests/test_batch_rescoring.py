@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from core.batch_rescoring import BatchRescorer, breakdown_differs, grade_scores, weighted_totals
+from core.scoring_engine import ScoringEngine
+from database import Base, SessionLocal, engine
+from models import Question, Response, Score
+from models.question import QuestionType
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.query(Score).delete()
+    session.query(Response).delete()
+    session.query(Question).delete()
+    session.commit()
+    session.close()
+
+
+def add_scored_response(db, raw, total, response_score, breakdown):
+    question = Question(title="q", content="Two sum", question_type=QuestionType.LEETCODE)
+    db.add(question)
+    db.commit()
+    response = Response(question_id=question.id, score=response_score, score_breakdown=breakdown)
+    db.add(response)
+    db.commit()
+    db.add(Score(response_id=response.id, total_score=total, scoring_method="technical",
+                 accuracy_score=raw[0], time_score=raw[1], optimality_score=raw[2], process_score=raw[3]))
+    db.commit()
+    return response.id
+
+
+def expected(raw):
+    weights = ScoringEngine().technical_weights
+    breakdown = {name: value * weights[name] for name, value in zip(("accuracy", "time", "optimality", "process"), raw)}
+    return round(sum(breakdown.values()), 2), breakdown
+
+
+def test_stale_breakdown_is_rewritten_when_the_total_matches(db):
+    raw = (80.0, 60.0, 70.0, 90.0)
+    total, breakdown = expected(raw)
+    current = add_scored_response(db, raw, total, total, breakdown)
+    # Same total, breakdown from an older weighting
+    stale = add_scored_response(db, raw, total, total, {"accuracy": total, "time": 0.0, "optimality": 0.0,
+                                                         "process": 0.0})
+    missing = add_scored_response(db, raw, total, total, None)
+
+    stats = BatchRescorer().rescore(db)
+
+    assert stats["scores"] == 3 and stats["changed"] == 0
+    assert stats["responses"] == 2
+    for response_id in (current, stale, missing):
+        response = db.get(Response, response_id)
+        db.refresh(response)
+        assert response.score == total
+        assert not breakdown_differs(response.score_breakdown, breakdown)
+
+
+def test_changed_totals_update_scores_and_responses(db):
+    raw = (50.0, 50.0, 50.0, 50.0)
+    total, breakdown = expected(raw)
+    response_id = add_scored_response(db, raw, 10.0, 10.0, {"accuracy": 10.0})
+
+    dry = BatchRescorer().rescore(db, dry_run=True)
+    assert dry["changed"] == 1 and dry["responses"] == 1
+    assert db.get(Response, response_id).score == 10.0
+
+    stats = BatchRescorer(batch_size=1).rescore(db)
+    assert stats["changed"] == 1
+    db.expire_all()
+    assert db.get(Response, response_id).score == total
+    assert db.query(Score).one().total_score == total
+    assert BatchRescorer().rescore(db)["responses"] == 0
+
+
+def test_breakdown_differs():
+    assert not breakdown_differs({"a": 1.0, "b": 2.0}, {"a": 1.0, "b": 2.0 + 1e-12})
+    assert breakdown_differs({"a": 1.0}, {"a": 1.0, "b": 2.0})
+    assert breakdown_differs({"a": "x"}, {"a": 1.0})
+    assert breakdown_differs(None, {"a": 1.0})
+
+
+def test_vectorized_totals_match_the_scoring_engine():
+    result = weighted_totals(np.array([[80.0, np.nan], [55.0, 70.0]]), np.array([0.7, 0.3]))
+    assert result["totals"].tolist() == [56.0, 59.5]
+    engine_grade = ScoringEngine().get_score_grade
+    totals = np.array([0.0, 59.99, 60.0, 75.5, 89.9, 90.0, 100.0])
+    assert grade_scores(totals).tolist() == [engine_grade(total) for total in totals]
@@ -0,0 +1,133 @@
+import os
+import threading
+
+import pytest
+
+from core import blob_store
+from core.blob_store import LocalBlobStore, file_sha256, iter_file_range, parse_range
+
+
+def _write(path, data: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    first = store.put_file(_write(tmp_path / "a.wav", b"same audio"), ".wav")
+    second = store.put_file(_write(tmp_path / "b.wav", b"same audio"), ".wav")
+
+    assert first[0] == second[0] == file_sha256(first[1])
+    assert first[1] == second[1]
+    assert (first[2], second[2]) == (False, True)
+    assert not os.path.exists(tmp_path / "b.wav")
+
+
+def test_concurrent_identical_uploads_do_not_race(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    uploads = [_write(tmp_path / f"{i}.wav", b"x" * 100000) for i in range(16)]
+    results, errors = [], []
+    barrier = threading.Barrier(len(uploads))
+
+    def hash_together(path):
+        # Every upload hashes before any is stored, so none is a plain dedupe hit
+        key = file_sha256(path)
+        barrier.wait()
+        return key
+
+    monkeypatch.setattr(blob_store, "file_sha256", hash_together)
+
+    def upload(path):
+        try:
+            results.append(store.put_file(path, ".wav"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=upload, args=(path,)) for path in uploads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len({path for _, path, _ in results}) == 1
+    assert sum(1 for *_, deduplicated in results if not deduplicated) >= 1
+    shard = os.path.dirname(results[0][1])
+    assert os.listdir(shard) == [os.path.basename(results[0][1])]
+
+
+def test_concurrent_transcodes_of_one_blob(tmp_path, monkeypatch):
+    pydub = pytest.importorskip("pydub")
+
+    class FakeSegment:
+        def export(self, path, **kwargs):
+            _write(path, b"compact")
+
+    monkeypatch.setattr(pydub.AudioSegment, "from_file", staticmethod(lambda source: FakeSegment()))
+    store = LocalBlobStore(str(tmp_path / "store"))
+    key, _, _ = store.put_file(_write(tmp_path / "a.wav", b"raw audio" * 100), ".wav")
+    results, errors = [], []
+
+    def transcode():
+        try:
+            results.append(store.transcode(key, "flac"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=transcode) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert set(results) == {store.locate(key)}
+    assert store.locate(key).endswith(".flac")
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9,20-29", 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+def test_iter_file_range(tmp_path):
+    path = _write(tmp_path / "data", bytes(range(256)))
+    assert b"".join(iter_file_range(path, 10, 19, chunk_size=3)) == bytes(range(10, 20))
+
+
+def test_transcoded_analyses_do_not_replace_the_original(monkeypatch):
+    import asyncio
+
+    from core.interview_manager import InterviewManager, settings
+
+    monkeypatch.setattr(settings, "AUDIO_STORE_BITRATE", "32k")
+    manager = InterviewManager()
+    manager.audio_cache.clear()
+    analyzed = []
+
+    async def process(path):
+        analyzed.append(path)
+        return {"success": True, "transcription": os.path.splitext(path)[1]}
+
+    monkeypatch.setattr(manager.audio_pool, "process", process)
+
+    async def run():
+        original = await manager._analyze_audio("abc", "/store/abc.wav")
+        # Reprocessing after a lossy transcode analyzes the smaller file
+        transcoded = await manager._analyze_audio("abc", "/store/abc.opus", use_cache=False)
+        cached = await manager._analyze_audio("abc", "/store/abc.wav")
+        return original, transcoded, cached
+
+    original, transcoded, cached = asyncio.run(run())
+    assert transcoded["transcription"] == ".opus"
+    assert cached == original and cached["transcription"] == ".wav"
+    assert analyzed == ["/store/abc.wav", "/store/abc.opus"]
+    assert manager._stored_encoding("/store/abc.opus") == ".opus@32k"
+    assert manager._stored_encoding("/store/abc.flac") == ".flac"
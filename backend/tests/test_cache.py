@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from core.cache import TieredCache
+
+
+def test_memory_round_trip_returns_copies():
+    cache = TieredCache("test", max_entries=2)
+    cache.set("a", {"score": 1})
+    value = cache.get("a")
+    value["score"] = 2
+    assert cache.get("a") == {"score": 1}
+
+
+def test_lru_eviction():
+    cache = TieredCache("test", max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+
+
+def test_disk_hit_keeps_persisted_expiry(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = TieredCache("test", ttl_seconds=0.3, sqlite_path=path)
+    writer.set("a", 1)
+
+    time.sleep(0.2)
+    reader = TieredCache("test", ttl_seconds=0.3, sqlite_path=path)
+    assert reader.get("a") == 1
+    assert reader.stats()["disk_hits"] == 1
+
+    # Promoted to memory with the stored expiry, not a fresh TTL
+    time.sleep(0.15)
+    assert reader.get("a") is None
+
+
+def test_async_disk_lookup_runs_off_the_event_loop(tmp_path):
+    cache = TieredCache("test", sqlite_path=str(tmp_path / "cache.db"))
+    cache.set("a", 1)
+    cache._memory.clear()
+
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    original = cache._get_from_disk
+
+    def spy(key, now):
+        disk_threads.append(threading.get_ident())
+        return original(key, now)
+
+    cache._get_from_disk = spy
+
+    async def run():
+        assert await cache.aget("a") == 1
+        await cache.aset("b", 2)
+        assert await cache.aget("b") == 2
+        assert await cache.aget("missing") is None
+
+    asyncio.run(run())
+    assert disk_threads and loop_thread not in disk_threads
+
+
+def test_access_times_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = TieredCache("test", sqlite_path=path)
+    for key in ("a", "b", "c"):
+        writer.set(key, key)
+    reader = TieredCache("test", sqlite_path=path)
+    reader.TOUCH_FLUSH_INTERVAL = 3
+    assert reader.get("a") == "a"
+    assert reader.get("b") == "b"
+    assert set(reader._touches) == {"a", "b"}
+
+    reader.get("c")
+    assert not reader._touches
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.ai_service import AIService
+from core.concurrency import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, LimiterOverloadedError
+from core.llm_backends import LLMBackend
+
+
+class ControlledBackend(LLMBackend):
+    """
+    Backend whose calls fail, succeed or block until released
+    """
+
+    model_id = "controlled"
+
+    def __init__(self):
+        self.failing = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def invoke(self, prompt: str) -> str:
+        self.gate.wait(5)
+        if self.failing:
+            raise RuntimeError("upstream down")
+        return '{"ok": true}'
+
+    def stream(self, prompt: str):
+        for chunk in ("a", "b", "c"):
+            self.gate.wait(5)
+            yield chunk
+
+
+def make_service(reset_timeout: float = 0.05):
+    backend = ControlledBackend()
+    service = AIService(backend=backend)
+    service.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout)
+    return service, backend
+
+
+async def open_breaker(service, backend):
+    backend.failing = True
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await service._invoke("x")
+    assert service.breaker.state == CircuitBreaker.OPEN
+    backend.failing = False
+    await asyncio.sleep(0.06)
+
+
+def test_breaker_state_machine():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError, match="half-open"):
+        breaker.before_call()
+
+    breaker.release_trial()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.01)
+    breaker.state, breaker._opened_at = CircuitBreaker.OPEN, 0.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_cancelled_half_open_call_releases_trial():
+    async def run():
+        service, backend = make_service()
+        await open_breaker(service, backend)
+
+        backend.gate.clear()
+        task = asyncio.create_task(service.chat_with_bedrock("x"))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        backend.gate.set()
+
+        assert await service.chat_with_bedrock("x") == '{"ok": true}'
+        assert service.breaker.state == CircuitBreaker.CLOSED
+        service.close()
+
+    asyncio.run(run())
+
+
+def test_abandoned_stream_releases_trial():
+    async def run():
+        service, backend = make_service()
+        await open_breaker(service, backend)
+
+        stream = service._stream("x")
+        assert await stream.__anext__() == "a"
+        # The SSE consumer disconnects mid-stream
+        await stream.aclose()
+        assert service.limiter.stats()["in_flight"] == 0
+
+        chunks = [chunk async for chunk in service._stream("x")]
+        assert chunks == ["a", "b", "c"]
+        assert service.breaker.state == CircuitBreaker.CLOSED
+        service.close()
+
+    asyncio.run(run())
+
+
+def test_limiter_rejection_releases_trial():
+    async def run():
+        service, backend = make_service()
+        await open_breaker(service, backend)
+        service.limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1,
+                                          latency_target=10, max_queue=0)
+        await service.limiter.acquire()
+
+        with pytest.raises(LimiterOverloadedError):
+            await service._invoke("x")
+        service.limiter.release()
+
+        assert await service._invoke("x") == '{"ok": true}'
+        service.close()
+
+    asyncio.run(run())
+
+
+def test_limiter_fifo_and_queue_timeout():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=4, latency_target=10,
+                                  max_queue=2, queue_timeout=0.05)
+        await limiter.acquire()
+        order = []
+
+        async def waiter(name):
+            await limiter.acquire()
+            order.append(name)
+
+        first = asyncio.create_task(waiter("first"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(waiter("second"))
+        await asyncio.sleep(0)
+        with pytest.raises(LimiterOverloadedError):
+            await limiter.acquire()
+
+        # No latency signal, so the limit stays at one
+        limiter.release()
+        await first
+        limiter.release()
+        await second
+        assert order == ["first", "second"]
+
+        # Nobody releases: the next waiter times out and leaves the queue
+        with pytest.raises(LimiterOverloadedError, match="Timed out"):
+            await limiter.acquire()
+        assert limiter.stats()["queued"] == 0
+
+    asyncio.run(run())
+
+
+def test_throttling_cuts_the_limit():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=8, latency_target=10)
+        await limiter.acquire()
+        limiter.release(throttled=True)
+        assert limiter.stats()["limit"] == 2
+
+    asyncio.run(run())
+
+
+def test_streams_record_queue_wait_and_backend_time():
+    from core.metrics import collect_llm_calls
+
+    async def run():
+        service, backend = make_service()
+        timings = {}
+        assert [chunk async for chunk in service._stream("x", timings)] == ["a", "b", "c"]
+        with collect_llm_calls() as calls:
+            assert "".join([chunk async for chunk in service.stream_chat("hello")]) == "abc"
+        service.close()
+        return timings, calls
+
+    timings, calls = asyncio.run(run())
+    assert set(timings) == {"queue_wait_seconds", "backend_time_seconds"}
+    (call,) = calls
+    assert call["evaluation_type"] == "chat" and call["outcome"] == "ok"
+    assert call["queue_wait_seconds"] >= 0 and call["backend_time_seconds"] > 0
+    assert call["output_tokens"] == 1
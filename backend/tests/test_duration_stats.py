@@ -0,0 +1,121 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.duration_stats import LEVEL_SCOPE, DurationSketch, DurationStats, P2Quantile, question_scope
+from database import Base, SessionLocal, engine
+from models import Question, QuestionDurationStats
+from models.question import DifficultyLevel, QuestionType
+
+
+@pytest.fixture
+def questions():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    rows = [Question(title=f"q{i}", content="Two sum", question_type=QuestionType.LEETCODE,
+                     difficulty=DifficultyLevel.MEDIUM) for i in range(2)]
+    db.add_all(rows)
+    db.commit()
+    ids = [row.id for row in rows]
+    db.close()
+    yield ids
+    db = SessionLocal()
+    db.query(QuestionDurationStats).delete()
+    db.query(Question).delete()
+    db.commit()
+    db.close()
+
+
+def test_p2_tracks_quantiles_of_a_skewed_stream():
+    durations = np.random.default_rng(7).lognormal(mean=6.0, sigma=0.5, size=20000)
+    sketch = DurationSketch()
+    for duration in durations:
+        sketch.add(float(duration))
+    estimates = sketch.percentiles()
+    for name, p in (("p10", 10), ("p25", 25), ("p50", 50), ("p75", 75), ("p90", 90)):
+        assert estimates[name] == pytest.approx(np.percentile(durations, p), rel=0.03)
+
+
+def test_p2_is_exact_while_warming_up_and_survives_serialization():
+    estimator = P2Quantile(0.5)
+    for value in (5.0, 1.0, 3.0):
+        estimator.add(value)
+    assert estimator.value() == 3.0
+    restored = DurationSketch(DurationSketch().to_dict())
+    assert restored.percentiles()["p50"] == 0.0
+    sketch = DurationSketch()
+    for value in range(1, 101):
+        sketch.add(float(value))
+    assert DurationSketch(sketch.to_dict()).percentiles() == sketch.percentiles()
+
+
+def test_percentiles_fall_back_to_the_level(questions):
+    stats = DurationStats(min_samples=5)
+    first, second = questions
+    for duration in range(1, 6):
+        stats.record(first, DifficultyLevel.MEDIUM, duration * 60)
+    stats.record(second, DifficultyLevel.MEDIUM, 600)
+
+    db = SessionLocal()
+    try:
+        assert stats.percentiles(db, db.get(Question, first))["p50"] == 180
+        # Too few answers to the second question: the level's sketch is used
+        assert stats.percentiles(db, db.get(Question, second)) == DurationSketch(
+            db.query(QuestionDurationStats).filter_by(scope=LEVEL_SCOPE).one().sketch
+        ).percentiles()
+        assert DurationStats(min_samples=50).percentiles(db, db.get(Question, first)) is None
+    finally:
+        db.close()
+
+
+def test_concurrent_records_are_not_lost(questions):
+    # Two instances stand in for two worker processes sharing the database
+    workers = [DurationStats(), DurationStats()]
+    first, _ = questions
+    barrier = threading.Barrier(8)
+
+    def submit(stats):
+        barrier.wait()
+        for duration in range(1, 16):
+            stats.record(first, DifficultyLevel.MEDIUM, duration)
+
+    threads = [threading.Thread(target=submit, args=(workers[i % 2],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = SessionLocal()
+    try:
+        rows = db.query(QuestionDurationStats).all()
+        assert sorted(row.scope for row in rows) == sorted([question_scope(first), LEVEL_SCOPE])
+        assert [row.sample_count for row in rows] == [120, 120]
+    finally:
+        db.close()
+
+
+def test_record_failures_are_contained(questions, tmp_path):
+    unavailable = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path}/missing/stats.db"))
+    DurationStats(session_factory=unavailable).record(questions[0], DifficultyLevel.MEDIUM, 60)
+    stats = DurationStats()
+    stats.record(questions[0], DifficultyLevel.MEDIUM, 0)
+    stats.record(questions[0], None, 60)
+    db = SessionLocal()
+    try:
+        assert db.query(QuestionDurationStats).count() == 0
+    finally:
+        db.close()
+
+
+def test_schema_errors_are_not_retried(questions, tmp_path, caplog):
+    # An empty database has no stats table: fail once instead of backing off
+    empty = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path}/empty.db"))
+    start = time.perf_counter()
+    DurationStats(session_factory=empty).record(questions[0], DifficultyLevel.MEDIUM, 60)
+    assert time.perf_counter() - start < 0.2
+    assert "no such table" in caplog.text
+    assert "conflicts" not in caplog.text
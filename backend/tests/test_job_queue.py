@@ -0,0 +1,249 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from core.audio_pool import AudioPoolBusyError
+from core.job_queue import InProcessBroker, JobQueue, RedisBroker, RetryJobError, SQLiteBroker
+from database import Base, SessionLocal, engine
+from models import AudioResponse, Question, Response
+from models.question import QuestionType
+from models.response import ProcessingStatus
+
+
+def test_jobs_are_dispatched_and_retried():
+    async def run():
+        queue = JobQueue(InProcessBroker())
+        attempts = []
+        done = asyncio.Event()
+
+        async def handler(payload):
+            attempts.append(payload.get("attempt", 1))
+            if len(attempts) < 3:
+                raise RetryJobError("busy", delay=0)
+            done.set()
+
+        queue.register("work", handler)
+        queue.start(1)
+        await queue.enqueue("work", {"n": 1})
+        await asyncio.wait_for(done.wait(), 5)
+        stats = await queue.stats()
+        await queue.stop()
+        return attempts, stats
+
+    attempts, stats = asyncio.run(run())
+    assert attempts == [1, 2, 3]
+    assert stats["retried"] == 2 and stats["completed"] == 1
+
+
+def test_failed_handler_does_not_stop_the_worker():
+    async def run():
+        queue = JobQueue(InProcessBroker())
+        seen = []
+
+        async def handler(payload):
+            seen.append(payload["n"])
+            if payload["n"] == 1:
+                raise ValueError("boom")
+
+        queue.register("work", handler)
+        queue.start(1)
+        for n in (1, 2):
+            await queue.enqueue("work", {"n": n})
+        while len(seen) < 2:
+            await asyncio.sleep(0.01)
+        stats = await queue.stats()
+        await queue.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["failed"] == 1 and stats["completed"] == 1
+
+
+def test_sqlite_broker_redelivers_unacked_jobs(tmp_path):
+    async def run():
+        broker = SQLiteBroker(str(tmp_path / "jobs.db"), visibility_timeout=0.1)
+        await broker.put({"id": "a", "kind": "work", "payload": {}})
+        first = await broker.get(timeout=0)
+        assert await broker.get(timeout=0) is None
+
+        await asyncio.sleep(0.15)
+        again = await broker.get(timeout=0)
+        assert again["id"] == first["id"] == "a"
+        await broker.ack(again)
+        await asyncio.sleep(0.15)
+        assert await broker.get(timeout=0) is None
+        await broker.close()
+
+    asyncio.run(run())
+
+
+def test_redis_broker_requeues_stale_claims():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def run():
+        broker = RedisBroker.__new__(RedisBroker)
+        broker.client = fakeredis.FakeAsyncRedis()
+        broker.queue_name = "jobs"
+        broker.processing_name = "jobs:processing"
+        broker.claims_name = "jobs:claimed"
+        broker.visibility_timeout = 0.1
+
+        await broker.put({"id": "a", "kind": "work", "payload": {}})
+        job = await broker.get(timeout=1)
+        assert job["id"] == "a"
+        # The worker holding it crashes and never acks
+        assert await broker.requeue_stale() == 0
+        await asyncio.sleep(0.15)
+        assert await broker.requeue_stale() == 1
+        assert await broker.depth() == 1
+
+        job = await broker.get(timeout=1)
+        await broker.ack(job)
+        assert await broker.client.llen("jobs:processing") == 0
+        assert await broker.client.hlen("jobs:claimed") == 0
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def behavioral_row(tmp_path):
+    Base.metadata.create_all(bind=engine)
+    path = tmp_path / "answer.wav"
+    path.write_bytes(b"RIFF")
+    db = SessionLocal()
+    question = Question(title="q", content="Tell me about a conflict", question_type=QuestionType.BEHAVIORAL)
+    db.add(question)
+    db.commit()
+    response = Response(question_id=question.id)
+    db.add(response)
+    db.commit()
+    audio_response = AudioResponse(response_id=response.id, file_path=str(path),
+                                   is_processed=ProcessingStatus.PROCESSING)
+    db.add(audio_response)
+    db.commit()
+    audio_response_id = audio_response.id
+    db.close()
+    yield audio_response_id
+    db = SessionLocal()
+    db.query(AudioResponse).delete()
+    db.query(Response).delete()
+    db.query(Question).delete()
+    db.commit()
+    db.close()
+
+
+def _status(audio_response_id):
+    db = SessionLocal()
+    try:
+        row = db.query(AudioResponse).filter(AudioResponse.id == audio_response_id).first()
+        return ProcessingStatus(row.is_processed), row.processing_error
+    finally:
+        db.close()
+
+
+def test_pool_backpressure_retries_instead_of_failing(behavioral_row, monkeypatch):
+    from core.interview_manager import InterviewManager
+    from config import settings
+
+    manager = InterviewManager()
+
+    async def busy(*args, **kwargs):
+        raise AudioPoolBusyError("Too many audio files are being processed")
+
+    monkeypatch.setattr(manager, "_analyze_audio", busy)
+
+    with pytest.raises(RetryJobError):
+        asyncio.run(manager.process_behavioral_job({"audio_response_id": behavioral_row}))
+    assert _status(behavioral_row)[0] == ProcessingStatus.PENDING
+
+    # The last attempt gives up and records the failure
+    with pytest.raises(AudioPoolBusyError):
+        asyncio.run(manager.process_behavioral_job(
+            {"audio_response_id": behavioral_row, "attempt": settings.JOB_MAX_ATTEMPTS}
+        ))
+    status, error = _status(behavioral_row)
+    assert status == ProcessingStatus.FAILED and "Too many" in error
+    manager.close()
+
+
+def test_unfinished_rows_are_reenqueued_on_startup(behavioral_row):
+    from core.interview_manager import InterviewManager
+
+    async def run():
+        manager = InterviewManager()
+        manager.job_queue = JobQueue(InProcessBroker())
+        count = await manager.recover_behavioral_jobs()
+        job = await manager.job_queue.broker.get(timeout=1)
+        manager.close()
+        return count, job
+
+    count, job = asyncio.run(run())
+    assert count == 1
+    assert job["payload"] == {"audio_response_id": behavioral_row}
+
+
+def _set_lease(audio_response_id, status, lease_expires_at):
+    db = SessionLocal()
+    try:
+        db.query(AudioResponse).filter(AudioResponse.id == audio_response_id).update(
+            {AudioResponse.is_processed: status, AudioResponse.lease_expires_at: lease_expires_at}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_recovery_skips_leased_rows_and_claims_each_row_once(behavioral_row):
+    from datetime import datetime, timedelta
+    from core.interview_manager import InterviewManager
+
+    async def recover():
+        manager = InterviewManager()
+        manager.job_queue = JobQueue(InProcessBroker())
+        count = await manager.recover_behavioral_jobs()
+        manager.close()
+        return count
+
+    # Still owned by a live worker
+    _set_lease(behavioral_row, ProcessingStatus.PROCESSING, datetime.utcnow() + timedelta(minutes=5))
+    assert asyncio.run(recover()) == 0
+
+    # Lease expired: the first process to recover it claims it, the next does not
+    _set_lease(behavioral_row, ProcessingStatus.PROCESSING, datetime.utcnow() - timedelta(seconds=1))
+    assert asyncio.run(recover()) == 1
+    assert asyncio.run(recover()) == 0
+    assert _status(behavioral_row)[0] == ProcessingStatus.PENDING
+
+
+def test_job_skips_rows_claimed_by_another_worker(behavioral_row, monkeypatch):
+    from datetime import datetime, timedelta
+    from core.interview_manager import InterviewManager
+
+    manager = InterviewManager()
+    analyzed = []
+
+    async def analyze(*args, **kwargs):
+        analyzed.append(args)
+        raise AudioPoolBusyError("busy")
+
+    monkeypatch.setattr(manager, "_analyze_audio", analyze)
+    _set_lease(behavioral_row, ProcessingStatus.PROCESSING, datetime.utcnow() + timedelta(minutes=5))
+    asyncio.run(manager.process_behavioral_job({"audio_response_id": behavioral_row}))
+    _set_lease(behavioral_row, ProcessingStatus.COMPLETED, None)
+    asyncio.run(manager.process_behavioral_job({"audio_response_id": behavioral_row}))
+    assert analyzed == []
+    assert _status(behavioral_row)[0] == ProcessingStatus.COMPLETED
+    manager.close()
+
+
+def test_inprocess_queue_requires_workers():
+    async def run():
+        with pytest.raises(ValueError):
+            JobQueue(InProcessBroker()).start(0)
+        queue = JobQueue(SQLiteBroker(":memory:", 60))
+        queue.start(0)
+        await queue.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,13 @@
+import json
+
+from core.llm_backends import warmup_body
+
+
+def test_warmup_body_matches_the_model_family():
+    titan = json.loads(warmup_body("amazon.titan-tg1-large"))
+    assert titan["textGenerationConfig"]["maxTokenCount"] == 1
+    claude = json.loads(warmup_body("us.anthropic.claude-3-5-haiku-20241022-v1:0"))
+    assert claude["max_tokens"] == 1 and claude["messages"][0]["content"] == "ping"
+    assert json.loads(warmup_body("meta.llama3-8b-instruct-v1:0"))["max_gen_len"] == 1
+    assert "inferenceConfig" in json.loads(warmup_body("amazon.nova-micro-v1:0"))
+    assert warmup_body("unknown.model-v1") is None
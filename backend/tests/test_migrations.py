@@ -0,0 +1,54 @@
+import os
+
+import pytest
+import sqlalchemy as sa
+
+alembic_command = pytest.importorskip("alembic.command")
+from alembic.config import Config
+
+import models  # noqa: F401
+from config import settings
+from database import Base
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def upgrade(url, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    alembic_command.upgrade(config, "head")
+
+
+def columns(engine, table):
+    return {column["name"] for column in sa.inspect(engine).get_columns(table)}
+
+
+def test_upgrade_adds_new_columns_to_an_old_database(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path}/old.db"
+    engine = sa.create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        # Roll the schema back to before the new columns and tables
+        connection.execute(sa.text("DROP INDEX ix_audio_responses_content_hash"))
+        for table, column in (("responses", "llm_metrics"), ("responses", "follow_up_questions"),
+                              ("audio_responses", "content_hash"), ("audio_responses", "lease_expires_at")):
+            connection.execute(sa.text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+        connection.execute(sa.text("DROP TABLE question_duration_stats"))
+
+    upgrade(url, monkeypatch)
+
+    assert {"llm_metrics", "follow_up_questions"} <= columns(engine, "responses")
+    assert {"content_hash", "lease_expires_at"} <= columns(engine, "audio_responses")
+    assert "scope" in columns(engine, "question_duration_stats")
+
+
+def test_upgrade_is_a_no_op_on_a_current_database(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path}/new.db"
+    engine = sa.create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    before = {table: columns(engine, table) for table in sa.inspect(engine).get_table_names()}
+    upgrade(url, monkeypatch)
+    after = {table: columns(engine, table) for table in sa.inspect(engine).get_table_names()}
+    assert after.pop("alembic_version")
+    assert after == before
@@ -0,0 +1,40 @@
+from core.prompts import compact_code, fit_to_budget
+
+
+def test_c_preprocessor_and_string_literals_are_kept():
+    code = (
+        "#include <stdio.h>\n"
+        "#define N 10\n"
+        "// helper\n"
+        "int main(){ printf(\"/* x */ %d // y\", N); /* note */\n"
+        "  return 0; }\n"
+    )
+    compacted = compact_code(code)
+    assert compacted.startswith("#include <stdio.h>\n#define N 10\n")
+    assert 'printf("/* x */ %d // y", N);' in compacted
+    assert "helper" not in compacted and "note" not in compacted
+
+
+def test_python_comments_removed_outside_strings():
+    code = (
+        "import os\n"
+        "# module comment\n"
+        "def f(x):\n"
+        "    s = \"# not a comment\"\n"
+        "    \"\"\"doc\n# still doc\"\"\"\n"
+        "    return x // 2\n"
+    )
+    compacted = compact_code(code)
+    assert "module comment" not in compacted
+    assert 's = "# not a comment"' in compacted
+    assert "# still doc" in compacted
+    assert "return x // 2" in compacted
+
+
+def test_unterminated_block_comment_does_not_hang():
+    assert compact_code("int x; /* open") == "int x;"
+
+
+def test_fit_to_budget_marks_trimmed_values():
+    value, trimmed = fit_to_budget("x = 1\n" * 1000, 50, kind="code")
+    assert trimmed and len(value) <= 200
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.audio_pool import AudioPoolBusyError
+from core.streaming import StreamingTranscription, StreamTooLargeError
+from database import Base, SessionLocal, engine
+from models import InterviewSession, Question
+from models.question import QuestionType
+
+RATE = 16000
+
+
+class Gauge:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def exit(self):
+        with self._lock:
+            self.running -= 1
+
+
+class FakeTranscriber:
+    def __init__(self, delay: float = 0.0, shared: Gauge = None):
+        self.delay = delay
+        self.lengths = []
+        self.gauges = [Gauge()] + ([shared] if shared else [])
+
+    @property
+    def peak(self):
+        return self.gauges[0].peak
+
+    def transcribe(self, samples, sample_rate):
+        for gauge in self.gauges:
+            gauge.enter()
+        self.lengths.append(len(samples))
+        time.sleep(self.delay)
+        for gauge in self.gauges:
+            gauge.exit()
+        return f"chunk{len(self.lengths)}"
+
+
+class FakeToneAnalyzer:
+    def analyze(self, text):
+        return {"text": text}
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def hiss(seconds: float) -> np.ndarray:
+    return np.random.default_rng(0).integers(-30, 30, int(seconds * RATE)).astype(np.int16)
+
+
+def make_stream(transcriber, **kwargs) -> StreamingTranscription:
+    kwargs.setdefault("max_chunk_seconds", 5.0)
+    return StreamingTranscription(transcriber, FakeToneAnalyzer(), RATE, max_bytes=RATE * 2 * 120, **kwargs)
+
+
+async def feed_all(stream, samples, piece_seconds=0.1, on_piece=None):
+    data = samples.astype("<i2").tobytes()
+    step = int(piece_seconds * RATE) * 2
+    for start in range(0, len(data), step):
+        await stream.feed(data[start:start + step])
+        if on_piece is not None:
+            on_piece()
+
+
+def test_continuous_speech_is_cut_at_the_chunk_limit():
+    transcriber = FakeTranscriber()
+    stream = make_stream(transcriber)
+    tails = []
+
+    async def run():
+        await feed_all(stream, tone(23), on_piece=lambda: tails.append(stream._length - stream._committed))
+        return await stream.finish()
+
+    result = asyncio.run(run())
+    # The uncommitted tail never grows much past one chunk
+    assert max(tails) <= 5.0 * RATE + StreamingTranscription.SCAN_INTERVAL_SECONDS * RATE + 0.1 * RATE
+    assert len(transcriber.lengths) >= 4
+    assert max(transcriber.lengths) <= 5 * RATE
+    assert sum(transcriber.lengths) == 23 * RATE
+    assert result["success"] and result["transcription"].count("chunk") == len(transcriber.lengths)
+
+
+def test_tail_without_pause_is_transcribed_on_finish():
+    transcriber = FakeTranscriber()
+    stream = make_stream(transcriber, max_chunk_seconds=15.0)
+
+    async def run():
+        await feed_all(stream, np.concatenate([hiss(0.5), tone(2), hiss(1.5)]))
+        sent_before_end = len(transcriber.lengths)
+        # Speech continues to the end, so the tail has no pause or noise floor
+        await feed_all(stream, tone(3))
+        return sent_before_end, await stream.finish()
+
+    sent_before_end, result = asyncio.run(run())
+    assert sent_before_end == 1
+    assert len(result["transcription_chunks"]) == 2
+    assert result["transcription_chunks"][-1]["end_seconds"] == pytest.approx(7.0)
+
+
+def test_partials_arrive_in_order():
+    transcriber = FakeTranscriber()
+    stream = make_stream(transcriber)
+    pause = hiss(1.0)
+
+    async def run():
+        await feed_all(stream, np.concatenate([pause, tone(1), pause, tone(1), pause]))
+        await asyncio.sleep(0.1)
+        partials = stream.pop_partials()
+        result = await stream.finish()
+        return partials, result
+
+    partials, result = asyncio.run(run())
+    assert [partial["text"] for partial in partials] == ["chunk1", "chunk2"]
+    assert partials[0]["end_seconds"] < partials[1]["start_seconds"]
+    assert stream.pop_partials() == []
+    assert result["transcription"] == "chunk1 chunk2"
+
+
+def test_streams_share_one_bounded_executor():
+    shared = Gauge()
+    transcribers = [FakeTranscriber(delay=0.05, shared=shared) for _ in range(3)]
+    executor = ThreadPoolExecutor(max_workers=3)
+    streams = [make_stream(transcriber, max_chunk_seconds=1.0, max_parallel=2, executor=executor)
+               for transcriber in transcribers]
+
+    async def run():
+        for stream in streams:
+            await feed_all(stream, tone(8), piece_seconds=1.0)
+        return await asyncio.gather(*(stream.finish() for stream in streams))
+
+    results = asyncio.run(run())
+    executor.shutdown()
+    assert all(result["success"] for result in results)
+    assert all(len(transcriber.lengths) >= 8 for transcriber in transcribers)
+    assert all(transcriber.peak <= 2 for transcriber in transcribers)
+    assert shared.peak == 3
+
+
+def test_silence_is_not_transcribed():
+    transcriber = FakeTranscriber()
+    stream = make_stream(transcriber)
+
+    async def run():
+        await feed_all(stream, np.zeros(3 * RATE, dtype=np.int16))
+        return await stream.finish()
+
+    result = asyncio.run(run())
+    assert transcriber.lengths == []
+    assert result["transcription"] == ""
+
+
+def test_stream_size_limit():
+    stream = StreamingTranscription(FakeTranscriber(), FakeToneAnalyzer(), RATE, max_bytes=RATE * 2)
+    with pytest.raises(StreamTooLargeError):
+        asyncio.run(feed_all(stream, tone(2), piece_seconds=0.5))
+    stream.cancel()
+
+
+@pytest.fixture
+def open_session():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    question = Question(title="q", content="Tell me about a conflict", question_type=QuestionType.BEHAVIORAL)
+    session = InterviewSession()
+    db.add_all([question, session])
+    db.commit()
+    yield db, session, question
+    db.query(InterviewSession).delete()
+    db.query(Question).delete()
+    db.commit()
+    db.close()
+
+
+def test_streams_need_an_open_session_and_free_capacity(open_session, monkeypatch):
+    from core.interview_manager import InterviewManager, settings
+
+    db, session, question = open_session
+    manager = InterviewManager()
+    manager._stream_transcriber = FakeTranscriber()
+    manager._stream_tone_analyzer = FakeToneAnalyzer()
+    monkeypatch.setattr(settings, "STREAM_MAX_ACTIVE", 1)
+
+    async def run():
+        with pytest.raises(ValueError, match="Session not found"):
+            await manager.start_behavioral_stream(db, session.id + 1, question.id, RATE)
+        first = await manager.start_behavioral_stream(db, session.id, question.id, RATE)
+        with pytest.raises(AudioPoolBusyError):
+            await manager.start_behavioral_stream(db, session.id, question.id, RATE)
+        first.cancel()
+        second = await manager.start_behavioral_stream(db, session.id, question.id, RATE)
+        second.cancel()
+        session.end_time = datetime.utcnow()
+        db.commit()
+        with pytest.raises(ValueError, match="ended"):
+            await manager.start_behavioral_stream(db, session.id, question.id, RATE)
+
+    asyncio.run(run())
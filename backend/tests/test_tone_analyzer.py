@@ -0,0 +1,47 @@
+import pytest
+
+textblob = pytest.importorskip("textblob")
+
+from core.tone_analyzer import ToneAnalyzer, load_pattern_emoticons, tokenize
+
+SAMPLES = [
+    "I'm really happy with it!! It's a great team :) and we shipped.",
+    "The project was not good. Honestly, really not good at all!",
+    "I led a very successful migration (!) and it was a well-known disaster :(",
+    "We worked hard. The results were very, very good! Everyone's morale improved :D",
+    "It is what it is. Nothing special, somewhat boring, but okay?!",
+    "She said it's \"absolutely terrible\" but I think it was the best we could do...",
+    "Very not happy; extremely not bad."
+]
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return ToneAnalyzer()
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_sentiment_matches_textblob(analyzer, text):
+    expected = textblob.TextBlob(text).sentiment
+    result = analyzer.analyze(text)
+    assert result["sentiment_score"] == pytest.approx(expected.polarity)
+    assert result["sentiment_subjectivity"] == pytest.approx(expected.subjectivity)
+
+
+def test_contractions_are_negations(analyzer):
+    # The documented departure: TextBlob scores "wasn't bad" as plain "bad"
+    assert analyzer.analyze("It wasn't bad.")["sentiment_score"] > 0
+    assert analyzer.analyze("It was bad.")["sentiment_score"] < 0
+
+
+def test_tokenize_splits_like_pattern():
+    tokens = [token for token, _ in tokenize("It's great!! Don't :) well-known (!)", load_pattern_emoticons())]
+    assert tokens == ["it", "'", "s", "great", "!", "!", "do", "n't", ":)", "well-known", "(!)"]
+
+
+def test_counts(analyzer):
+    result = analyzer.analyze("It's my responsibility. I own the strategy and its implementation!")
+    assert result["total_words"] == 10
+    assert result["avg_sentence_length"] == 5
+    assert result["professional_word_count"] == 3
+    assert analyzer.analyze("   ")["sentiment_score"] == 0.0
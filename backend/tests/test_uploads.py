@@ -0,0 +1,67 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from core.uploads import UploadSizeLimitMiddleware, UploadTooLargeError, save_audio_upload, sniff_audio_format
+
+
+def ftyp(major: bytes, *compatible: bytes) -> bytes:
+    box = b"ftyp" + major + b"\0\0\0\0" + b"".join(compatible)
+    return (len(box) + 4).to_bytes(4, "big") + box
+
+
+def test_mp4_brands_are_checked():
+    assert sniff_audio_format(ftyp(b"M4A ", b"M4A ", b"mp42", b"isom")) == ".m4a"
+    assert sniff_audio_format(ftyp(b"mp42", b"isom", b"mp42")) == ".m4a"
+    assert sniff_audio_format(ftyp(b"qt  ", b"qt  ")) is None
+    assert sniff_audio_format(ftyp(b"heic", b"mif1", b"heic")) is None
+    assert sniff_audio_format(ftyp(b"avif", b"avif", b"mif1", b"miaf")) is None
+    assert sniff_audio_format(ftyp(b"isom", b"isom", b"M4V ")) is None
+    assert sniff_audio_format(ftyp(b"3gp5")) is None
+
+
+class ChunkedUpload:
+    def __init__(self, data: bytes):
+        self.file = io.BytesIO(data)
+
+    async def read(self, size: int) -> bytes:
+        return self.file.read(size)
+
+
+def test_size_is_enforced_while_copying(monkeypatch, tmp_path):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    wav = b"RIFF\0\0\0\0WAVE" + b"\0" * 5000
+    path = asyncio.run(save_audio_upload(ChunkedUpload(wav), max_bytes=len(wav), chunk_size=1024))
+    assert os.path.getsize(path) == len(wav)
+    os.remove(path)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_audio_upload(ChunkedUpload(wav), max_bytes=len(wav) - 1, chunk_size=1024))
+    assert os.listdir(tmp_path) == []
+
+
+def test_chunked_bodies_are_capped_as_they_arrive():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=4096, path_suffix="/upload/")
+
+    @app.post("/upload/")
+    async def upload(audio_file: UploadFile = File(...)):
+        return {"size": len(await audio_file.read())}
+
+    client = TestClient(app)
+    boundary = "b0undary"
+
+    def body(size):
+        yield f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio_file\"; filename=\"a.wav\"\r\n\r\n".encode()
+        for _ in range(size // 1024):
+            yield b"\0" * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    headers = {"content-type": f"multipart/form-data; boundary={boundary}"}
+    # A generator body is sent with chunked transfer encoding and no Content-Length
+    assert client.post("/upload/", content=body(2048), headers=headers).json() == {"size": 2048}
+    assert client.post("/upload/", content=body(64 * 1024), headers=headers).status_code == 413
+    assert client.post("/upload/", content=b"\0" * 8192, headers=headers).status_code == 413
@@ -0,0 +1,55 @@
+import numpy as np
+
+from core.vad import compact_chunk, detect_speech_segments, mask_runs, plan_chunks
+
+RATE = 16000
+
+
+def burst(seconds: float, amplitude: int = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def quiet(seconds: float) -> np.ndarray:
+    return np.random.default_rng(1).integers(-30, 30, int(seconds * RATE)).astype(np.int16)
+
+
+def test_mask_runs():
+    starts, ends = mask_runs(np.array([False, True, True, False, True]))
+    assert starts.tolist() == [1, 4] and ends.tolist() == [3, 5]
+
+
+def test_segments_follow_pauses():
+    samples = np.concatenate([quiet(1), burst(1), quiet(1), burst(0.5), quiet(1)])
+    segments = detect_speech_segments(samples, RATE)
+    assert len(segments) == 2
+    (first_start, first_end), (second_start, second_end) = segments
+    assert abs(first_start / RATE - 1.0) < 0.2 and abs(first_end / RATE - 2.0) < 0.2
+    assert abs(second_start / RATE - 3.0) < 0.2 and abs(second_end / RATE - 3.5) < 0.2
+
+
+def test_short_pauses_merge_and_clicks_are_dropped():
+    samples = np.concatenate([quiet(1), burst(1), quiet(0.2), burst(1), quiet(1), burst(0.05), quiet(1)])
+    assert len(detect_speech_segments(samples, RATE, min_silence_ms=400)) == 1
+
+
+def test_no_segments_without_a_noise_floor():
+    assert detect_speech_segments(burst(3), RATE) == []
+    assert detect_speech_segments(np.zeros(RATE, dtype=np.int16), RATE) == []
+
+
+def test_plan_chunks_respects_the_limit():
+    segments = [(0, RATE), (2 * RATE, 3 * RATE), (4 * RATE, 5 * RATE), (6 * RATE, 30 * RATE)]
+    chunks = plan_chunks(segments, RATE, max_chunk_seconds=2.5, max_gap_ms=300)
+    assert chunks[0] == [(0, RATE), (2 * RATE, 3 * RATE)]
+    # The long segment is split into equal parts under the limit
+    long_parts = [chunk[0] for chunk in chunks if chunk[0][0] >= 6 * RATE]
+    assert long_parts[0][0] == 6 * RATE and long_parts[-1][1] == 30 * RATE
+    assert all(end - start <= 2.5 * RATE for start, end in long_parts)
+
+
+def test_compact_chunk_shortens_pauses():
+    samples = np.arange(10 * RATE, dtype=np.int64)
+    compacted = compact_chunk(samples, [(0, RATE), (5 * RATE, 6 * RATE)], RATE, max_gap_ms=300)
+    assert len(compacted) == 2 * RATE + int(0.3 * RATE)
+    assert compacted[-1] == 6 * RATE - 1
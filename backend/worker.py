@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Standalone background worker for queued behavioral responses.
+
+Use it with a shared broker (JOB_QUEUE_BACKEND=sqlite or redis) to process
+audio outside the API processes, e.g. with JOB_WORKERS=0 for the API and
+
+    JOB_QUEUE_BACKEND=redis python worker.py --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+
+from config import settings
+from database import Base, engine
+from core.interview_manager import InterviewManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int):
+    interview_manager = InterviewManager()
+    if settings.WARM_UP_ON_STARTUP:
+        await interview_manager.warm_up()
+    try:
+        await interview_manager.job_queue.run_forever(concurrency)
+    finally:
+        await interview_manager.job_queue.stop()
+        interview_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=max(settings.JOB_WORKERS, 1),
+                        help="Jobs processed at once")
+    args = parser.parse_args()
+
+    if settings.JOB_QUEUE_BACKEND == "inprocess":
+        parser.error("the in-process job queue is only reachable from the API; "
+                     "set JOB_QUEUE_BACKEND to sqlite or redis")
+
+    Base.metadata.create_all(bind=engine)
+    try:
+        asyncio.run(run(args.concurrency))
+    except KeyboardInterrupt:
+        logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()